@@ -0,0 +1,109 @@
+"""
+Latency of concurrent ``s3_list_object_from_bucket`` calls, with and without the blocking executor.
+
+Runs against moto's in-memory S3. moto answers in-process, so every request is
+delayed by ``--latency-ms`` in a boto3 ``before-send`` hook to stand in for the
+network round trip that dominates real listings. moto's own request handling
+also runs in this process, so pages are kept small to stop its CPU time from
+masking the round trips. "inline" runs the blocking listing on the event loop,
+as the synchronous tool did; "executor" awaits it through a ``BlockingExecutor``
+as the tool does now. Latency is measured from the arrival of the burst.
+
+Run with ``python -m benchmarks.async_listing``.
+"""
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+from typing import Any, Dict, List
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ["S3_ENDPOINT_URL"] = ""
+
+import boto3
+from moto import mock_aws
+
+from src.s3_utils.s3_async import BlockingExecutor
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_functions import S3Client
+
+BUCKET = "bench-bucket"
+REGION = "us-east-1"
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _timed(call, arrived: float) -> float:
+    """Latency as a client sees it: from the burst's arrival until this call's result."""
+    result = await call()
+    assert result["status"] == "success", result
+    return time.perf_counter() - arrived
+
+
+async def _run(mode: str, executor: BlockingExecutor, calls: int, max_keys: int) -> Dict[str, Any]:
+    client = S3Client(os.environ["AWS_ACCESS_KEY_ID"], os.environ["AWS_SECRET_ACCESS_KEY"], REGION)
+
+    async def inline():
+        return client.list_objects(BUCKET, max_keys=max_keys)
+
+    async def offloaded():
+        return await executor.run("s3_list_object_from_bucket", client.list_objects, BUCKET, max_keys=max_keys)
+
+    call = inline if mode == "inline" else offloaded
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(call, started) for _ in range(calls)))
+    wall = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "calls": calls,
+        "p50_ms": round(1000 * statistics.median(latencies), 1),
+        "p99_ms": round(1000 * _percentile(latencies, 0.99), 1),
+        "wall_s": round(wall, 3)
+    }
+
+
+def benchmark(calls: int = 200, objects: int = 50, max_keys: int = 10, latency_ms: float = 50.0,
+              concurrency: int = 32) -> List[Dict[str, Any]]:
+    """
+    Issue a burst of ``calls`` concurrent listings of an ``objects``-key bucket in each mode.
+
+    Returns:
+        List[Dict[str, Any]]: p50/p99 latency per call and total wall time for each mode.
+    """
+    with mock_aws():
+        client_pool.clear()
+        setup = boto3.client("s3", region_name=REGION)
+        setup.create_bucket(Bucket=BUCKET)
+        for index in range(objects):
+            setup.put_object(Bucket=BUCKET, Key=f"data/{index:06d}.json", Body=b"{}")
+
+        def delay(**_):
+            time.sleep(latency_ms / 1000)
+
+        pooled = client_pool.get_client(os.environ["AWS_ACCESS_KEY_ID"], os.environ["AWS_SECRET_ACCESS_KEY"], REGION)
+        pooled.meta.events.register("before-send.s3", delay)
+        executor = BlockingExecutor(max_workers=concurrency, default_limit=concurrency)
+        try:
+            return [asyncio.run(_run(mode, executor, calls, max_keys)) for mode in ("inline", "executor")]
+        finally:
+            executor.shutdown()
+            client_pool.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--objects", type=int, default=50)
+    parser.add_argument("--max-keys", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    print(f"{'mode':<10} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'wall s':>8}")
+    for row in benchmark(args.calls, args.objects, args.max_keys, args.latency_ms, args.concurrency):
+        print(f"{row['mode']:<10} {row['calls']:>6} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['wall_s']:>8.3f}")
@@ -0,0 +1,93 @@
+"""
+Payload size and serialization time of tabular results as records, rows and columns.
+
+A synthetic ``--rows``-row, seven-column table is written as CSV and as JSON
+Lines, parsed with ``stream_csv``/``stream_jsonl`` as ``s3_read_file`` does,
+then encoded with ``encode_table`` in each output format and serialized with
+the configured JSON serializer. Encoding (type inference and reshaping) is
+timed separately from serialization; sizes are of the serialized text.
+
+Run with ``python -m benchmarks.columnar``.
+"""
+import io
+import csv
+import json
+import time
+import random
+import argparse
+
+from typing import Any, Dict, List
+
+from src.s3_utils.s3_columnar import OUTPUT_FORMATS, encode_table
+from src.s3_utils.s3_serialization import dumps
+from src.s3_utils.s3_streaming import stream_csv, stream_jsonl
+
+
+def table(rows: int) -> List[Dict[str, Any]]:
+    """Order-like records with ids, text, numbers, booleans and timestamps."""
+    generator = random.Random(rows)
+    cities = ["Berlin", "Paris", "Madrid", "Rome", "Vienna"]
+    return [{
+        "order_id": index,
+        "customer": f"cust-{generator.randint(1, 5000)}",
+        "city": generator.choice(cities),
+        "amount": round(generator.uniform(1, 500), 2),
+        "quantity": generator.randint(1, 20),
+        "paid": generator.random() < 0.8,
+        "created_at": f"2024-03-{generator.randint(1, 28):02d}T12:00:00Z"
+    } for index in range(rows)]
+
+
+def _files(records: List[Dict[str, Any]]) -> Dict[str, bytes]:
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(records[0]))
+    writer.writeheader()
+    for record in records:
+        writer.writerow({**record, "paid": str(record["paid"]).lower()})
+    return {
+        "csv": text.getvalue().encode(),
+        "jsonl": "\n".join(json.dumps(record) for record in records).encode()
+    }
+
+
+def benchmark(rows: int = 100_000, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Encode and serialize the parsed rows of each file type in every output format.
+
+    Returns:
+        List[Dict[str, Any]]: Best encode and serialize times, payload bytes and size
+            relative to "records", per file type and format.
+    """
+    results = []
+    for file_type, body in _files(table(rows)).items():
+        if file_type == "csv":
+            parsed = stream_csv(io.BytesIO(body))["rows"]
+        else:
+            parsed = stream_jsonl(io.BytesIO(body))["rows"]
+        baseline = None
+        for output_format in OUTPUT_FORMATS:
+            encode_best, dumps_best, size = None, None, 0
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                encoded = encode_table(parsed, output_format, from_text=file_type == "csv")
+                encoded_at = time.perf_counter()
+                size = len(dumps({"status": "success", "data": encoded}).encode("utf-8"))
+                finished = time.perf_counter()
+                encode_best = encoded_at - started if encode_best is None else min(encode_best, encoded_at - started)
+                dumps_best = finished - encoded_at if dumps_best is None else min(dumps_best, finished - encoded_at)
+            baseline = baseline or size
+            results.append({"file": file_type, "format": output_format, "encode_seconds": round(encode_best, 3),
+                            "dumps_seconds": round(dumps_best, 3), "bytes": size,
+                            "relative": round(size / baseline, 2)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'file':<6} {'format':<8} {'encode s':>9} {'dumps s':>8} {'bytes':>12} {'relative':>9}")
+    for row in benchmark(args.rows, args.repeat):
+        print(f"{row['file']:<6} {row['format']:<8} {row['encode_seconds']:>9.3f} {row['dumps_seconds']:>8.3f} "
+              f"{row['bytes']:>12,} {row['relative']:>8.2f}x")
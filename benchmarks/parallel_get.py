@@ -0,0 +1,125 @@
+"""
+Single versus parallel ranged GETs for whole-object reads, by object size.
+
+A single GET is capped by the throughput of one connection, which moto cannot
+model, so the benchmark reads from a local stand-in instead: an in-memory
+object answering ``get_object`` (Range, IfMatch) after sleeping
+``--latency-ms`` per request, with bodies that stream at ``--bandwidth-mbps``
+megabytes per second per connection. Both readers must return the object
+byte for byte.
+
+Run with ``python -m benchmarks.parallel_get``.
+"""
+import os
+import time
+import argparse
+
+from typing import Any, Dict, List, Optional
+
+from src.s3_utils.s3_ranged_io import (
+    MB, S3_PARALLEL_GET_PART_SIZE, S3_PARALLEL_GET_THRESHOLD, S3_PARALLEL_GET_WORKERS, ParallelGetter
+)
+
+BUCKET = "bench-bucket"
+KEY = "bench-object"
+_CHUNK = 64 * 1024
+
+
+class ThrottledBody:
+    """A response body that streams at a fixed rate, like one TCP connection."""
+
+    def __init__(self, data: memoryview, bandwidth: float):
+        self._data = data
+        self._position = 0
+        self.bandwidth = bandwidth
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = len(self._data) - self._position
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        size = min(size, _CHUNK)
+        chunk = self._data[self._position:self._position + size].tobytes()
+        self._position += size
+        time.sleep(size / self.bandwidth)
+        return chunk
+
+    def close(self) -> None:
+        self._position = len(self._data)
+
+
+class ThrottledStore:
+    """Read-only stand-in for ``get_object`` over one in-memory object."""
+
+    def __init__(self, data: bytes, latency: float, bandwidth: float):
+        self.data = memoryview(data)
+        self.etag = '"bench"'
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None,
+                   IfMatch: Optional[str] = None) -> Dict[str, Any]:
+        self.requests += 1
+        time.sleep(self.latency)
+        if IfMatch is not None and IfMatch != self.etag:
+            raise IOError("PreconditionFailed")
+        size = len(self.data)
+        start, end = 0, size - 1
+        if Range:
+            first, last = Range[len("bytes="):].split("-")
+            start, end = int(first), min(int(last), size - 1)
+        return {
+            "Body": ThrottledBody(self.data[start:end + 1], self.bandwidth),
+            "ContentLength": end - start + 1,
+            "ContentRange": f"bytes {start}-{end}/{size}",
+            "ETag": self.etag
+        }
+
+
+def benchmark(sizes_mb: tuple = (8, 32, 96), latency_ms: float = 50.0, bandwidth_mbps: float = 100.0,
+              threshold: int = S3_PARALLEL_GET_THRESHOLD, part_size: int = S3_PARALLEL_GET_PART_SIZE,
+              workers: int = S3_PARALLEL_GET_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Read an object of each size with a single GET and with ``ParallelGetter``.
+
+    Objects below ``threshold`` take the single GET in both readers.
+
+    Returns:
+        List[Dict[str, Any]]: Seconds, requests, throughput and speedup per size and reader.
+    """
+    results = []
+    for size_mb in sizes_mb:
+        store = ThrottledStore(os.urandom(int(size_mb * MB)), latency_ms / 1000, bandwidth_mbps * MB)
+        timings = {}
+        readers = {
+            "single": ParallelGetter(max_workers=1),
+            "parallel": ParallelGetter(threshold=threshold, part_size=part_size, max_workers=workers)
+        }
+        for name, getter in readers.items():
+            store.requests = 0
+            started = time.perf_counter()
+            data, _ = getter.read(store, BUCKET, KEY)
+            timings[name] = time.perf_counter() - started
+            assert data[:] == store.data, f"{size_mb} MB: {name} read differs"
+            del data
+            results.append({"size_mb": size_mb, "reader": name, "requests": store.requests,
+                            "seconds": round(timings[name], 2),
+                            "mb_per_second": round(size_mb / timings[name], 1)})
+        results[-1]["speedup"] = round(timings["single"] / timings["parallel"], 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[8, 32, 96])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=100.0)
+    parser.add_argument("--threshold-mb", type=float, default=S3_PARALLEL_GET_THRESHOLD / MB)
+    parser.add_argument("--part-size-mb", type=float, default=S3_PARALLEL_GET_PART_SIZE / MB)
+    parser.add_argument("--workers", type=int, default=S3_PARALLEL_GET_WORKERS)
+    args = parser.parse_args()
+    print(f"{'size':>8} {'reader':<9} {'requests':>9} {'seconds':>8} {'MB/s':>8} {'speedup':>8}")
+    for row in benchmark(tuple(args.sizes_mb), args.latency_ms, args.bandwidth_mbps, int(args.threshold_mb * MB),
+                         int(args.part_size_mb * MB), args.workers):
+        speedup = f"{row['speedup']:.1f}x" if "speedup" in row else ""
+        print(f"{row['size_mb']:>5g} MB {row['reader']:<9} {row['requests']:>9} {row['seconds']:>8.2f} "
+              f"{row['mb_per_second']:>8.1f} {speedup:>8}")
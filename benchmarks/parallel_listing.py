@@ -0,0 +1,113 @@
+"""
+Sequential versus prefix-partitioned parallel listing of a million-key bucket.
+
+moto re-sorts the whole bucket on every ListObjectsV2 call, which makes it
+unusable at this size, so the benchmark lists a local stand-in instead: a
+sorted in-memory key set answering ``list_objects_v2`` (prefix, delimiter,
+StartAfter, continuation token, MaxKeys) with bisection, and sleeping
+``--latency-ms`` per request for the round trip to S3. Both listers must
+return the same keys in the same order.
+
+Run with ``python -m benchmarks.parallel_listing``.
+"""
+import time
+import bisect
+import hashlib
+import argparse
+
+from typing import Any, Dict, List, Optional
+
+from src.s3_utils.s3_listing import S3_MAX_KEYS_PER_PAGE, ParallelLister, iter_objects
+
+BUCKET = "bench-bucket"
+
+
+class SortedKeyStore:
+    """Read-only stand-in for ``list_objects_v2`` over a sorted key list."""
+
+    def __init__(self, keys: List[str], latency: float):
+        self.keys = sorted(keys)
+        self.latency = latency
+        self.requests = 0
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = S3_MAX_KEYS_PER_PAGE,
+                        StartAfter: Optional[str] = None, ContinuationToken: Optional[str] = None,
+                        Delimiter: Optional[str] = None) -> Dict[str, Any]:
+        self.requests += 1
+        time.sleep(self.latency)
+        after = ContinuationToken or StartAfter
+        position = bisect.bisect_right(self.keys, after) if after else 0
+        position = max(position, bisect.bisect_left(self.keys, Prefix))
+        contents, prefixes, last = [], [], None
+        while position < len(self.keys) and len(contents) + len(prefixes) < MaxKeys:
+            key = self.keys[position]
+            if not key.startswith(Prefix):
+                break
+            cut = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if cut >= 0:
+                common = key[:cut + len(Delimiter)]
+                prefixes.append({"Prefix": common})
+                # Skip every key under the common prefix
+                position = bisect.bisect_left(self.keys, common + "\U0010ffff")
+                last = common
+            else:
+                contents.append({"Key": key, "Size": 1024})
+                position += 1
+                last = key
+        truncated = position < len(self.keys) and self.keys[position].startswith(Prefix)
+        response = {"Contents": contents, "CommonPrefixes": prefixes, "KeyCount": len(contents) + len(prefixes),
+                    "IsTruncated": truncated}
+        if truncated:
+            response["NextContinuationToken"] = last
+        return response
+
+
+def _keys(layout: str, count: int) -> List[str]:
+    if layout == "flat":
+        # Hash-named keys without delimiters, split by leading character
+        return [f"{hashlib.md5(str(index).encode()).hexdigest()}.json" for index in range(count)]
+    # 16 shards of daily directories, roughly 250 files per directory for a million keys
+    per_day = max(1, count // (16 * 250))
+    return [f"events/{index % 16:02d}/{index // 16 // per_day:04d}/{index:07d}.json" for index in range(count)]
+
+
+def benchmark(count: int = 1_000_000, latency_ms: float = 50.0, workers: int = 16,
+              layouts: tuple = ("hierarchical", "flat")) -> List[Dict[str, Any]]:
+    """
+    List ``count`` keys sequentially and with ``ParallelLister`` for each key layout.
+
+    Returns:
+        List[Dict[str, Any]]: Seconds, requests and speedup per layout and lister.
+    """
+    results = []
+    for layout in layouts:
+        store = SortedKeyStore(_keys(layout, count), latency_ms / 1000)
+        timings = {}
+        listed = {}
+        for name in ("sequential", "parallel"):
+            store.requests = 0
+            started = time.perf_counter()
+            if name == "sequential":
+                stream = iter_objects(store, BUCKET)
+            else:
+                stream = ParallelLister(store, max_workers=workers).iter_objects(BUCKET)
+            listed[name] = [obj["Key"] for obj in stream]
+            timings[name] = time.perf_counter() - started
+            results.append({"layout": layout, "lister": name, "keys": len(listed[name]),
+                            "requests": store.requests, "seconds": round(timings[name], 2)})
+        assert listed["parallel"] == listed["sequential"] == store.keys, f"{layout}: listings differ"
+        results[-1]["speedup"] = round(timings["sequential"] / timings["parallel"], 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    print(f"{'layout':<14} {'lister':<11} {'keys':>10} {'requests':>9} {'seconds':>8} {'speedup':>8}")
+    for row in benchmark(args.keys, args.latency_ms, args.workers):
+        speedup = f"{row['speedup']:.1f}x" if "speedup" in row else ""
+        print(f"{row['layout']:<14} {row['lister']:<11} {row['keys']:>10,} {row['requests']:>9} "
+              f"{row['seconds']:>8.2f} {speedup:>8}")
@@ -0,0 +1,195 @@
+"""
+Listing latency while large PDFs are parsed, with parsing inline and in the parser pool.
+
+Runs against moto's in-memory S3 with ``--latency-ms`` added to every request
+in a boto3 ``before-send`` hook, as in ``benchmarks.async_listing``. While
+``--pdf-jobs`` threads extract the text of a generated ``--pdf-pages``-page PDF,
+one thread issues ``--list-calls`` consecutive listings and records how long
+each takes. "idle" lists with no parsing going on; "inline" parses on the
+calling threads (``ParserPool(processes=0)``), as ``_parse_pdf`` did; "pool"
+ships the parses to worker processes.
+
+Afterwards the per-job limits are exercised: a parser that never returns must
+fail with ``ParserTimeoutError`` after ``--timeout`` seconds, and one that
+allocates past the worker memory limit must fail with ``MemoryError``; in both
+cases the server process keeps running and the pool serves the next job.
+
+Run with ``python -m benchmarks.parser_isolation``.
+"""
+import os
+import time
+import argparse
+import statistics
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ["S3_ENDPOINT_URL"] = ""
+
+import boto3
+from moto import mock_aws
+
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_functions import S3Client
+from src.s3_utils.s3_parser_pool import ParserPool, ParserTimeoutError, parse_pdf_content, MB
+
+BUCKET = "bench-bucket"
+REGION = "us-east-1"
+
+
+def make_pdf(pages: int, lines_per_page: int = 60) -> bytes:
+    """A text-only PDF with ``pages`` pages of ``lines_per_page`` lines each; page objects precede the contents."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    first_page, first_content = len(objects) + 1, len(objects) + 1 + pages
+    for page in range(pages):
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (first_content + page))
+    for page in range(pages):
+        lines = b"".join(b"0 -12 Td (Page %d line %d: the quick brown fox jumps over the lazy dog) Tj\n" % (page, line)
+                         for line in range(lines_per_page))
+        stream = b"BT /F1 10 Tf 40 800 Td\n" + lines + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    kids = b" ".join(b"%d 0 R" % (first_page + page) for page in range(pages))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, content in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, content)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(body)
+
+
+def _never_returns(content: bytes) -> None:
+    """A parser stuck on a pathological document."""
+    while True:
+        pass
+
+
+def _allocate(content: bytes) -> int:
+    """A parser whose working set grows without bound."""
+    chunks = []
+    while True:
+        chunks.append(bytearray(64 * MB))
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _run(mode: str, pool: ParserPool, pdf: bytes, pdf_jobs: int, list_calls: int) -> Dict[str, Any]:
+    client = S3Client(os.environ["AWS_ACCESS_KEY_ID"], os.environ["AWS_SECRET_ACCESS_KEY"], REGION)
+    done = threading.Event()
+
+    def parse() -> int:
+        parsed = 0
+        while not done.is_set():
+            pool.run(parse_pdf_content, pdf)
+            parsed += 1
+        return parsed
+
+    with ThreadPoolExecutor(max_workers=max(1, pdf_jobs)) as parsers:
+        jobs = [parsers.submit(parse) for _ in range(pdf_jobs if mode != "idle" else 0)]
+        # Let every parser get going before timing the listings
+        time.sleep(0.5 if jobs else 0)
+        latencies = []
+        for _ in range(list_calls):
+            started = time.perf_counter()
+            result = client.list_objects(BUCKET, max_keys=10)
+            latencies.append(time.perf_counter() - started)
+            assert result["status"] == "success", result
+        done.set()
+        parsed = sum(job.result() for job in jobs)
+    return {
+        "mode": mode,
+        "calls": list_calls,
+        "p50_ms": round(1000 * statistics.median(latencies), 1),
+        "p99_ms": round(1000 * _percentile(latencies, 0.99), 1),
+        "pdfs_parsed": parsed
+    }
+
+
+def check_limits(processes: int, timeout: float, memory_limit: int) -> List[Dict[str, Any]]:
+    """Run a stuck and a runaway parser in the pool and report how each one ended."""
+    pool = ParserPool(processes=processes, timeout=timeout, memory_limit=memory_limit, min_bytes=0)
+    results = []
+    try:
+        for name, func in (("timeout", _never_returns), ("memory", _allocate)):
+            started = time.perf_counter()
+            try:
+                pool.run(func, b"x")
+                outcome = "returned"
+            except (ParserTimeoutError, MemoryError) as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - started
+            # The pool must still serve ordinary jobs afterwards
+            recovered = pool.run(len, b"ok") == 2
+            results.append({"job": name, "outcome": outcome, "seconds": round(elapsed, 2), "recovered": recovered})
+    finally:
+        pool._restart(pool._get_executor())
+    results.append({"job": "stats", **pool.stats()})
+    return results
+
+
+def benchmark(pdf_pages: int = 400, pdf_jobs: int = 4, list_calls: int = 150, objects: int = 50,
+              latency_ms: float = 20.0, processes: int = 2) -> List[Dict[str, Any]]:
+    """
+    Time consecutive listings while ``pdf_jobs`` threads keep parsing a ``pdf_pages``-page PDF.
+
+    Returns:
+        List[Dict[str, Any]]: Listing p50/p99 latency and the number of PDFs parsed for each mode.
+    """
+    pdf = make_pdf(pdf_pages)
+    with mock_aws():
+        client_pool.clear()
+        setup = boto3.client("s3", region_name=REGION)
+        setup.create_bucket(Bucket=BUCKET)
+        for index in range(objects):
+            setup.put_object(Bucket=BUCKET, Key=f"data/{index:06d}.json", Body=b"{}")
+
+        def delay(**_):
+            time.sleep(latency_ms / 1000)
+
+        pooled = client_pool.get_client(os.environ["AWS_ACCESS_KEY_ID"], os.environ["AWS_SECRET_ACCESS_KEY"], REGION)
+        pooled.meta.events.register("before-send.s3", delay)
+        inline = ParserPool(processes=0)
+        workers = ParserPool(processes=processes, min_bytes=0)
+        try:
+            # Start the workers up front so process start-up is not billed to the first listings
+            workers.run(len, b"warm-up")
+            return [_run("idle", inline, pdf, pdf_jobs, list_calls),
+                    _run("inline", inline, pdf, pdf_jobs, list_calls),
+                    _run("pool", workers, pdf, pdf_jobs, list_calls)]
+        finally:
+            workers._restart(workers._get_executor())
+            client_pool.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf-pages", type=int, default=400)
+    parser.add_argument("--pdf-jobs", type=int, default=4)
+    parser.add_argument("--list-calls", type=int, default=150)
+    parser.add_argument("--objects", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--memory-limit-mb", type=int, default=512)
+    args = parser.parse_args()
+    print(f"{'mode':<8} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'pdfs parsed':>12}")
+    for row in benchmark(args.pdf_pages, args.pdf_jobs, args.list_calls, args.objects, args.latency_ms,
+                         args.processes):
+        print(f"{row['mode']:<8} {row['calls']:>6} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+              f"{row['pdfs_parsed']:>12}")
+    print()
+    for row in check_limits(args.processes, args.timeout, args.memory_limit_mb * MB):
+        print(row)
@@ -0,0 +1,185 @@
+"""
+Peak memory of reading and parsing an object, per file type, before and after buffered body reads.
+
+"before" is the original read path: ``Body.read()`` into ``bytes``, then a
+decode into ``str`` and a ``StringIO``/``BytesIO`` copy for the parser (Parquet,
+which the original code did not read, downloads whole and parses from a
+``BytesIO``). "after" is the current path: CSV and JSONL stream through
+``stream_csv``/``stream_jsonl``, JSON and PDF bodies are read into a
+preallocated buffer with ``read_body`` and parsed from it, and Parquet is read
+over ranged GETs with ``read_parquet``. Peaks are measured with tracemalloc.
+The parsed result is part of both peaks, so the memory still held afterwards
+(the result) is reported too, and the difference is the transient overhead of
+the read path, relative to the object size.
+
+Bodies come from a stand-in that behaves like botocore's ``StreamingBody``:
+no ``readinto``, and ``read()`` joins 64 KB socket chunks.
+
+Run with ``python -m benchmarks.read_memory``.
+"""
+import io
+import csv
+import json
+import time
+import argparse
+import tracemalloc
+
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.parser_isolation import make_pdf
+from src.s3_utils.s3_parquet import read_parquet
+from src.s3_utils.s3_parser_pool import MB, parse_json_content, parse_pdf_content
+from src.s3_utils.s3_ranged_io import S3RangedFile, read_body
+from src.s3_utils.s3_streaming import stream_csv, stream_jsonl
+
+BUCKET = "bench-bucket"
+_SOCKET_CHUNK = 64 * 1024
+
+
+class StreamingBodyStandIn:
+    """A body without ``readinto`` whose ``read()`` joins socket-sized chunks, like urllib3."""
+
+    def __init__(self, data: memoryview):
+        self._data = data
+        self._position = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None:
+            chunks = []
+            while self._position < len(self._data):
+                chunks.append(self.read(_SOCKET_CHUNK))
+            return b"".join(chunks)
+        chunk = self._data[self._position:self._position + amt].tobytes()
+        self._position += len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        self._position = len(self._data)
+
+
+class ObjectStore:
+    """Read-only stand-in for ``get_object`` (with Range) over in-memory objects."""
+
+    def __init__(self, objects: Dict[str, bytes]):
+        self.objects = {key: memoryview(data) for key, data in objects.items()}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None,
+                   IfMatch: Optional[str] = None) -> Dict[str, Any]:
+        data = self.objects[Key]
+        start, end = 0, len(data) - 1
+        if Range:
+            first, last = Range[len("bytes="):].split("-")
+            if not first:
+                start = max(0, len(data) - int(last))
+            else:
+                start, end = int(first), min(int(last), end) if last else end
+        return {
+            "Body": StreamingBodyStandIn(data[start:end + 1]),
+            "ContentLength": end - start + 1,
+            "ContentRange": f"bytes {start}-{end}/{len(data)}",
+            "ETag": '"bench"'
+        }
+
+
+def _payloads(rows: int, pdf_pages: int) -> Dict[str, bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    records = [{"id": index, "name": f"user-{index}", "email": f"user{index}@example.com",
+                "score": index * 0.5, "active": index % 3 == 0, "city": ("Berlin", "Paris", "Rome")[index % 3]}
+               for index in range(rows)]
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    parquet = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(records), parquet, row_group_size=50_000)
+    return {
+        "data.csv": text.getvalue().encode(),
+        "data.json": json.dumps(records).encode(),
+        "data.jsonl": "\n".join(json.dumps(record) for record in records).encode(),
+        "data.parquet": parquet.getvalue(),
+        "data.pdf": make_pdf(pdf_pages)
+    }
+
+
+def _before(store: ObjectStore, key: str) -> Any:
+    content = store.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+    kind = key.rsplit(".", 1)[1]
+    if kind == "csv":
+        return list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+    if kind == "json":
+        return json.loads(content.decode("utf-8"))
+    if kind == "jsonl":
+        import jsonlines
+
+        with io.BytesIO(content) as file:
+            return list(jsonlines.Reader(file))
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(io.BytesIO(content)).to_pylist()
+    import PyPDF2
+
+    return [page.extract_text() for page in PyPDF2.PdfReader(io.BytesIO(content)).pages]
+
+
+def _after(store: ObjectStore, key: str) -> Any:
+    kind = key.rsplit(".", 1)[1]
+    if kind == "parquet":
+        raw = S3RangedFile(store, BUCKET, key, size=len(store.objects[key]), etag="bench")
+        return read_parquet(raw)["rows"]
+    response = store.get_object(Bucket=BUCKET, Key=key)
+    if kind == "csv":
+        return stream_csv(response["Body"])["rows"]
+    if kind == "jsonl":
+        return stream_jsonl(response["Body"])["rows"]
+    content = read_body(response["Body"], response["ContentLength"])
+    return parse_json_content(content) if kind == "json" else parse_pdf_content(content)
+
+
+def _measure(read: Callable[[ObjectStore, str], Any], store: ObjectStore, key: str) -> Dict[str, float]:
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = read(store, key)
+        seconds = time.perf_counter() - started
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_mb": peak / MB, "retained_mb": retained / MB, "seconds": seconds}
+
+
+def benchmark(rows: int = 200_000, pdf_pages: int = 200) -> List[Dict[str, Any]]:
+    """
+    Read each file type through the original and the current path under tracemalloc.
+
+    Returns:
+        List[Dict[str, Any]]: Object size, peak and retained traced memory and the transient
+            overhead as a multiple of the object size, per type and path.
+    """
+    store = ObjectStore(_payloads(rows, pdf_pages))
+    results = []
+    for key, data in store.objects.items():
+        size_mb = len(data) / MB
+        for path, read in (("before", _before), ("after", _after)):
+            measured = _measure(read, store, key)
+            overhead = measured["peak_mb"] - measured["retained_mb"]
+            results.append({"type": key.rsplit(".", 1)[1], "path": path, "size_mb": round(size_mb, 1),
+                            "peak_mb": round(measured["peak_mb"], 1),
+                            "result_mb": round(measured["retained_mb"], 1),
+                            "overhead_ratio": round(overhead / size_mb, 2),
+                            "seconds": round(measured["seconds"], 2)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pdf-pages", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'type':<8} {'path':<7} {'size MB':>8} {'peak MB':>8} {'result MB':>10} {'overhead':>9} {'seconds':>8}")
+    for row in benchmark(args.rows, args.pdf_pages):
+        print(f"{row['type']:<8} {row['path']:<7} {row['size_mb']:>8.1f} {row['peak_mb']:>8.1f} "
+              f"{row['result_mb']:>10.1f} {row['overhead_ratio']:>8.2f}x {row['seconds']:>8.2f}")
@@ -0,0 +1,98 @@
+"""
+Encoding time and size of large tool results with each available JSON serializer.
+
+Payloads are synthetic listings shaped like ``s3_list_object_from_bucket``
+with metadata and a parsed CSV read. The indented standard-library encoding
+stands in for the SDK's default result text.
+
+Run with ``python -m benchmarks.serialization``.
+"""
+import json
+import time
+import random
+import argparse
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.s3_utils.s3_serialization import resolve_serializer
+
+SERIALIZERS = ("json", "orjson")
+
+
+def listing_payload(count: int) -> Dict[str, Any]:
+    """A listing response shaped like ``s3_list_object_from_bucket`` with metadata."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        "status": "success",
+        "objects": [{
+            "key": f"logs/2024/{index % 365:03d}/part-{index:08d}.json.gz",
+            "size": 1024 + index % 65536,
+            "etag": f"{index:032x}",
+            "last_modified": (start + timedelta(seconds=index)).isoformat(),
+            "storage_class": "STANDARD"
+        } for index in range(count)],
+        "is_truncated": False
+    }
+
+
+def csv_payload(count: int) -> Dict[str, Any]:
+    """A parsed CSV read (records of text values, as ``stream_csv`` returns them)."""
+    generator = random.Random(count)
+    cities = ["Berlin", "Paris", "Madrid", "Rome", "Vienna"]
+    return {
+        "status": "success",
+        "data": [{
+            "order_id": str(index),
+            "customer": f"cust-{generator.randint(1, 5000)}",
+            "city": generator.choice(cities),
+            "amount": f"{generator.uniform(1, 500):.2f}",
+            "created_at": f"2024-03-{generator.randint(1, 28):02d}T12:00:00Z"
+        } for index in range(count)],
+        "complete": True
+    }
+
+
+def benchmark(listing_sizes: Tuple[int, ...] = (10_000, 100_000, 1_000_000), csv_rows: int = 100_000,
+              repeat: int = 3, serializers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Time each serializer on synthetic listings and a parsed CSV; serializers that are not installed are skipped.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per payload and serializer with the best time and output size.
+    """
+    candidates = {}
+    for name in serializers or SERIALIZERS:
+        try:
+            candidates[name] = resolve_serializer(name)[1]
+        except ValueError:
+            continue
+    candidates["json (indent=2)"] = lambda value: json.dumps(value, indent=2, default=str)
+    payloads = [(f"listing {size:,} keys", lambda size=size: listing_payload(size)) for size in listing_sizes]
+    payloads.append((f"csv {csv_rows:,} rows", lambda: csv_payload(csv_rows)))
+
+    results = []
+    for label, build in payloads:
+        payload = build()
+        for name, serialize in candidates.items():
+            best, size = None, 0
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                size = len(serialize(payload).encode("utf-8"))
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results.append({"payload": label, "serializer": name, "seconds": round(best, 4), "bytes": size})
+        del payload
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listing-sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--csv-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--serializers", nargs="+", default=None)
+    args = parser.parse_args()
+    print(f"{'payload':<24} {'serializer':<16} {'seconds':>9} {'bytes':>14}")
+    for row in benchmark(tuple(args.listing_sizes), args.csv_rows, args.repeat, args.serializers):
+        print(f"{row['payload']:<24} {row['serializer']:<16} {row['seconds']:>9.4f} {row['bytes']:>14,}")
@@ -1,11 +1,21 @@
 import os
+import asyncio
 import platform
 import requests
+from functools import wraps
 from src.s3_utils.s3_functions import S3Client
 from src.s3_utils.s3_file_transfer import BucketWrapper, S3FileDownloader
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_async import blocking_executor
+from src.s3_utils.s3_cache import object_cache, parsed_cache
+from src.s3_utils.s3_parser_pool import parser_pool
+from src.s3_utils.s3_ranged_io import parallel_getter
+from src.s3_utils.s3_line_index import line_index_store
+from src.s3_utils.s3_serialization import dumps
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+from mcp.types import TextContent
 import logging
 import sys
 import pickle
@@ -75,11 +85,20 @@ def infer_s3_key_if_missing(s3_key: str, filename: str) -> str:
         return s3_key + filename
     return s3_key
 
+def json_tool(func):
+    """
+    Return a tool's result as one compact JSON text block, built by the configured fast serializer.
+
+    Register such tools with ``structured_output=False``: otherwise the SDK serializes
+    the result again (indented) and also sends a second, structured copy of it.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return TextContent(type="text", text=dumps(await func(*args, **kwargs)))
+    return wrapper
+
 mcp = FastMCP(
     "AWS S3 MCP Server",
-    description="A server to handle AWS S3 operations with chat-based file upload support.",
-    version="1.0.0",
-    author="Mahadevan",
     instructions="S3 API server to handle file uploads, downloads, and other utilities with natural language chat interface.",
     debug=False,
     log_level="INFO",
@@ -89,7 +108,7 @@ mcp = FastMCP(
 
 # Custom Function 1
 @mcp.tool()
-def s3_create(bucket: str, region_name: Optional[str] = None) -> Dict[str, Any]:
+async def s3_create(bucket: str, region_name: Optional[str] = None) -> Dict[str, Any]:
     """
     Description: Creates an S3 bucket in the specified region.
                 This function attempts to create a new S3 bucket with the given name and optional region.
@@ -103,7 +122,7 @@ def s3_create(bucket: str, region_name: Optional[str] = None) -> Dict[str, Any]:
     """
     try:
         s3_resource = BucketWrapper(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
-        s3_resource.create_bucket(bucket, region_name)
+        await blocking_executor.run("s3_create", s3_resource.create_bucket, bucket, region_name)
         logger.info("Created bucket: %s.", bucket)
         return {"status": "success", "message": f"Bucket '{bucket}' created successfully"}
     except requests.exceptions.RequestException as e:
@@ -111,7 +130,7 @@ def s3_create(bucket: str, region_name: Optional[str] = None) -> Dict[str, Any]:
         
 # Custom Function 2
 @mcp.tool()
-def s3_list_bucket(region_name: Optional[str] = None):
+async def s3_list_bucket(region_name: Optional[str] = None):
     """
     Description:
     Lists all S3 buckets across all regions for the current AWS account.
@@ -124,31 +143,48 @@ def s3_list_bucket(region_name: Optional[str] = None):
     """
     try:
         s3_client = S3Client(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
-        all_buckets = s3_client.list_buckets()
-        logger.info("List buckets: %s.", all_buckets)
+        all_buckets = await blocking_executor.run("s3_list_bucket", s3_client.list_buckets)
+        logger.info("Listed %d buckets.", len(all_buckets.get("buckets", [])))
         return all_buckets
     except requests.exceptions.RequestException as e:
         return {"status": "error", "message": f"List Bucket Failed: {str(e)}"}
 
 # Custom Function 3
-@mcp.tool()
-def s3_list_object_from_bucket(bucket: str, prefix: str = "", region_name: str = "eu-central-1") -> Dict[str, Any]:
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_list_object_from_bucket(bucket: str, prefix: str = "", region_name: str = "eu-central-1",
+                                     max_keys: int = 1000, start_after: Optional[str] = None,
+                                     cursor: Optional[str] = None, include_metadata: bool = False,
+                                     parallel: bool = False) -> Dict[str, Any]:
     """
     Description:
         This function interacts with the S3 client to retrieve a list of objects from the specified bucket.
         It supports filtering objects by a given prefix. Handles network and response errors gracefully.
+        Results are paginated: when more keys exist, the response carries a `next_cursor` that can be
+        passed back as `cursor` to fetch the next page.
     Args:
         bucket (str): The name of the S3 bucket to list objects from.
         prefix (str, optional): The prefix to filter objects by. Defaults to "".
         region_name (str, optional): AWS region. Defaults to "eu-central-1".
+        max_keys (int, optional): Maximum number of keys to return in this page. Defaults to 1000.
+        start_after (str, optional): Only list keys that sort after this key. Defaults to None.
+        cursor (str, optional): The `next_cursor` value from a previous call to continue the listing. Defaults to None.
+        include_metadata (bool, optional): Include size, ETag, last modified time and storage class per object. Defaults to False.
+        parallel (bool, optional): Partition the key space by prefix and list partitions concurrently.
+            Only applies to bulk pages (`max_keys` of at least S3_LIST_PARALLEL_MIN_KEYS, 10000 by default);
+            smaller pages are listed sequentially. Defaults to False.
     Returns:
-        Dict[str, Any]: A dictionary containing the listed objects if successful.
+        Dict[str, Any]: A dictionary containing the listed objects, `is_truncated` and `next_cursor` if successful.
         str: An error message if the request fails or the response is malformed.
     """
     try:
         s3_client = S3Client(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
-        objects = s3_client.list_objects(bucket, prefix)
-        logger.info("Got objects: %s.", objects)
+        objects = await blocking_executor.run(
+            "s3_list_object_from_bucket", s3_client.list_objects, bucket, prefix,
+            max_keys=max_keys, start_after=start_after, cursor=cursor, include_metadata=include_metadata,
+            parallel=parallel
+        )
+        logger.info("Got %d objects from bucket: %s.", len(objects.get("objects", [])), bucket)
         return objects
     except requests.exceptions.RequestException as e:
         return {"status": "error", "message": f"Unable to list S3 objects: {str(e)}"}
@@ -156,7 +192,7 @@ def s3_list_object_from_bucket(bucket: str, prefix: str = "", region_name: str =
 
 # Custom Function 4  
 @mcp.tool()
-def s3_download_file_presigned_url(bucket: str, object_name: str, expiration: int = 3600, region_name: str = "eu-central-1") -> Dict[str, Any]:
+async def s3_download_file_presigned_url(bucket: str, object_name: str, expiration: int = 3600, region_name: str = "eu-central-1") -> Dict[str, Any]:
     """
     Descriptions:
         Generates a presigned URL for downloading a file from an AWS S3 bucket.
@@ -182,7 +218,9 @@ def s3_download_file_presigned_url(bucket: str, object_name: str, expiration: in
         
         # Generate presigned URL with expiration parameter
         s3_download = S3FileDownloader(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
-        result = s3_download.generate_presigned_url(bucket, object_name, expiration)
+        result = await blocking_executor.run(
+            "s3_download_file_presigned_url", s3_download.generate_presigned_url, bucket, object_name, expiration
+        )
         
         if result["status"] == "error":
             logger.error("Failed to generate presigned URL for file: %s from bucket: %s. Error: %s", 
@@ -203,15 +241,50 @@ def s3_download_file_presigned_url(bucket: str, object_name: str, expiration: in
     
 
 # Custom Function 5
-@mcp.tool()
-def s3_read_file(bucket: str, object_name: str, region_name: str = "eu-central-1") -> Dict[str, Any]:
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_read_file(bucket: str, object_name: str, region_name: str = "eu-central-1",
+                       byte_start: Optional[int] = None, byte_end: Optional[int] = None,
+                       head_lines: Optional[int] = None, tail_lines: Optional[int] = None,
+                       max_bytes: Optional[int] = None, columns: Optional[List[str]] = None,
+                       offset: int = 0, limit: Optional[int] = None,
+                       filters: Optional[List[Dict[str, Any]]] = None,
+                       fields: Optional[List[str]] = None, pages: Optional[str] = None,
+                       max_pages: Optional[int] = None, cursor: Optional[str] = None,
+                       max_output_bytes: Optional[int] = None,
+                       max_output_tokens: Optional[int] = None, line_start: Optional[int] = None,
+                       line_count: int = 100, output_format: str = "records") -> Dict[str, Any]:
     """
     Description: Reads a file from an S3 bucket and returns its contents.
     This function validates the required parameters, attempts to read the specified object from the given S3 bucket using a downloader utility, and handles errors gracefully. It logs relevant information and errors, and returns a dictionary containing the status and result or error message.
+    For large objects prefer a partial read: `head_lines`/`tail_lines` return the first/last lines and `byte_start`/`byte_end` return a byte range as text, transferring only what is needed. `line_start`/`line_count` return any range of lines of an uncompressed text, CSV or JSONL object with one ranged GET, using a line-offset index built on first use (and extended, not rebuilt, when the object is appended to).
+    The file type is taken from the extension (csv, jsonl/ndjson, json, parquet, pdf, txt/md); objects without a known extension are identified from their Content-Type and leading bytes. Unsupported or oversized objects are rejected before they are downloaded. Compressed objects (.gz, .bz2, .xz, .zst, e.g. `logs.csv.gz`) are decompressed while streaming and parsed as the inner type; `head_lines` also works on them.
+    Parquet files are read footer-first over range requests: row groups are skipped using their min/max statistics for `filters`, and only the requested `columns` are downloaded, so a few rows from a multi-GB file cost megabytes.
+    Responses are capped at `max_output_bytes` (default S3_READ_MAX_OUTPUT_BYTES) of data. When a read stops early (output budget, `limit`, `max_bytes` or a capped byte range), the response has `complete: false` and a `next_cursor`; call again with the same arguments plus `cursor` to continue exactly where it stopped without re-reading the start of the object. Cursors fail once the object changes.
     Args:
         bucket (str): The name of the S3 bucket.
         object_name (str): The key (name) of the object to read from the bucket.
         region_name (str, optional): The AWS region where the bucket is located. Defaults to "eu-central-1".
+        byte_start (int, optional): First byte offset to read (inclusive). Defaults to None.
+        byte_end (int, optional): Last byte offset to read (inclusive). With no byte_start, reads the last byte_end bytes. Defaults to None.
+        head_lines (int, optional): Return only the first N lines. Defaults to None.
+        tail_lines (int, optional): Return only the last N lines. Defaults to None.
+        max_bytes (int, optional): Maximum number of bytes to transfer from S3. Defaults to None.
+        columns (List[str], optional): For CSV and Parquet files, only return these columns; Parquet fetches only these column chunks. Defaults to None.
+        offset (int, optional): For CSV, JSONL and Parquet files, number of matching rows to skip. Defaults to 0.
+        limit (int, optional): For CSV, JSONL and Parquet files, maximum number of rows to return; reading stops once reached. Defaults to None.
+        filters (List[Dict[str, Any]], optional): For CSV, JSONL and Parquet files, conditions like {"column": "age", "op": ">", "value": 5}
+            that every returned row must satisfy. JSONL columns may be JSON pointers such as "/user/id".
+            Supported ops: ==, !=, >, >=, <, <=, contains, startswith, in. Defaults to None.
+        fields (List[str], optional): For JSONL files, JSON pointers (e.g. "/user/id") to project each record onto. Defaults to None.
+        pages (str, optional): For PDF files, 1-based pages to extract, e.g. "1-3,7". Only these pages are fetched and parsed. Defaults to None.
+        max_pages (int, optional): For PDF files, maximum number of pages to extract. Use 0 to get only the page count. Defaults to None.
+        cursor (str, optional): The `next_cursor` of a previous response, to resume that read. Defaults to None.
+        max_output_bytes (int, optional): Maximum size of the returned data, measured as JSON. Defaults to None (server default).
+        max_output_tokens (int, optional): Maximum size of the returned data in approximate tokens (4 bytes each). Defaults to None.
+        line_start (int, optional): Return lines starting at this 1-based line number. Defaults to None.
+        line_count (int, optional): Number of lines to return with line_start. Defaults to 100.
+        output_format (str, optional): For CSV, JSONL and Parquet files, "records" (a list of objects, the default), "rows" ({"columns": [...], "types": {...}, "rows": [[...], ...]}) or "columns" ({"columns": [...], "types": {...}, "data": {column: [...]}}). The columnar formats name each column once and convert numeric and boolean CSV columns, typically halving the payload. Defaults to "records".
     Returns:
         Dict[str, Any]: A dictionary containing the status ("success" or "error") and either the file data or an error message.
     """
@@ -224,7 +297,14 @@ def s3_read_file(bucket: str, object_name: str, region_name: str = "eu-central-1
             }
         
         s3_read = S3FileDownloader(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
-        result = s3_read.read_file_from_s3(bucket, object_name)
+        result = await blocking_executor.run(
+            "s3_read_file", s3_read.read_file_from_s3, bucket, object_name, byte_start=byte_start,
+            byte_end=byte_end, head_lines=head_lines, tail_lines=tail_lines, max_bytes=max_bytes,
+            columns=columns, offset=offset, limit=limit, filters=filters, fields=fields,
+            pages=pages, max_pages=max_pages, cursor=cursor, max_output_bytes=max_output_bytes,
+            max_output_tokens=max_output_tokens, line_start=line_start, line_count=line_count,
+            output_format=output_format
+        )
         
         if result["status"] == "error":
             logger.error("Failed to read from file: %s from bucket: %s. Error: %s", 
@@ -242,5 +322,271 @@ def s3_read_file(bucket: str, object_name: str, region_name: str = "eu-central-1
             "message": f"Internal server error: {str(e)}"
         }
 
+
+# Custom Function 6
+@mcp.tool()
+def s3_client_pool_stats() -> Dict[str, Any]:
+    """
+    Description: Returns counters for the shared boto3 client pool.
+    Reports pool hits, misses, client creations, idle evictions and the current number of pooled
+    clients, so the reuse rate of S3 connections can be scraped and monitored.
+    Returns:
+        Dict[str, Any]: A dictionary containing the status and the pool statistics.
+    """
+    return {"status": "success", "pool": client_pool.stats()}
+
+# Custom Function 7
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_query_object_index(bucket: str, prefix: str = "", suffix: Optional[str] = None,
+                                min_size: Optional[int] = None, max_size: Optional[int] = None,
+                                modified_after: Optional[str] = None, modified_before: Optional[str] = None,
+                                storage_class: Optional[str] = None, order_by: str = "key",
+                                descending: bool = False, limit: int = 1000, offset: int = 0,
+                                refresh: bool = False, region_name: str = "eu-central-1") -> Dict[str, Any]:
+    """
+    Description: Filters and sorts objects using the local listing index instead of listing S3.
+    The index is opt-in per bucket (S3_INDEX_BUCKETS) and is refreshed automatically when stale.
+    The result reports how old the indexed data is.
+    Args:
+        bucket (str): The name of an indexed S3 bucket.
+        prefix (str, optional): Only include keys with this prefix. Defaults to "".
+        suffix (str, optional): Only include keys ending with this suffix, e.g. ".csv". Defaults to None.
+        min_size (int, optional): Minimum object size in bytes. Defaults to None.
+        max_size (int, optional): Maximum object size in bytes. Defaults to None.
+        modified_after (str, optional): ISO 8601 timestamp (any offset, UTC if none); only objects modified after it. Defaults to None.
+        modified_before (str, optional): ISO 8601 timestamp (any offset, UTC if none); only objects modified before it. Defaults to None.
+        storage_class (str, optional): Only include objects in this storage class. Defaults to None.
+        order_by (str, optional): One of "key", "size", "last_modified", "etag". Defaults to "key".
+        descending (bool, optional): Sort in descending order. Defaults to False.
+        limit (int, optional): Maximum number of objects to return. Defaults to 1000.
+        offset (int, optional): Number of matching objects to skip. Defaults to 0.
+        refresh (bool, optional): Force a full reconcile with S3 before querying. Defaults to False.
+        region_name (str, optional): AWS region. Defaults to "eu-central-1".
+    Returns:
+        Dict[str, Any]: A dictionary containing the status, matching objects and index staleness, or an error message.
+    """
+    try:
+        s3_client = S3Client(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
+        result = await blocking_executor.run(
+            "s3_query_object_index", s3_client.query_object_index, bucket, prefix, refresh=refresh,
+            suffix=suffix, min_size=min_size, max_size=max_size, modified_after=modified_after,
+            modified_before=modified_before, storage_class=storage_class, order_by=order_by,
+            descending=descending, limit=limit, offset=offset
+        )
+        logger.info("Queried listing index for bucket: %s prefix: %s.", bucket, prefix)
+        return result
+    except Exception as e:
+        logger.error("Unexpected error querying listing index: %s", str(e))
+        return {
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }
+
+# Custom Function 8
+@mcp.tool()
+def s3_cache_stats() -> Dict[str, Any]:
+    """
+    Description: Returns statistics for the S3 object content cache and the parsed-result cache.
+    Reports memory and disk hits, ETag revalidations (304 responses), misses, bytes served from cache versus
+    downloaded, evictions and the usage of each cache tier, plus how many downloads were split into parallel
+    ranged GETs and how often line indexes were reused, extended for appends or built.
+    Returns:
+        Dict[str, Any]: A dictionary containing the status and the statistics of both caches, the downloader
+            and the line index store.
+    """
+    return {
+        "status": "success",
+        "cache": object_cache.stats(),
+        "parsed_cache": parsed_cache.stats(),
+        "parallel_get": parallel_getter.stats(),
+        "line_index": line_index_store.stats()
+    }
+
+# Custom Function 9
+@mcp.tool()
+def s3_parser_pool_stats() -> Dict[str, Any]:
+    """
+    Description: Returns statistics for the worker process pool used by CPU-bound parsers (PDF, large JSON).
+    Reports jobs parsed inline versus in worker processes, timeouts, failures and pool restarts.
+    Returns:
+        Dict[str, Any]: A dictionary containing the status and the parser pool statistics.
+    """
+    return {"status": "success", "parser_pool": parser_pool.stats()}
+
+# Custom Function 10
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_query_table(bucket: str, object_name: str, select: Optional[List[str]] = None,
+                         filters: Optional[List[Dict[str, Any]]] = None, group_by: Optional[List[str]] = None,
+                         aggregates: Optional[List[Dict[str, str]]] = None, order_by: Optional[List[str]] = None,
+                         limit: Optional[int] = 100, max_bytes: Optional[int] = None,
+                         region_name: str = "eu-central-1", output_format: str = "records") -> Dict[str, Any]:
+    """
+    Description: Runs a query over a CSV, JSONL or Parquet object on the server and returns only the result rows.
+    Use this instead of s3_read_file to count, sum, average or find extremes over a large table, or to get the top rows by some column, without transferring the rows themselves.
+    CSV and JSONL objects (also compressed, e.g. .csv.gz) are streamed in batches; Parquet objects are read one row group at a time, skipping row groups ruled out by `filters` and downloading only the columns the query uses.
+    Args:
+        bucket (str): The name of the S3 bucket.
+        object_name (str): The key (name) of a CSV, JSONL or Parquet object.
+        select (List[str], optional): Columns to return when not aggregating. For JSONL, JSON pointers such as "/user/id". Defaults to all columns for CSV and Parquet.
+        filters (List[Dict[str, Any]], optional): Conditions like {"column": "age", "op": ">", "value": 5} that every row must satisfy.
+            Supported ops: ==, !=, >, >=, <, <=, contains, startswith, in. Defaults to None.
+        group_by (List[str], optional): Columns to group on; one result row per distinct combination. Defaults to None.
+        aggregates (List[Dict[str, str]], optional): Aggregates such as {"op": "sum", "column": "amount", "as": "total"}.
+            Supported ops: count (column optional), sum, avg, min, max, count_distinct. Defaults to None.
+        order_by (List[str], optional): Result columns to sort on; prefix with "-" for descending, e.g. ["-total"]. Defaults to None.
+        limit (int, optional): Maximum number of result rows. Defaults to 100.
+        max_bytes (int, optional): Stop scanning after this many bytes; the result then has "complete": false. Defaults to None.
+        region_name (str, optional): The AWS region where the bucket is located. Defaults to "eu-central-1".
+        output_format (str, optional): "records" (a list of objects, the default), "rows" ({"columns": [...], "types": {...}, "rows": [[...], ...]}) or "columns" ({"columns": [...], "types": {...}, "data": {column: [...]}}). The columnar formats name each column once and convert numeric and boolean CSV columns, typically halving the payload. Defaults to "records".
+    Returns:
+        Dict[str, Any]: A dictionary containing the status, the result rows and columns, rows scanned and matched, or an error message.
+    """
+    try:
+        if not bucket or not object_name:
+            return {
+                "status": "error",
+                "message": "Both 'bucket' and 'object_name' parameters are required"
+            }
+
+        s3_read = S3FileDownloader(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
+        result = await blocking_executor.run(
+            "s3_query_table", s3_read.query_table, bucket, object_name, select=select, filters=filters,
+            group_by=group_by, aggregates=aggregates, order_by=order_by, limit=limit, max_bytes=max_bytes,
+            output_format=output_format
+        )
+
+        if result["status"] == "error":
+            logger.error("Failed to query file: %s from bucket: %s. Error: %s",
+                         object_name, bucket, result["message"])
+            return result
+
+        logger.info("Queried file: %s from bucket: %s.", object_name, bucket)
+        return result
+
+    except Exception as e:
+        logger.error("Unexpected error querying file: %s", str(e))
+        return {
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }
+
+# Custom Function 11
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_grep(bucket: str, pattern: str, ctx: Context, prefix: str = "", suffix: Optional[str] = None,
+                  regex: bool = False, ignore_case: bool = False, max_matches_per_object: int = 10,
+                  max_matches: int = 200, max_bytes: Optional[int] = None, start_after: Optional[str] = None,
+                  region_name: str = "eu-central-1") -> Dict[str, Any]:
+    """
+    Description: Searches the lines of every object under a prefix for a text or regular expression, like grep.
+    Use this to answer questions such as "which log file mentions request id X". Objects are searched concurrently and streamed, compressed objects (.gz, .bz2, .xz, .zst) are decompressed on the fly, and binary objects are skipped.
+    The search stops once `max_matches` is reached or `max_bytes` have been downloaded; the result then has "complete": false and a "resume_after" key to pass as `start_after` to continue.
+    Args:
+        bucket (str): The name of the S3 bucket.
+        pattern (str): The text to find, or a regular expression when `regex` is true.
+        prefix (str, optional): Only search objects whose keys start with this prefix. Defaults to "".
+        suffix (str, optional): Only search objects whose keys end with this suffix, e.g. ".log". Defaults to None.
+        regex (bool, optional): Treat `pattern` as a regular expression. Defaults to False.
+        ignore_case (bool, optional): Match case-insensitively. Defaults to False.
+        max_matches_per_object (int, optional): Stop reading an object after this many matching lines. Defaults to 10.
+        max_matches (int, optional): Stop the whole search after this many matching lines. Defaults to 200.
+        max_bytes (int, optional): Maximum bytes to download across all objects. Defaults to the server limit (S3_GREP_MAX_BYTES).
+        start_after (str, optional): Resume a previous search after this key. Defaults to None.
+        region_name (str, optional): The AWS region where the bucket is located. Defaults to "eu-central-1".
+    Returns:
+        Dict[str, Any]: A dictionary containing the status, matches (key, line number, byte offset, line text) and search statistics, or an error message.
+    """
+    try:
+        if not bucket or not pattern:
+            return {
+                "status": "error",
+                "message": "Both 'bucket' and 'pattern' parameters are required"
+            }
+
+        loop = asyncio.get_running_loop()
+
+        def report_progress(searched: int, listed: int) -> None:
+            # Called from a worker thread; the notification is sent on the event loop
+            asyncio.run_coroutine_threadsafe(ctx.report_progress(searched, listed), loop)
+
+        s3_read = S3FileDownloader(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
+        result = await blocking_executor.run(
+            "s3_grep", s3_read.grep_objects, bucket, pattern, prefix=prefix, suffix=suffix, regex=regex,
+            ignore_case=ignore_case, max_matches_per_object=max_matches_per_object, max_matches=max_matches,
+            max_bytes=max_bytes, start_after=start_after, progress=report_progress
+        )
+
+        if result["status"] == "error":
+            logger.error("Failed to search bucket: %s prefix: %s. Error: %s", bucket, prefix, result["message"])
+            return result
+
+        logger.info("Searched %d objects in bucket: %s prefix: %s, %d matches.",
+                    result["objects_searched"], bucket, prefix, result["match_count"])
+        return result
+
+    except Exception as e:
+        logger.error("Unexpected error searching objects: %s", str(e))
+        return {
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }
+
+# Custom Function 12
+@mcp.tool(structured_output=False)
+@json_tool
+async def s3_read_files(bucket: str, object_names: Optional[List[str]] = None, prefix: str = "",
+                        pattern: Optional[str] = None, max_objects: int = 100, max_total_bytes: Optional[int] = None,
+                        max_bytes: Optional[int] = None, head_lines: Optional[int] = None, limit: Optional[int] = None,
+                        region_name: str = "eu-central-1") -> Dict[str, Any]:
+    """
+    Description: Reads many objects from an S3 bucket in one call and returns one result per object.
+    Use this instead of repeated s3_read_file calls when several files are needed, e.g. all config files under a prefix. Objects are fetched and parsed concurrently, each exactly as s3_read_file would.
+    The combined size of the returned data is capped by `max_total_bytes`; objects that do not fit are reported as "skipped", and objects that fail are reported with their error without failing the others.
+    Args:
+        bucket (str): The name of the S3 bucket.
+        object_names (List[str], optional): Keys to read. Defaults to None.
+        prefix (str, optional): When no keys are given, read the objects under this prefix. Defaults to "".
+        pattern (str, optional): Glob matched against the full key, e.g. "configs/*.json". Defaults to None.
+        max_objects (int, optional): Maximum number of objects to read; "truncated" is true if more matched. Defaults to 100.
+        max_total_bytes (int, optional): Maximum combined size of the returned data in bytes. Defaults to the server limit (S3_BATCH_READ_MAX_BYTES).
+        max_bytes (int, optional): Maximum bytes to transfer per object. Defaults to max_total_bytes.
+        head_lines (int, optional): Return only the first N lines of each object. Defaults to None.
+        limit (int, optional): Maximum rows per CSV, JSONL or Parquet object. Defaults to None.
+        region_name (str, optional): The AWS region where the bucket is located. Defaults to "eu-central-1".
+    Returns:
+        Dict[str, Any]: A dictionary containing the status, per-object results and counts of succeeded, failed and skipped objects, or an error message.
+    """
+    try:
+        if not bucket:
+            return {
+                "status": "error",
+                "message": "The 'bucket' parameter is required"
+            }
+
+        s3_read = S3FileDownloader(AWS_ACCESS_KEY, AWS_SECRET_KEY, region_name)
+        options = {"max_total_bytes": max_total_bytes} if max_total_bytes is not None else {}
+        result = await blocking_executor.run(
+            "s3_read_files", s3_read.read_files, bucket, object_names=object_names, prefix=prefix,
+            pattern=pattern, max_objects=max_objects, max_bytes=max_bytes, head_lines=head_lines,
+            limit=limit, **options
+        )
+
+        if result["status"] == "error":
+            logger.error("Failed to read files from bucket: %s. Error: %s", bucket, result["message"])
+            return result
+
+        logger.info("Read %d files from bucket: %s (%d failed, %d skipped).",
+                    result["succeeded"], bucket, result["failed"], result["skipped"])
+        return result
+
+    except Exception as e:
+        logger.error("Unexpected error reading files: %s", str(e))
+        return {
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }
+
 if __name__ == "__main__":
     mcp.run(transport="sse")
\ No newline at end of file
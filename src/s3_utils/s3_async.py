@@ -0,0 +1,80 @@
+import os
+import sys
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Any, Callable, Dict
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_client_pool import S3_CLIENT_POOL_SIZE
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Default the worker count to the connection pool size so threads never queue on urllib3
+S3_MCP_MAX_WORKERS = int(os.getenv("S3_MCP_MAX_WORKERS", str(S3_CLIENT_POOL_SIZE)))
+S3_MCP_TOOL_CONCURRENCY = int(os.getenv("S3_MCP_TOOL_CONCURRENCY", "32"))
+
+
+class BlockingExecutor:
+    """
+    Runs blocking boto3 work off the event loop with per-tool concurrency limits.
+
+    All calls share one bounded thread pool. Each tool additionally gets its own
+    semaphore so a burst of slow calls to one tool (e.g. large ``s3_read_file``
+    downloads) cannot occupy every worker. Per-tool limits default to
+    ``S3_MCP_TOOL_CONCURRENCY`` and can be overridden with
+    ``S3_MCP_TOOL_CONCURRENCY_<TOOL_NAME>`` (upper-cased tool name).
+    """
+
+    def __init__(self, max_workers: int = S3_MCP_MAX_WORKERS, default_limit: int = S3_MCP_TOOL_CONCURRENCY):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-mcp")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, tool_name: str) -> int:
+        """Return the concurrency limit configured for a tool."""
+        override = os.getenv(f"S3_MCP_TOOL_CONCURRENCY_{tool_name.upper()}")
+        return int(override) if override else self.default_limit
+
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(tool_name)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.limit_for(tool_name))
+                self._semaphores[tool_name] = semaphore
+            return semaphore
+
+    async def run(self, tool_name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run ``func(*args, **kwargs)`` on the worker pool and await its result.
+
+        Args:
+            tool_name (str): Name of the calling tool, used to pick its semaphore.
+            func (Callable): Blocking callable to execute.
+        Returns:
+            Any: Whatever ``func`` returns. Exceptions are re-raised in the caller.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore(tool_name):
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
+
+
+blocking_executor = BlockingExecutor()
@@ -0,0 +1,153 @@
+import os
+import sys
+import logging
+from fnmatch import fnmatchcase
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Dict, Any, Callable, List, Optional
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_listing import iter_objects
+from src.s3_utils.s3_paging import json_size
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+S3_BATCH_READ_WORKERS = int(os.getenv("S3_BATCH_READ_WORKERS", "16"))
+S3_BATCH_READ_MAX_OBJECTS = int(os.getenv("S3_BATCH_READ_MAX_OBJECTS", "100"))
+# Combined size of the data returned by one batch, measured as serialized JSON
+S3_BATCH_READ_MAX_BYTES = int(os.getenv("S3_BATCH_READ_MAX_BYTES", str(4 * 1024 * 1024)))
+
+_GLOB_CHARS = "*?["
+
+
+def glob_prefix(pattern: str) -> str:
+    """The literal part of a glob before its first wildcard, usable as a listing prefix."""
+    positions = [pattern.find(char) for char in _GLOB_CHARS if char in pattern]
+    return pattern[:min(positions)] if positions else pattern
+
+
+class BatchReader:
+    """
+    Reads many objects concurrently and returns one result per object.
+
+    Objects come from an explicit key list or from a prefix listing filtered
+    by a glob. Objects whose listed size alone would overrun ``max_total_bytes``
+    are not downloaded; the others are read on a bounded thread pool. Results
+    are then admitted in request order until their combined serialized size
+    reaches the budget, so the response stays bounded however many objects
+    match. A failing object is reported in its own entry and does not fail
+    the batch.
+
+    Args:
+        s3: A boto3 S3 client, used for listing.
+        read (Callable): Reads one object, ``read(bucket, key, **options)`` returning a status dict.
+        max_objects (int, optional): Maximum number of objects to read.
+        max_total_bytes (int, optional): Budget for the combined size of the returned data.
+        max_workers (int, optional): Objects read concurrently.
+    """
+
+    def __init__(self, s3, read: Callable[..., Dict[str, Any]], max_objects: int = S3_BATCH_READ_MAX_OBJECTS,
+                 max_total_bytes: int = S3_BATCH_READ_MAX_BYTES, max_workers: int = S3_BATCH_READ_WORKERS):
+        self.s3 = s3
+        self.read = read
+        self.max_objects = max_objects
+        self.max_total_bytes = max_total_bytes
+        self.max_workers = max(1, max_workers)
+
+    def resolve(self, bucket: str, object_names: Optional[List[str]] = None, prefix: str = "",
+                pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the objects to read as ``{"key", "size"}``; ``size`` is None for explicit keys.
+
+        At most ``max_objects + 1`` entries are returned, so callers can tell the selection was cut.
+        """
+        if object_names:
+            # Keep the caller's order, dropping duplicates
+            return [{"key": key, "size": None} for key in dict.fromkeys(object_names)][:self.max_objects + 1]
+
+        list_prefix = prefix
+        if pattern:
+            # Narrow the listing to the glob's literal head when it extends the prefix
+            literal = glob_prefix(pattern)
+            if literal.startswith(prefix):
+                list_prefix = literal
+        targets = []
+        for obj in iter_objects(self.s3, bucket, list_prefix):
+            key = obj["Key"]
+            if key.endswith("/") or (pattern and not fnmatchcase(key, pattern)):
+                continue
+            targets.append({"key": key, "size": obj.get("Size")})
+            if len(targets) > self.max_objects:
+                break
+        return targets
+
+    def run(self, bucket: str, targets: List[Dict[str, Any]], **options) -> Dict[str, Any]:
+        """
+        Read ``targets`` concurrently, passing ``options`` to every read.
+
+        Returns:
+            Dict[str, Any]: ``results`` (one entry per object, in request order), counts of
+                ``succeeded``, ``failed`` and ``skipped`` objects, ``bytes_returned`` and ``truncated``.
+        """
+        truncated = len(targets) > self.max_objects
+        targets = targets[:self.max_objects]
+
+        # Listed sizes let objects that cannot fit be skipped before any download
+        to_read, planned = [], 0
+        for target in targets:
+            size = target["size"]
+            if size is not None and planned + size > self.max_total_bytes:
+                continue
+            planned += size or 0
+            to_read.append(target["key"])
+
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        if to_read:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_read)),
+                                    thread_name_prefix="s3-batch") as pool:
+                futures = {key: pool.submit(self._read_one, bucket, key, options) for key in to_read}
+                outcomes = {key: future.result() for key, future in futures.items()}
+
+        results = []
+        returned = 0
+        counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+        for target in targets:
+            key = target["key"]
+            outcome = outcomes.get(key)
+            if outcome is None:
+                entry = {"key": key, "status": "skipped", "message": "Object exceeds the remaining batch byte budget"}
+            elif outcome["status"] != "success":
+                entry = {"key": key, **outcome}
+            else:
+                size = json_size(outcome.get("data"))
+                if returned + size > self.max_total_bytes:
+                    entry = {"key": key, "status": "skipped",
+                             "message": f"Result of {size} bytes exceeds the remaining batch byte budget"}
+                else:
+                    returned += size
+                    entry = {"key": key, **outcome}
+            counts[{"success": "succeeded", "skipped": "skipped"}.get(entry["status"], "failed")] += 1
+            results.append(entry)
+
+        return {
+            "results": results,
+            **counts,
+            "bytes_returned": returned,
+            "truncated": truncated
+        }
+
+    def _read_one(self, bucket: str, key: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.read(bucket, key, **options)
+        except Exception as e:
+            logger.warning("Batch read of %s failed: %s", key, str(e))
+            return {"status": "error", "message": str(e)}
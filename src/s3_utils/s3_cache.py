@@ -0,0 +1,590 @@
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+from botocore.exceptions import ClientError
+
+from src.s3_utils.s3_ranged_io import parallel_getter, SpilledBuffer
+from src.s3_utils.s3_serialization import dumps
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MB = 1024 * 1024
+
+S3_CACHE_ENABLED = os.getenv("S3_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+S3_CACHE_MEMORY_BYTES = int(os.getenv("S3_CACHE_MEMORY_BYTES", str(256 * MB)))
+S3_CACHE_DISK_DIR = os.getenv("S3_CACHE_DISK_DIR", "/tmp/s3_mcp_cache")
+S3_CACHE_DISK_BYTES = int(os.getenv("S3_CACHE_DISK_BYTES", str(2048 * MB)))
+S3_CACHE_MAX_OBJECT_BYTES = int(os.getenv("S3_CACHE_MAX_OBJECT_BYTES", str(64 * MB)))
+# Seconds a cached object is trusted without a conditional GET; 0 revalidates on every read
+S3_CACHE_REVALIDATE_SECONDS = float(os.getenv("S3_CACHE_REVALIDATE_SECONDS", "0"))
+# "lru" evicts the least recently used entry, "lfu" the least frequently used one,
+# "size" the largest one
+S3_CACHE_EVICTION = os.getenv("S3_CACHE_EVICTION", "lru").lower()
+
+S3_PARSED_CACHE_ENABLED = os.getenv("S3_PARSED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+S3_PARSED_CACHE_MEMORY_BYTES = int(os.getenv("S3_PARSED_CACHE_MEMORY_BYTES", str(128 * MB)))
+# Leave empty to keep parsed results in memory only
+S3_PARSED_CACHE_DISK_DIR = os.getenv("S3_PARSED_CACHE_DISK_DIR", "/tmp/s3_mcp_cache/parsed")
+S3_PARSED_CACHE_DISK_BYTES = int(os.getenv("S3_PARSED_CACHE_DISK_BYTES", str(1024 * MB)))
+S3_PARSED_CACHE_EVICTION = os.getenv("S3_PARSED_CACHE_EVICTION", "size").lower()
+# Results that took less time than this to produce are cheaper to recompute than to cache
+S3_PARSED_CACHE_MIN_SECONDS = float(os.getenv("S3_PARSED_CACHE_MIN_SECONDS", "0.05"))
+
+
+def _is_not_modified(error: ClientError) -> bool:
+    """botocore surfaces a 304 response to a conditional GET as a ClientError."""
+    status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return status == 304 or error.response.get("Error", {}).get("Code") in ("304", "NotModified")
+
+
+class _Tier:
+    """A byte-budgeted store with LRU or LFU eviction. Not thread-safe on its own."""
+
+    def __init__(self, budget: int, policy: str):
+        self.budget = budget
+        self.policy = policy
+        self.size = 0
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def touch(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry["uses"] += 1
+            self.entries.move_to_end(name)
+        return entry
+
+    def add(self, name: str, size: int, **fields) -> None:
+        self.discard(name)
+        self.entries[name] = {"size": size, "uses": 1, **fields}
+        self.size += size
+
+    def discard(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            self.size -= entry["size"]
+        return entry
+
+    def victims(self) -> list:
+        """Return entry names to evict, in order, so the tier fits its budget."""
+        excess = self.size - self.budget
+        if excess <= 0:
+            return []
+        # Ties keep recency order since sorted() is stable
+        if self.policy == "lfu":
+            candidates = sorted(self.entries, key=lambda name: self.entries[name]["uses"])
+        elif self.policy == "size":
+            candidates = sorted(self.entries, key=lambda name: self.entries[name]["size"], reverse=True)
+        else:
+            candidates = list(self.entries)
+        chosen = []
+        for name in candidates:
+            if excess <= 0:
+                break
+            chosen.append(name)
+            excess -= self.entries[name]["size"]
+        return chosen
+
+
+class ObjectCache:
+    """
+    Two-tier cache of raw S3 object bodies, validated by ETag.
+
+    Objects are stored under (bucket, key, ETag). A read first looks up the
+    latest known ETag for (bucket, key) and issues a conditional GET with
+    ``If-None-Match``; a 304 response means the cached bytes are served with
+    no body transfer. Bodies live in a byte-budgeted in-memory tier and are
+    spilled to an on-disk tier when evicted from memory. Disk reads and writes
+    happen outside the cache lock; only the bookkeeping is serialized.
+    """
+
+    def __init__(self, enabled: bool = S3_CACHE_ENABLED, memory_bytes: int = S3_CACHE_MEMORY_BYTES,
+                 disk_dir: Optional[str] = S3_CACHE_DISK_DIR, disk_bytes: int = S3_CACHE_DISK_BYTES,
+                 max_object_bytes: int = S3_CACHE_MAX_OBJECT_BYTES,
+                 revalidate_seconds: float = S3_CACHE_REVALIDATE_SECONDS, eviction: str = S3_CACHE_EVICTION):
+        self.enabled = enabled
+        self.disk_dir = disk_dir
+        self.max_object_bytes = max_object_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.eviction = eviction
+        self._memory = _Tier(memory_bytes, eviction)
+        self._disk = _Tier(disk_bytes if disk_dir else 0, eviction)
+        # (bucket, key) -> metadata, including the ETag, of the version held in either tier
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Bodies evicted from memory whose disk write has not finished yet
+        self._pending: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0, "disk_hits": 0, "revalidations": 0, "misses": 0,
+            "bytes_served": 0, "bytes_downloaded": 0, "evictions": 0
+        }
+        if self.enabled and self.disk_dir:
+            self._load_disk_index()
+
+    @staticmethod
+    def _name(bucket: str, key: str, etag: str) -> str:
+        return hashlib.sha256(f"{bucket}\0{key}\0{etag}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, name: str, suffix: str = ".bin") -> str:
+        return os.path.join(self.disk_dir, name[:2], name + suffix)
+
+    def _load_disk_index(self) -> None:
+        """Rebuild the disk tier from previous runs, oldest files first."""
+        found = []
+        for root, _, files in os.walk(self.disk_dir):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                meta_path = os.path.join(root, file_name)
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as meta_file:
+                        meta = json.load(meta_file)
+                    data_path = meta_path[:-len(".json")] + ".bin"
+                    found.append((os.path.getmtime(data_path), file_name[:-len(".json")], meta,
+                                  os.path.getsize(data_path)))
+                except (OSError, ValueError):
+                    continue
+        for _, name, meta, size in sorted(found, key=lambda item: item[0]):
+            self._disk.add(name, size, meta=meta)
+            latest = self._latest.get((meta["bucket"], meta["key"]))
+            if latest is None or meta.get("validated_at", 0) >= latest.get("validated_at", 0):
+                self._latest[(meta["bucket"], meta["key"])] = meta
+        if found:
+            logger.info("Loaded %d cached objects from %s.", len(found), self.disk_dir)
+
+    def _forget(self, name: str, meta: Dict[str, Any]) -> None:
+        """Drop the latest-ETag record of an entry that left the cache. Caller must hold the lock."""
+        location = (meta["bucket"], meta["key"])
+        latest = self._latest.get(location)
+        if latest is not None and self._name(*location, latest["etag"]) == name:
+            del self._latest[location]
+
+    def _evict(self) -> Tuple[list, list]:
+        """
+        Enforce tier budgets. Caller must hold the lock.
+
+        Only the bookkeeping happens here: bodies evicted from memory are
+        reserved in the disk tier and stay readable from ``_pending`` until
+        ``_flush`` has written them.
+
+        Returns:
+            Tuple[list, list]: The (name, data, meta) spills and the entry names whose files
+                must be deleted, for ``_flush`` to carry out once the lock is released.
+        """
+        spills, removals = [], []
+        for name in self._memory.victims():
+            entry = self._memory.discard(name)
+            self._stats["evictions"] += 1
+            if self.disk_dir and self._disk.budget and name not in self._disk.entries:
+                self._disk.add(name, entry["size"], meta=entry["meta"])
+                self._pending[name] = entry["data"]
+                spills.append((name, entry["data"], entry["meta"]))
+            elif name not in self._disk.entries:
+                self._forget(name, entry["meta"])
+        for name in self._disk.victims():
+            entry = self._disk.discard(name)
+            self._stats["evictions"] += 1
+            self._forget(name, entry["meta"])
+            # A body still being written is deleted by ``_flush`` once the write finishes
+            if self._pending.pop(name, None) is None:
+                removals.append(name)
+        return spills, removals
+
+    def _flush(self, work: Tuple[list, list]) -> None:
+        """Write spilled bodies and delete evicted files. Must be called without holding the lock."""
+        spills, removals = work
+        for name, data, meta in spills:
+            written = self._write_disk(name, data, meta)
+            with self._lock:
+                wanted = self._pending.pop(name, None) is not None
+                if wanted and not written:
+                    self._disk.discard(name)
+            if written and not wanted:
+                # Evicted from the disk tier while the write was in flight
+                removals.append(name)
+        for name in removals:
+            for suffix in (".bin", ".json"):
+                try:
+                    os.remove(self._disk_path(name, suffix))
+                except OSError:
+                    pass
+
+    def _write_disk(self, name: str, data: bytes, meta: Dict[str, Any]) -> bool:
+        path = self._disk_path(name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as data_file:
+                data_file.write(data)
+            os.replace(temp_path, path)
+            with open(self._disk_path(name, ".json"), "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file)
+            return True
+        except OSError as e:
+            logger.error("Failed to write cache entry to disk: %s", str(e))
+            return False
+
+    def _lookup(self, bucket: str, key: str) -> Tuple[Optional[bytes], Optional[Dict[str, Any]]]:
+        """
+        Return the cached bytes and metadata of the latest known version of an object.
+
+        Memory hits are served under the lock; disk reads happen outside it so one
+        large file read never blocks other cached reads.
+        """
+        with self._lock:
+            meta = self._latest.get((bucket, key))
+            if meta is None:
+                return None, None
+            name = self._name(bucket, key, meta["etag"])
+            entry = self._memory.touch(name)
+            if entry is not None:
+                self._stats["memory_hits"] += 1
+                return entry["data"], meta
+            on_disk = self._disk.touch(name) is not None
+            data = self._pending.get(name) if on_disk else None
+            if data is not None:
+                self._stats["disk_hits"] += 1
+                return data, meta
+        if not on_disk:
+            return None, None
+        try:
+            with open(self._disk_path(name), "rb") as data_file:
+                data = data_file.read()
+        except OSError:
+            data = None
+        with self._lock:
+            if data is None:
+                entry = self._disk.discard(name)
+                if entry is not None:
+                    self._forget(name, entry["meta"])
+                return None, None
+            self._stats["disk_hits"] += 1
+        return data, meta
+
+    def _store(self, bucket: str, key: str, data: bytes, meta: Dict[str, Any]) -> None:
+        """Cache a body under its ETag, spilling memory victims to disk outside the lock."""
+        # Spilled bodies are already file-backed; holding them would pin their temporary files
+        if len(data) > self.max_object_bytes or not meta.get("etag") or isinstance(data, SpilledBuffer):
+            return
+        removals = []
+        with self._lock:
+            previous = self._latest.get((bucket, key))
+            if previous is not None and previous["etag"] != meta["etag"]:
+                # The old version can never be served again; free its space now
+                old = self._name(bucket, key, previous["etag"])
+                self._memory.discard(old)
+                if self._disk.discard(old) is not None and self._pending.pop(old, None) is None:
+                    removals.append(old)
+            self._latest[(bucket, key)] = meta
+            self._memory.add(self._name(bucket, key, meta["etag"]), len(data), data=data, meta=meta)
+            spills, evicted = self._evict()
+        self._flush((spills, removals + evicted))
+
+    @staticmethod
+    def _meta(bucket: str, key: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "bucket": bucket,
+            "key": key,
+            "etag": (response.get("ETag") or "").strip('"'),
+            "version_id": response.get("VersionId"),
+            "content_type": response.get("ContentType", "application/octet-stream"),
+            "size": response.get("ContentLength"),
+            "validated_at": time.time()
+        }
+
+    def _cached(self, s3, bucket: str, key: str) -> Tuple[Optional[bytes], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Return (cached bytes, metadata, live response).
+
+        When the cached entry is stale, a conditional GET is issued; a 200
+        response is handed back unread as the live response.
+        """
+        data, meta = self._lookup(bucket, key)
+        if data is None:
+            return None, None, None
+        if time.time() - meta["validated_at"] < self.revalidate_seconds:
+            return data, meta, None
+        try:
+            response = s3.get_object(Bucket=bucket, Key=key, IfNoneMatch=f'"{meta["etag"]}"')
+        except ClientError as e:
+            if not _is_not_modified(e):
+                raise
+            with self._lock:
+                meta["validated_at"] = time.time()
+                self._stats["revalidations"] += 1
+            return data, meta, None
+        return None, None, response
+
+    def get(self, s3, bucket: str, key: str) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Return the full object body and its metadata, from cache when still valid.
+
+        Returns:
+            Tuple[bytes, Dict[str, Any]]: The body and metadata (etag, version_id, content_type, size, cache).
+        """
+        if not self.enabled:
+            data, response = parallel_getter.read(s3, bucket, key)
+            return data, {**self._meta(bucket, key, response), "cache": "disabled"}
+
+        data, meta, response = self._cached(s3, bucket, key)
+        if data is not None:
+            with self._lock:
+                self._stats["bytes_served"] += len(data)
+            return data, {**meta, "cache": "hit"}
+
+        data, response = parallel_getter.read(s3, bucket, key, response)
+        meta = self._meta(bucket, key, response)
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["bytes_downloaded"] += len(data)
+        self._store(bucket, key, data, meta)
+        return data, {**meta, "cache": "miss"}
+
+    def open(self, s3, bucket: str, key: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Return a readable body for streaming parsers.
+
+        A valid cached copy is served from memory; otherwise the live S3 body is
+        returned unread so that streaming readers can stop early. Bodies read
+        this way are not added to the cache, since they may be consumed partially.
+        """
+        if self.enabled:
+            data, meta, response = self._cached(s3, bucket, key)
+            if data is not None:
+                with self._lock:
+                    self._stats["bytes_served"] += len(data)
+                return io.BytesIO(data), {**meta, "cache": "hit"}
+        else:
+            response = None
+        if response is None:
+            response = s3.get_object(Bucket=bucket, Key=key)
+        with self._lock:
+            self._stats["misses"] += 1
+        return response["Body"], {**self._meta(bucket, key, response), "cache": "miss"}
+
+    def known_meta(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return metadata of the cached version of an object without contacting S3; it may be stale."""
+        with self._lock:
+            meta = self._latest.get((bucket, key))
+            return dict(meta) if meta else None
+
+    def clear(self) -> None:
+        """Drop every cached entry from memory and disk."""
+        with self._lock:
+            self._memory.budget, memory_budget = 0, self._memory.budget
+            self._disk.budget, disk_budget = 0, self._disk.budget
+            work = self._evict()
+            self._memory.budget, self._disk.budget = memory_budget, disk_budget
+            self._latest.clear()
+        self._flush(work)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/byte counters and tier usage."""
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "eviction": self.eviction,
+                "memory_bytes": self._memory.size,
+                "memory_budget": self._memory.budget,
+                "memory_entries": len(self._memory.entries),
+                "disk_bytes": self._disk.size,
+                "disk_budget": self._disk.budget,
+                "disk_entries": len(self._disk.entries)
+            }
+
+
+class ParsedResultCache:
+    """
+    Cache of parser outputs keyed by (bucket, key, ETag, parser, parser options).
+
+    Parsing a large PDF or JSON document costs far more CPU than fetching it,
+    so results are kept in memory with a byte budget, where an entry's size is
+    the length of its compact JSON encoding. Only results that took at least
+    ``min_seconds`` to produce are stored. With a disk directory configured,
+    results are also written as zlib-compressed JSON by a background thread
+    so they survive restarts; disk entries are looked up lazily by name.
+    """
+
+    def __init__(self, enabled: bool = S3_PARSED_CACHE_ENABLED, memory_bytes: int = S3_PARSED_CACHE_MEMORY_BYTES,
+                 disk_dir: Optional[str] = S3_PARSED_CACHE_DISK_DIR, disk_bytes: int = S3_PARSED_CACHE_DISK_BYTES,
+                 eviction: str = S3_PARSED_CACHE_EVICTION, min_seconds: float = S3_PARSED_CACHE_MIN_SECONDS):
+        self.enabled = enabled
+        self.disk_dir = disk_dir or None
+        self.eviction = eviction
+        self.min_seconds = min_seconds
+        self._memory = _Tier(memory_bytes, eviction)
+        self._disk = _Tier(disk_bytes if self.disk_dir else 0, eviction)
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="s3-parsed-cache") if self.disk_dir else None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "skipped": 0, "evictions": 0}
+        if self.enabled and self.disk_dir:
+            self._load_disk_index()
+
+    @staticmethod
+    def _name(bucket: str, key: str, etag: str, parser: str, options: Optional[Dict[str, Any]]) -> str:
+        options_key = json.dumps(options or {}, sort_keys=True, separators=(",", ":"), default=str)
+        raw = f"{bucket}\0{key}\0{etag}\0{parser}\0{options_key}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, name: str) -> str:
+        return os.path.join(self.disk_dir, name[:2], name + ".json.z")
+
+    def _load_disk_index(self) -> None:
+        found = []
+        for root, _, files in os.walk(self.disk_dir):
+            for file_name in files:
+                if file_name.endswith(".json.z"):
+                    path = os.path.join(root, file_name)
+                    try:
+                        found.append((os.path.getmtime(path), file_name[:-len(".json.z")], os.path.getsize(path)))
+                    except OSError:
+                        continue
+        for _, name, size in sorted(found):
+            self._disk.add(name, size)
+
+    def _evict(self) -> list:
+        """Enforce tier budgets. Caller must hold the lock; returns disk entries whose files must be deleted."""
+        for name in self._memory.victims():
+            self._memory.discard(name)
+            self._stats["evictions"] += 1
+        removals = []
+        for name in self._disk.victims():
+            self._disk.discard(name)
+            self._stats["evictions"] += 1
+            removals.append(name)
+        return removals
+
+    def _remove_files(self, names: list) -> None:
+        for name in names:
+            try:
+                os.remove(self._disk_path(name))
+            except OSError:
+                pass
+
+    def get(self, bucket: str, key: str, etag: Optional[str], parser: str,
+            options: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """
+        Look up a parsed result.
+
+        Returns:
+            Tuple[bool, Any]: (found, value); the flag distinguishes a cached ``None`` from a miss.
+        """
+        if not self.enabled or not etag:
+            return False, None
+        name = self._name(bucket, key, etag, parser, options)
+        with self._lock:
+            entry = self._memory.touch(name)
+            if entry is not None:
+                self._stats["memory_hits"] += 1
+                return True, entry["value"]
+            on_disk = self._disk.touch(name) is not None
+        if on_disk:
+            try:
+                with open(self._disk_path(name), "rb") as data_file:
+                    encoded = zlib.decompress(data_file.read())
+                value = json.loads(encoded)
+            except (OSError, ValueError, zlib.error):
+                with self._lock:
+                    self._disk.discard(name)
+            else:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._memory.add(name, len(encoded), value=value)
+                    removals = self._evict()
+                self._remove_files(removals)
+                return True, value
+        with self._lock:
+            self._stats["misses"] += 1
+        return False, None
+
+    def put(self, bucket: str, key: str, etag: Optional[str], parser: str, value: Any,
+            options: Optional[Dict[str, Any]] = None, elapsed: Optional[float] = None) -> None:
+        """
+        Store a parsed result that took ``elapsed`` seconds to produce.
+
+        Results produced faster than ``min_seconds`` and values that cannot be
+        encoded as JSON are skipped. The disk copy is written in the background.
+        """
+        if not self.enabled or not etag:
+            return
+        if elapsed is not None and elapsed < self.min_seconds:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return
+        name = self._name(bucket, key, etag, parser, options)
+        try:
+            encoded = dumps(value).encode("utf-8")
+        except (TypeError, ValueError):
+            return
+        if self._memory.budget and len(encoded) > self._memory.budget:
+            return
+
+        with self._lock:
+            self._memory.add(name, len(encoded), value=value)
+            self._stats["stores"] += 1
+            removals = self._evict()
+        self._remove_files(removals)
+        if self._writer is not None:
+            self._writer.submit(self._write_disk, name, encoded)
+
+    def _write_disk(self, name: str, encoded: bytes) -> None:
+        """Compress and persist one result; runs on the writer thread."""
+        compressed = zlib.compress(encoded, 6)
+        path = self._disk_path(name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as data_file:
+                data_file.write(compressed)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.error("Failed to write parsed result to disk: %s", str(e))
+            return
+        with self._lock:
+            self._disk.add(name, len(compressed))
+            removals = self._evict()
+        self._remove_files(removals)
+
+    def flush(self) -> None:
+        """Wait for queued disk writes to finish."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier usage."""
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "eviction": self.eviction,
+                "min_seconds": self.min_seconds,
+                "memory_bytes": self._memory.size,
+                "memory_budget": self._memory.budget,
+                "memory_entries": len(self._memory.entries),
+                "disk_bytes": self._disk.size,
+                "disk_budget": self._disk.budget,
+                "disk_entries": len(self._disk.entries)
+            }
+
+
+object_cache = ObjectCache()
+parsed_cache = ParsedResultCache()
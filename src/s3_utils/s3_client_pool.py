@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import hashlib
+import logging
+import threading
+
+import boto3
+from botocore.config import Config
+from dotenv import load_dotenv
+
+from typing import Dict, Any, Optional, Tuple
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_CLIENT_POOL_SIZE = int(os.getenv("S3_CLIENT_POOL_SIZE", "50"))
+S3_CLIENT_IDLE_TTL = float(os.getenv("S3_CLIENT_IDLE_TTL", "900"))
+
+
+class S3ClientPool:
+    """
+    Process-wide registry of boto3 S3 clients.
+
+    Building a boto3 client resolves the endpoint, walks the credential chain and
+    starts with a cold urllib3 connection pool, so wrappers should borrow a shared
+    client from this registry instead of calling ``boto3.client`` per request.
+    Clients are keyed by (region, endpoint, credentials) and evicted once they
+    have been idle for longer than ``idle_ttl`` seconds.
+
+    boto3 clients are thread-safe and can be shared freely; resources are not.
+    ``get_resource`` therefore never shares a resource between threads: each
+    thread builds its own, wired to the pooled client so connections are reused.
+    """
+
+    def __init__(self, max_pool_connections: int = S3_CLIENT_POOL_SIZE,
+                 idle_ttl: float = S3_CLIENT_IDLE_TTL, endpoint_url: Optional[str] = S3_ENDPOINT_URL):
+        self.max_pool_connections = max_pool_connections
+        self.idle_ttl = idle_ttl
+        self.endpoint_url = endpoint_url
+        self._entries: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"hits": 0, "misses": 0, "creations": 0, "evictions": 0, "resources": 0}
+
+    @staticmethod
+    def _credential_fingerprint(access_key: Optional[str], secret_key: Optional[str]) -> str:
+        """Hash the credential pair so secrets are never kept in registry keys."""
+        raw = f"{access_key or ''}:{secret_key or ''}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _key(self, access_key: Optional[str], secret_key: Optional[str],
+             region_name: Optional[str], endpoint_url: Optional[str]) -> Tuple:
+        return (region_name, endpoint_url, self._credential_fingerprint(access_key, secret_key))
+
+    def _build(self, access_key: Optional[str], secret_key: Optional[str],
+               region_name: Optional[str], endpoint_url: Optional[str]):
+        config = Config(max_pool_connections=self.max_pool_connections)
+        return boto3.client(
+            "s3",
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region_name,
+            endpoint_url=endpoint_url,
+            config=config
+        )
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop entries idle for longer than the TTL. Caller must hold the lock."""
+        if self.idle_ttl <= 0:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry["last_used"] > self.idle_ttl]
+        for key in expired:
+            del self._entries[key]
+            self._stats["evictions"] += 1
+        if expired:
+            logger.info("Evicted %d idle S3 client(s) from pool.", len(expired))
+
+    def get_client(self, access_key: Optional[str], secret_key: Optional[str],
+                   region_name: Optional[str] = None, endpoint_url: Optional[str] = None):
+        """Return a shared boto3 S3 client for the given region, endpoint and credentials."""
+        endpoint_url = endpoint_url if endpoint_url is not None else self.endpoint_url
+        key = self._key(access_key, secret_key, region_name, endpoint_url)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["last_used"] = now
+                self._stats["hits"] += 1
+                return entry["value"]
+            self._stats["misses"] += 1
+            # Built under the lock so concurrent first requests share a single client
+            value = self._build(access_key, secret_key, region_name, endpoint_url)
+            self._entries[key] = {"value": value, "last_used": now}
+            self._stats["creations"] += 1
+            logger.info("Created pooled S3 client for region: %s.", region_name)
+            return value
+
+    def get_resource(self, access_key: Optional[str], secret_key: Optional[str],
+                     region_name: Optional[str] = None, endpoint_url: Optional[str] = None):
+        """
+        Return the calling thread's boto3 S3 resource for the given region, endpoint and credentials.
+
+        The resource is private to the thread; its ``meta.client`` is the pooled
+        client, so it is rebuilt whenever that client has been evicted.
+        """
+        client = self.get_client(access_key, secret_key, region_name, endpoint_url)
+        endpoint_url = endpoint_url if endpoint_url is not None else self.endpoint_url
+        key = self._key(access_key, secret_key, region_name, endpoint_url)
+        resources = getattr(self._local, "resources", None)
+        if resources is None:
+            resources = self._local.resources = {}
+        resource = resources.get(key)
+        if resource is None or resource.meta.client is not client:
+            session = boto3.session.Session(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region_name
+            )
+            resource = session.resource("s3", endpoint_url=endpoint_url,
+                                        config=Config(max_pool_connections=self.max_pool_connections))
+            # Actions go through the shared client and its warm connection pool
+            resource.meta.client = client
+            resources[key] = resource
+            with self._lock:
+                self._stats["resources"] += 1
+        return resource
+
+    def clear(self) -> None:
+        """Drop every pooled client; threads rebuild their resources on next use."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters and current size."""
+        with self._lock:
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_pool_connections": self.max_pool_connections,
+                "idle_ttl": self.idle_ttl
+            }
+
+
+client_pool = S3ClientPool()
@@ -0,0 +1,116 @@
+import re
+import sys
+import math
+import logging
+
+from typing import Dict, Any, List, Optional, Tuple
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# "records" is a list of objects; "rows" a header plus value arrays; "columns" one array per column
+OUTPUT_FORMATS = ("records", "rows", "columns")
+
+# Numbers with leading zeros (zip codes, IDs) must stay text
+_LEADING_ZERO = re.compile(r"^[+-]?0\d")
+_BOOLEANS = {"true": True, "false": False}
+
+
+def check_output_format(output_format: str) -> None:
+    """
+    Raises:
+        ValueError: If ``output_format`` is not one of ``OUTPUT_FORMATS``.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output_format: {output_format}; use one of {list(OUTPUT_FORMATS)}")
+
+
+def _value_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    return type(value).__name__
+
+
+def infer_column(values: List[Any], from_text: bool = False) -> Tuple[List[Any], str]:
+    """
+    Infer the type of one column, converting text values when ``from_text`` is set.
+
+    CSV columns arrive as strings: a column whose non-empty values all parse as
+    integers, floats or booleans is converted, with empty values becoming None.
+    Other columns keep their values and report the common type, "float" for a
+    mix of integers and floats, "mixed" otherwise or "null" when all are None.
+
+    Returns:
+        Tuple[List[Any], str]: The (possibly converted) values and the type name.
+    """
+    present = [value for value in values if value is not None and value != ""]
+    if from_text and present and all(isinstance(value, str) for value in present):
+        if not any(_LEADING_ZERO.match(value) for value in present):
+            for name, convert in (("int", int), ("float", float)):
+                try:
+                    converted = [None if value is None or value == "" else convert(value) for value in values]
+                except ValueError:
+                    continue
+                # nan and inf parse as floats but are not valid JSON
+                if name == "int" or all(math.isfinite(value) for value in converted if value is not None):
+                    return converted, name
+        if all(value.lower() in _BOOLEANS for value in present):
+            return [None if value is None or value == "" else _BOOLEANS[value.lower()] for value in values], "bool"
+        return values, "str"
+
+    types = {_value_type(value) for value in values if value is not None}
+    if not types:
+        return values, "null"
+    if len(types) == 1:
+        return values, types.pop()
+    return values, "float" if types == {"int", "float"} else "mixed"
+
+
+def encode_table(rows: List[Dict[str, Any]], output_format: str = "records", columns: Optional[List[str]] = None,
+                 from_text: bool = False) -> Any:
+    """
+    Encode a list of row objects in one of ``OUTPUT_FORMATS``.
+
+    The columnar formats state each column name once instead of once per row
+    and carry a ``types`` map; rows missing a column hold None in it.
+
+    Args:
+        rows (List[Dict[str, Any]]): The rows, as returned by the tabular readers.
+        output_format (str, optional): "records" (unchanged), "rows" (``columns`` plus
+            ``rows`` of value arrays) or "columns" (``columns`` plus ``data``, one array per column).
+        columns (List[str], optional): Column order; defaults to the keys in order of first appearance.
+        from_text (bool, optional): Values are CSV text; convert numeric and boolean columns.
+
+    Raises:
+        ValueError: If ``output_format`` is unknown.
+    """
+    check_output_format(output_format)
+    if output_format == "records":
+        return rows
+    if columns is None:
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+
+    types = {}
+    data = {}
+    for column in columns:
+        data[column], types[column] = infer_column([row.get(column) for row in rows], from_text)
+    if output_format == "columns":
+        return {"columns": columns, "types": types, "data": data}
+    # zip() of no columns would drop the rows themselves
+    values_by_row = [list(values) for values in zip(*data.values())] if columns else [[] for _ in rows]
+    return {"columns": columns, "types": types, "rows": values_by_row}
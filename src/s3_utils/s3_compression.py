@@ -0,0 +1,169 @@
+import io
+import bz2
+import sys
+import gzip
+import lzma
+import zlib
+import logging
+
+from typing import Any, Dict, Optional
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Key suffixes, Content-Encoding values and magic bytes of each supported codec
+CODECS: Dict[str, Dict[str, Any]] = {
+    "gzip": {"suffixes": ("gz", "gzip"), "encodings": ("gzip", "x-gzip"), "magic": b"\x1f\x8b"},
+    "bzip2": {"suffixes": ("bz2",), "encodings": ("bzip2",), "magic": b"BZh"},
+    "xz": {"suffixes": ("xz",), "encodings": ("xz",), "magic": b"\xfd7zXZ\x00"},
+    "zstd": {"suffixes": ("zst", "zstd"), "encodings": ("zstd",), "magic": b"\x28\xb5\x2f\xfd"},
+}
+
+
+def _suffix(object_name: str) -> Optional[str]:
+    base_name = object_name.rsplit("/", 1)[-1].lower()
+    return base_name.rsplit(".", 1)[1] if "." in base_name else None
+
+
+def detect_codec(object_name: str, content_encoding: Optional[str] = None,
+                 head: Optional[bytes] = None) -> Optional[str]:
+    """Return the compression codec from the key suffix, then Content-Encoding, then magic bytes."""
+    suffix = _suffix(object_name)
+    for codec, spec in CODECS.items():
+        if suffix in spec["suffixes"]:
+            return codec
+    if content_encoding:
+        encoding = content_encoding.strip().lower()
+        for codec, spec in CODECS.items():
+            if encoding in spec["encodings"]:
+                return codec
+    if head:
+        for codec, spec in CODECS.items():
+            if head.startswith(spec["magic"]):
+                return codec
+    return None
+
+
+def strip_codec_suffix(object_name: str) -> str:
+    """Drop a compression suffix so ``logs.csv.gz`` resolves its parser as ``logs.csv``."""
+    suffix = _suffix(object_name)
+    if any(suffix in spec["suffixes"] for spec in CODECS.values()):
+        return object_name[:-(len(suffix) + 1)]
+    return object_name
+
+
+class _CountingReader(io.RawIOBase):
+    """Counts compressed bytes pulled from the S3 body."""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        chunk = self.body.read(len(view))
+        view[:len(chunk)] = chunk
+        self.bytes_read += len(chunk)
+        return len(chunk)
+
+
+class DecompressingReader:
+    """
+    File-like reader that inflates an S3 body as it is consumed.
+
+    Only ``read(n)`` worth of decompressed data is produced per call, so a
+    reader that stops early (a row ``limit``, a byte budget) also stops the
+    download when it closes this object. Concatenated gzip members and
+    bzip2/xz/zstd streams are decoded in sequence.
+    """
+
+    def __init__(self, body, codec: str):
+        self.body = body
+        self.codec = codec
+        self._raw = _CountingReader(body)
+        if codec == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="rb")
+        elif codec == "bzip2":
+            self._stream = bz2.BZ2File(self._raw, mode="rb")
+        elif codec == "xz":
+            self._stream = lzma.LZMAFile(self._raw, mode="rb")
+        elif codec == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("Reading zstd objects requires the optional 'zstandard' package")
+            self._stream = zstandard.ZstdDecompressor().stream_reader(self._raw, read_across_frames=True)
+        else:
+            raise ValueError(f"Unsupported compression codec: {codec}")
+
+    @property
+    def compressed_bytes(self) -> int:
+        return self._raw.bytes_read
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            return self._stream.read(size)
+        except (OSError, EOFError, lzma.LZMAError, zlib.error) as e:
+            raise ValueError(f"Corrupt {self.codec} stream: {str(e)}")
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            close = getattr(self.body, "close", None)
+            if close is not None:
+                close()
+
+
+def peek_decompressed(head: bytes, codec: str) -> Optional[bytes]:
+    """
+    Inflate as much of a truncated compressed prefix as possible, for content sniffing.
+
+    Returns None when nothing can be decoded from the prefix alone (bzip2
+    needs a whole block, which is usually larger than a probe).
+    """
+    try:
+        if codec == "gzip":
+            return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(head) or None
+        if codec == "xz":
+            return lzma.LZMADecompressor().decompress(head) or None
+        if codec == "zstd":
+            import zstandard
+
+            return zstandard.ZstdDecompressor().decompressobj().decompress(head) or None
+    except Exception as e:
+        # Corrupt data, or zstandard missing or raising its own ZstdError
+        logger.debug("Could not peek into %s prefix: %s", codec, str(e))
+    return None
+
+
+def read_decompressed(reader: DecompressingReader, max_bytes: Optional[int] = None) -> bytes:
+    """
+    Inflate a whole stream into memory, stopping as soon as ``max_bytes`` is exceeded.
+
+    Raises:
+        ValueError: If the decompressed size exceeds ``max_bytes``.
+    """
+    buffer = bytearray()
+    try:
+        while True:
+            chunk = reader.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                return buffer
+            buffer += chunk
+            if max_bytes is not None and len(buffer) > max_bytes:
+                raise ValueError(f"Decompressed size exceeds the {max_bytes} byte limit "
+                                 f"after {reader.compressed_bytes} compressed bytes")
+    finally:
+        reader.close()
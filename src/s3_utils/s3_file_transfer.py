@@ -1,22 +1,37 @@
 import os
 import sys
+import time
 import threading
 import logging
 import base64
-import json
-import csv
 import io
+from itertools import islice
 
-import boto3
 from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
-import PyPDF2
-import jsonlines
-
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_streaming import LineStream, stream_csv, stream_jsonl
+from src.s3_utils.s3_cache import object_cache, parsed_cache
+from src.s3_utils.s3_parser_pool import parser_pool, parse_json_content, parse_pdf_content, extract_s3_pdf_pages
+from src.s3_utils.s3_ranged_io import S3RangedFile, read_body
+from src.s3_utils.s3_parsers import parser_registry, S3_PARSER_PROBE_BYTES
+from src.s3_utils.s3_parquet import read_parquet
+from src.s3_utils.s3_query import QueryPlan, query_csv, query_jsonl, query_parquet
+from src.s3_utils.s3_grep import S3Grep
+from src.s3_utils.s3_batch import BatchReader, S3_BATCH_READ_MAX_BYTES, S3_BATCH_READ_MAX_OBJECTS
+from src.s3_utils.s3_line_index import line_index_store
+from src.s3_utils.s3_columnar import check_output_format, encode_table
+from src.s3_utils.s3_paging import (
+    OutputBudget, STALE_CURSOR_MESSAGE, output_limit, encode_read_cursor, decode_read_cursor, check_cursor,
+    check_etag, page_items, cut_text, utf8_boundary
+)
+from src.s3_utils.s3_compression import (
+    DecompressingReader, detect_codec, strip_codec_suffix, peek_decompressed, read_decompressed
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +41,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 MB = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+# Parsers whose output is worth caching; plain text costs no more to re-decode than to look up
+CACHED_PARSERS = ('json', 'pdf')
 
 # Common utility functions
 def get_full_path(path: str) -> str:
@@ -47,12 +65,7 @@ class BucketWrapper:
         :param bucket: A Boto3 Bucket resource. This is a high-level resource in Boto3
                        that wraps bucket actions in a class-like structure.
         """
-        self.s3 = boto3.resource(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region_name
-        )
+        self.s3 = client_pool.get_resource(access_key, secret_key, region_name)
         
 
     def create_bucket(self, bucket_name, region_name: Optional[str] = None) -> bool:
@@ -101,7 +114,7 @@ class BucketWrapper:
         """
         try:
             buckets = list(self.s3.buckets.all())
-            logger.info("Got buckets: %s.", buckets)
+            logger.info("Got %d buckets.", len(buckets))
         except ClientError:
             logger.exception("Couldn't get buckets.")
             raise
@@ -119,12 +132,7 @@ class TransferCallback:
     """
 
     def __init__(self, target_size, access_key: str, secret_key: str, region_name: str = "eu-central-1"):  
-        self.s3 = boto3.resource(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region_name
-        )
+        self.s3 = client_pool.get_resource(access_key, secret_key, region_name)
         self._target_size = target_size
         self._total_transferred = 0
         self._lock = threading.Lock()
@@ -311,12 +319,9 @@ class S3FileDownloader:
     def __init__(self, access_key: str, secret_key: str, region_name: str = "eu-central-1"):
         try:
             # Initialize S3 client
-            self.s3 = boto3.client(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region_name
-        )
+            self.s3 = client_pool.get_client(access_key, secret_key, region_name)
+            # Parser workers build their own client from these
+            self._client_args = {"access_key": access_key, "secret_key": secret_key, "region_name": region_name}
         except NoCredentialsError:
             logger.error("AWS credentials not found")
             raise
@@ -414,46 +419,187 @@ class S3FileDownloader:
             logger.error(f"Error generating presigned URL: {str(e)}")
             return {"status": "error", "message": f"Failed to generate download URL: {str(e)}"}
         
-    def read_file_from_s3(self, bucket: str, object_name: str) -> Dict[str, Any]:
+    def read_file_from_s3(self, bucket: str, object_name: str, byte_start: Optional[int] = None,
+                          byte_end: Optional[int] = None, head_lines: Optional[int] = None,
+                          tail_lines: Optional[int] = None, max_bytes: Optional[int] = None,
+                          columns: Optional[List[str]] = None, offset: int = 0, limit: Optional[int] = None,
+                          filters: Optional[Any] = None, fields: Optional[List[str]] = None,
+                          pages: Optional[Any] = None, max_pages: Optional[int] = None,
+                          cursor: Optional[str] = None, max_output_bytes: Optional[int] = None,
+                          max_output_tokens: Optional[int] = None, line_start: Optional[int] = None,
+                          line_count: int = 100, output_format: str = "records") -> Dict[str, Any]:
         """
         Read file from S3 and process based on file extension.
+
+        Partial reads (a byte range, the first or last lines) bypass the parsers and
+        return decoded text, transferring only the bytes they need; a line range
+        (``line_start``) is located through a sparse line-offset index. CSV and JSONL
+        objects are parsed as a stream and support projection, filtering and row limits.
+
+        The parser is chosen by ``parser_registry`` from the extension, or, for
+        unknown extensions, from the Content-Type and leading bytes of a small
+        range GET. Objects over a parser's size limit are rejected before download.
+        gzip, bzip2, xz and zstd objects are inflated while they stream in.
+
+        Every read returns at most ``max_output_bytes`` of data (serialized as
+        JSON). A read cut short by this budget, ``limit`` or ``max_bytes``
+        returns ``next_cursor``; passing it back as ``cursor`` resumes exactly
+        where the previous call stopped: streamed formats restart with a ranged
+        GET at the recorded byte offset, Parquet at the recorded row group.
+        Cursors embed the object's ETag and fail once the object changes.
         
         Args:
             bucket (str): S3 bucket name
             object_name (str): S3 object key
+            byte_start (int, optional): First byte offset to read (inclusive)
+            byte_end (int, optional): Last byte offset to read (inclusive)
+            head_lines (int, optional): Return only the first N lines
+            tail_lines (int, optional): Return only the last N lines
+            max_bytes (int, optional): Upper bound on bytes transferred from S3
+            columns (List[str], optional): Columns to return for tabular files
+            offset (int, optional): Matching rows to skip for tabular files
+            limit (int, optional): Maximum rows to return for tabular files
+            filters (optional): Row filters for tabular files, see ``build_predicate``
+            fields (List[str], optional): JSON pointers to project JSONL records onto
+            pages (optional): PDF pages to extract, e.g. "1-3,7" or [1, 2], 1-based
+            max_pages (int, optional): Maximum number of PDF pages to extract; 0 returns only the page count
+            cursor (str, optional): ``next_cursor`` from a previous call with the same options
+            max_output_bytes (int, optional): Budget for the returned data. Defaults to ``S3_READ_MAX_OUTPUT_BYTES``
+            max_output_tokens (int, optional): Budget for the returned data in approximate tokens
+            line_start (int, optional): Return lines from this 1-based line number on
+            line_count (int, optional): Number of lines to return with ``line_start``. Defaults to 100
+            output_format (str, optional): Row encoding for CSV, JSONL and Parquet, see ``encode_table``.
+                Defaults to "records"
             
         Returns:
             Dict containing status and data or error message
         """
         try:
-            # Get file from S3
-            response = self.s3.get_object(Bucket=bucket, Key=object_name)
-            file_content = response['Body'].read()
-            
-            # Determine file type from extension
-            file_extension = object_name.lower().split('.')[-1]
-            
-            if file_extension == 'csv':
-                data = self._parse_csv(file_content)
-            elif file_extension == 'json':
-                data = self._parse_json(file_content)
-            elif file_extension == 'jsonl':
-                data = self._parse_jsonl(file_content)
-            elif file_extension in ('txt', 'md'):
-                data = self._parse_text(file_content)
-            elif file_extension == 'pdf':
-                data = self._parse_pdf(file_content)
-            else:
+            # Fail before any transfer rather than after reading the rows
+            check_output_format(output_format)
+            output_bytes = output_limit(max_output_bytes, max_output_tokens)
+            if cursor and decode_read_cursor(cursor, bucket, object_name).get("t") == "bytes":
+                return self.read_byte_range(bucket, object_name, max_bytes=max_bytes, cursor=cursor,
+                                            max_output_bytes=output_bytes)
+            if line_start is not None:
+                return self._fit_lines(self.read_line_range(bucket, object_name, line_start, line_count), output_bytes)
+            if head_lines is not None:
+                return self._fit_lines(self.read_head_lines(bucket, object_name, head_lines, max_bytes), output_bytes)
+            if tail_lines is not None:
+                return self._fit_lines(self.read_tail_lines(bucket, object_name, tail_lines, max_bytes), output_bytes,
+                                       from_end=True)
+            if byte_start is not None or byte_end is not None:
+                return self.read_byte_range(bucket, object_name, byte_start, byte_end, max_bytes,
+                                            max_output_bytes=output_bytes)
+
+            # Route on the key alone when possible; otherwise sniff a small probe
+            # so unsupported objects are rejected before the bulk transfer.
+            # Compressed keys (logs.csv.gz) route on the name without the codec suffix.
+            codec = detect_codec(object_name)
+            type_name = strip_codec_suffix(object_name)
+            spec = parser_registry.by_extension(type_name)
+            probe = None
+            if spec is None:
+                probe = self._probe(bucket, object_name)
+                codec = codec or detect_codec(object_name, probe["content_encoding"], probe["head"])
+                head = peek_decompressed(probe["head"], codec) if codec else probe["head"]
+                spec = parser_registry.resolve(type_name, probe["content_type"], head)
+            parsers = {'json': self._parse_json, 'text': self._parse_text, 'pdf': self._parse_pdf}
+            if spec is None or (not spec.streaming and spec.name not in parsers):
+                base_name = os.path.basename(type_name).lower()
+                file_type = base_name.rsplit('.', 1)[1] if '.' in base_name else (probe or {}).get("content_type")
                 return {
                     "status": "error",
-                    "message": f"Unsupported file type: {file_extension}"
+                    "message": f"Unsupported file type: {file_type}"
                 }
-                
-            return {
+
+            if spec.name == 'csv':
+                return self._encode_rows(self.read_csv_stream(bucket, object_name, columns, offset, limit, filters,
+                                                              max_bytes, codec, cursor, output_bytes),
+                                         output_format, from_text=True)
+            if spec.name == 'jsonl':
+                return self._encode_rows(self.read_jsonl_stream(bucket, object_name, fields, offset, limit, filters,
+                                                                max_bytes, codec, cursor, output_bytes),
+                                         output_format)
+            if spec.name == 'parquet':
+                return self._encode_rows(self.read_parquet(bucket, object_name, columns, offset, limit, filters,
+                                                           max_bytes, cursor, output_bytes),
+                                         output_format)
+            if spec.name == 'pdf' and codec is None and (pages is not None or max_pages is not None):
+                return self.read_pdf_pages(bucket, object_name, pages, max_pages, cursor, output_bytes)
+            if spec.name == 'text' and codec is None and output_bytes is not None:
+                # Text larger than the budget is paged with ranged GETs instead of downloaded whole
+                page = self._read_text_page(bucket, object_name, probe, cursor, output_bytes)
+                if page is not None:
+                    return page
+
+            limits = [size_limit for size_limit in (spec.max_bytes, max_bytes) if size_limit is not None]
+            size_limit = min(limits) if limits else None
+            # Compressed sizes say little about the inflated size, which is capped while decompressing
+            if size_limit is not None and codec is None:
+                if probe is None:
+                    probe = object_cache.known_meta(bucket, object_name) or self._probe(bucket, object_name)
+                size = probe.get("size")
+                if size is not None and size > size_limit:
+                    return {
+                        "status": "error",
+                        "message": (f"Object is {size} bytes which exceeds the {size_limit} byte limit for "
+                                    f"{spec.name} files; use byte_start/byte_end, head_lines or tail_lines "
+                                    "to read part of it")
+                    }
+            parser = parsers[spec.name]
+
+            body = None
+            if probe is not None and "head" in probe and probe["size"] == len(probe["head"]):
+                # The probe already holds the whole (small) object
+                file_content, meta = probe["head"], {"etag": probe["etag"], "cache": "probe"}
+                if codec is not None:
+                    body = io.BytesIO(file_content)
+            elif codec is not None:
+                body, meta = object_cache.open(self.s3, bucket, object_name)
+            else:
+                # Get file from S3, revalidating any cached copy by ETag
+                file_content, meta = object_cache.get(self.s3, bucket, object_name)
+            cache_state = meta["cache"]
+
+            found = False
+            if spec.name in CACHED_PARSERS:
+                found, data = parsed_cache.get(bucket, object_name, meta["etag"], spec.name)
+            if found:
+                cache_state = "parsed_hit"
+                if body is not None:
+                    body.close()
+            else:
+                if body is not None:
+                    # Inflate while downloading, giving up as soon as the limit is passed
+                    file_content = read_decompressed(self._decompressing_reader(body, codec), size_limit)
+                started = time.perf_counter()
+                data = parser(file_content)
+                if spec.name in CACHED_PARSERS:
+                    parsed_cache.put(bucket, object_name, meta["etag"], spec.name, data,
+                                     elapsed=time.perf_counter() - started)
+
+            start = 0
+            if cursor:
+                state = decode_read_cursor(cursor, bucket, object_name)
+                check_cursor(state, 'items', {})
+                check_etag(state, meta["etag"])
+                start = state["index"]
+            data, next_index = page_items(data, start, OutputBudget(output_bytes))
+            result = {
                 "status": "success",
-                "data": data
+                "data": data,
+                "parser": spec.name,
+                "cache": cache_state,
+                "complete": next_index is None
             }
-            
+            if next_index is not None:
+                result["next_cursor"] = encode_read_cursor(bucket, object_name, meta["etag"], 'items', {},
+                                                           index=next_index)
+            if codec is not None:
+                result["codec"] = codec
+            return result
+
         except ClientError as e:
             return {
                 "status": "error",
@@ -465,33 +611,743 @@ class S3FileDownloader:
                 "message": f"Error processing file: {str(e)}"
             }
 
-    def _parse_csv(self, content: bytes) -> list:
-        """Parse CSV content to list of dictionaries."""
-        text = content.decode('utf-8')
-        csv_file = io.StringIO(text)
-        return list(csv.DictReader(csv_file))
+    def read_csv_stream(self, bucket: str, object_name: str, columns: Optional[List[str]] = None,
+                        offset: int = 0, limit: Optional[int] = None, filters: Optional[Any] = None,
+                        max_bytes: Optional[int] = None, codec: Optional[str] = None,
+                        cursor: Optional[str] = None, max_output_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stream a CSV object and return the selected rows.
 
-    def _parse_json(self, content: bytes) -> Any:
-        """Parse JSON content."""
-        return json.loads(content.decode('utf-8'))
-
-    def _parse_jsonl(self, content: bytes) -> list:
-        """Parse JSONL content to list of dictionaries."""
-        result = []
-        with io.BytesIO(content) as file:
-            reader = jsonlines.Reader(file)
-            for obj in reader:
-                result.append(obj)
+        The GET is closed as soon as ``limit`` matching rows have been read, or
+        the next row does not fit ``max_output_bytes``, so peak memory is bounded
+        by the stream buffer rather than the file size. A compressed object
+        (``codec``) is inflated on the fly; ``max_bytes`` then counts decompressed bytes.
+        A ``cursor`` resumes at the byte offset of the first unreturned row.
+        """
+        paging = {"columns": columns, "filters": filters}
+        start = self._stream_start(bucket, object_name, 'csv', paging, cursor)
+        if cursor:
+            offset = 0
+        return self._read_stream(
+            bucket, object_name, 'csv',
+            self._decompressed(codec, lambda body: stream_csv(body, columns=columns, offset=offset, limit=limit,
+                                                              filters=filters, max_bytes=max_bytes,
+                                                              start_offset=start["offset"], start_row=start["row"],
+                                                              header=start.get("header"),
+                                                              budget=OutputBudget(max_output_bytes)),
+                               skip=start["offset"]),
+            start=start, seekable=codec is None, paging=paging
+        )
+
+    def read_jsonl_stream(self, bucket: str, object_name: str, fields: Optional[List[str]] = None,
+                          offset: int = 0, limit: Optional[int] = None, filters: Optional[Any] = None,
+                          max_bytes: Optional[int] = None, codec: Optional[str] = None,
+                          cursor: Optional[str] = None, max_output_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stream a JSON Lines object and return the selected records.
+
+        The connection is closed once ``limit`` matching records have been read
+        or the next one does not fit ``max_output_bytes``; the response reports
+        bytes scanned from S3 versus bytes returned. A compressed object
+        (``codec``) is inflated on the fly. A ``cursor`` resumes at the byte
+        offset of the first unreturned record.
+        """
+        paging = {"fields": fields, "filters": filters}
+        start = self._stream_start(bucket, object_name, 'jsonl', paging, cursor)
+        if cursor:
+            offset = 0
+        return self._read_stream(
+            bucket, object_name, 'jsonl',
+            self._decompressed(codec, lambda body: stream_jsonl(body, fields=fields, offset=offset, limit=limit,
+                                                                filters=filters, max_bytes=max_bytes,
+                                                                start_offset=start["offset"], start_row=start["row"],
+                                                                budget=OutputBudget(max_output_bytes)),
+                               skip=start["offset"]),
+            start=start, seekable=codec is None, paging=paging
+        )
+
+    def _stream_start(self, bucket: str, object_name: str, kind: str, paging: Dict[str, Any],
+                      cursor: Optional[str]) -> Dict[str, Any]:
+        """Resume position of a streamed read: byte ``offset``, ``row`` index and the cursor's ETag."""
+        if not cursor:
+            return {"offset": 0, "row": 0, "e": None}
+        state = decode_read_cursor(cursor, bucket, object_name)
+        check_cursor(state, kind, paging)
+        return state
+
+    def read_parquet(self, bucket: str, object_name: str, columns: Optional[List[str]] = None,
+                     offset: int = 0, limit: Optional[int] = None, filters: Optional[Any] = None,
+                     max_bytes: Optional[int] = None, cursor: Optional[str] = None,
+                     max_output_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Read rows from a Parquet object, transferring only the footer and the needed column chunks.
+
+        The footer comes from a single suffix-range GET; row groups are pruned
+        by their min/max statistics, and projected column chunks are fetched
+        with concurrent range GETs. ``max_bytes`` caps the bytes fetched.
+        A ``cursor`` resumes at the row group and row the previous call stopped at.
+        """
+        raw = S3RangedFile.from_suffix(self.s3, bucket, object_name)
+        paging = {"columns": columns, "filters": filters}
+        start = {"group": 0, "row": 0}
+        if cursor:
+            state = decode_read_cursor(cursor, bucket, object_name)
+            check_cursor(state, 'parquet', paging)
+            check_etag(state, raw.etag)
+            start = {"group": state["group"], "row": state["row"]}
+            offset = 0
+        result = read_parquet(raw, columns, offset, limit, filters, max_bytes, start["group"], start["row"],
+                              OutputBudget(max_output_bytes))
+        resume = result.pop("resume", None)
+        response = {
+            "status": "success",
+            "data": result.pop("rows"),
+            **result,
+            "bytes_fetched": raw.bytes_fetched,
+            "object_size": raw.size,
+            "cache": "miss"
+        }
+        if resume is not None:
+            response["next_cursor"] = encode_read_cursor(bucket, object_name, raw.etag, 'parquet', paging, **resume)
+        return response
+
+    def query_table(self, bucket: str, object_name: str, select: Optional[List[str]] = None,
+                    filters: Optional[Any] = None, group_by: Optional[List[str]] = None,
+                    aggregates: Optional[List[Dict[str, str]]] = None, order_by: Optional[Any] = None,
+                    limit: Optional[int] = None, max_bytes: Optional[int] = None,
+                    output_format: str = "records") -> Dict[str, Any]:
+        """
+        Run a projection/filter/group-by/aggregate query over a CSV, JSONL or Parquet object.
+
+        The object is scanned server-side and only the result rows are returned:
+        CSV and JSONL stream in batches (inflating compressed objects on the fly),
+        Parquet is read row group by row group with statistics pruning and
+        vectorized Arrow filters and aggregates. Results are cached by ETag and query.
+
+        Args:
+            bucket (str): S3 bucket name
+            object_name (str): S3 object key
+            select (List[str], optional): Columns to return for a non-aggregating query
+            filters (optional): Row filters, see ``build_predicate``
+            group_by (List[str], optional): Columns to group on
+            aggregates (List[Dict[str, str]], optional): ``{"op", "column", "as"}`` entries, see ``QueryPlan``
+            order_by (optional): Output columns to sort on; a leading "-" sorts descending
+            limit (int, optional): Maximum number of result rows
+            max_bytes (int, optional): Stop scanning after this many bytes; the result is then partial
+            output_format (str, optional): Row encoding, see ``encode_table``. Defaults to "records"
+
+        Returns:
+            Dict containing status and result rows or error message
+        """
+        try:
+            check_output_format(output_format)
+            plan = QueryPlan(select, filters, group_by, aggregates, order_by, limit)
+            codec = detect_codec(object_name)
+            spec = parser_registry.by_extension(strip_codec_suffix(object_name))
+            if spec is None:
+                probe = self._probe(bucket, object_name)
+                codec = codec or detect_codec(object_name, probe["content_encoding"], probe["head"])
+                head = peek_decompressed(probe["head"], codec) if codec else probe["head"]
+                spec = parser_registry.resolve(strip_codec_suffix(object_name), probe["content_type"], head)
+            if spec is None or spec.name not in ('csv', 'jsonl', 'parquet'):
+                return {
+                    "status": "error",
+                    "message": "Queries support CSV, JSONL and Parquet objects only"
+                }
+
+            options = {**plan.options(), "max_bytes": max_bytes}
+            if spec.name == 'parquet':
+                raw = S3RangedFile.from_suffix(self.s3, bucket, object_name)
+                found, result = parsed_cache.get(bucket, object_name, raw.etag, 'query', options)
+                cache_state = "parsed_hit"
+                if not found:
+                    started = time.perf_counter()
+                    result = {**query_parquet(raw, plan, max_bytes), "bytes_fetched": raw.bytes_fetched}
+                    parsed_cache.put(bucket, object_name, raw.etag, 'query', result, options,
+                                     elapsed=time.perf_counter() - started)
+                    cache_state = "miss"
+                result = {"status": "success", "data": result["rows"],
+                          **{name: value for name, value in result.items() if name != "rows"},
+                          "object_size": raw.size, "cache": cache_state}
+            else:
+                query = query_csv if spec.name == 'csv' else query_jsonl
+                result = self._read_stream(
+                    bucket, object_name, 'query',
+                    self._decompressed(codec, lambda body: query(body, plan, max_bytes)),
+                    options=options
+                )
+            result["parser"] = spec.name
+            return self._encode_rows(result, output_format, from_text=spec.name == 'csv')
+
+        except ClientError as e:
+            return {
+                "status": "error",
+                "message": f"S3 error: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error querying file: {str(e)}"
+            }
+
+    def grep_objects(self, bucket: str, pattern: str, prefix: str = "", suffix: Optional[str] = None,
+                     regex: bool = False, ignore_case: bool = False, max_matches_per_object: int = 10,
+                     max_matches: int = 1000, max_bytes: Optional[int] = None, start_after: Optional[str] = None,
+                     progress: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Search the lines of every object under a prefix for a literal string or regular expression.
+
+        Objects are searched concurrently as decompressed line streams within a
+        global byte budget; see ``S3Grep``.
+
+        Args:
+            bucket (str): S3 bucket name
+            pattern (str): Text or regular expression to find
+            prefix (str, optional): Only search keys under this prefix
+            suffix (str, optional): Only search keys ending with this suffix
+            regex (bool, optional): Treat ``pattern`` as a regular expression
+            ignore_case (bool, optional): Match case-insensitively
+            max_matches_per_object (int, optional): Stop reading an object after this many matches
+            max_matches (int, optional): Stop the search after this many matches
+            max_bytes (int, optional): Bytes to transfer across all objects; defaults to ``S3_GREP_MAX_BYTES``
+            start_after (str, optional): Resume a search after this key (``resume_after`` of a previous result)
+            progress (Callable[[int, int], None], optional): Receives (objects searched, objects listed)
+
+        Returns:
+            Dict containing status and matches or error message
+        """
+        try:
+            grep = S3Grep(self.s3, pattern, regex=regex, ignore_case=ignore_case,
+                          max_matches_per_object=max_matches_per_object, max_matches=max_matches,
+                          max_bytes=max_bytes, progress=progress)
+            return {"status": "success", **grep.search(bucket, prefix, suffix, start_after)}
+        except ClientError as e:
+            return {
+                "status": "error",
+                "message": f"S3 error: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error searching objects: {str(e)}"
+            }
+
+    def read_files(self, bucket: str, object_names: Optional[List[str]] = None, prefix: str = "",
+                   pattern: Optional[str] = None, max_objects: int = S3_BATCH_READ_MAX_OBJECTS,
+                   max_total_bytes: int = S3_BATCH_READ_MAX_BYTES, max_bytes: Optional[int] = None,
+                   head_lines: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Read and parse many objects concurrently with this downloader's client.
+
+        Each object goes through ``read_file_from_s3``. Every read is capped at
+        ``max_bytes`` (default: the batch budget), so an oversized object is
+        rejected before download instead of consuming the batch. See ``BatchReader``.
+
+        Args:
+            bucket (str): S3 bucket name
+            object_names (List[str], optional): Keys to read, in the order results are returned
+            prefix (str, optional): Read the objects under this prefix when no keys are given
+            pattern (str, optional): Glob on the full key, e.g. "configs/*.json"
+            max_objects (int, optional): Maximum number of objects to read
+            max_total_bytes (int, optional): Budget for the combined size of the returned data
+            max_bytes (int, optional): Upper bound on bytes transferred per object
+            head_lines (int, optional): Return only the first N lines of each object
+            limit (int, optional): Maximum rows per tabular object
+
+        Returns:
+            Dict containing status and per-object results or error message
+        """
+        try:
+            if not object_names and not prefix and not pattern:
+                return {
+                    "status": "error",
+                    "message": "Provide object_names, or a prefix and/or glob pattern"
+                }
+            reader = BatchReader(self.s3, self.read_file_from_s3, max_objects=max_objects,
+                                 max_total_bytes=max_total_bytes)
+            targets = reader.resolve(bucket, object_names, prefix, pattern)
+            result = reader.run(bucket, targets, max_bytes=max_bytes or max_total_bytes,
+                                head_lines=head_lines, limit=limit)
+            return {"status": "success", **result}
+        except ClientError as e:
+            return {
+                "status": "error",
+                "message": f"S3 error: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error reading files: {str(e)}"
+            }
+
+    @staticmethod
+    def _decompressing_reader(body, codec: str) -> DecompressingReader:
+        try:
+            return DecompressingReader(body, codec)
+        except Exception:
+            body.close()
+            raise
+
+    def _decompressed(self, codec: Optional[str], read: Any, skip: int = 0) -> Any:
+        """
+        Wrap a streaming reader so it consumes the inflated body and reports compressed bytes read.
+
+        Compressed streams cannot be entered mid-way, so a resumed read inflates
+        from the start and discards the first ``skip`` decompressed bytes.
+        """
+        if codec is None:
+            return read
+
+        def read_compressed(body) -> Dict[str, Any]:
+            reader = self._decompressing_reader(body, codec)
+            remaining = skip
+            while remaining:
+                chunk = reader.read(min(remaining, READ_CHUNK_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+            result = read(reader)
+            return {**result, "codec": codec, "compressed_bytes_scanned": reader.compressed_bytes}
+
+        return read_compressed
+
+    def read_pdf_pages(self, bucket: str, object_name: str, pages: Optional[Any] = None,
+                       max_pages: Optional[int] = None, cursor: Optional[str] = None,
+                       max_output_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Extract selected PDF pages, fetching only the byte ranges PyPDF2 reads.
+
+        The PDF is opened through ranged GETs, so the trailer, cross-reference
+        table and requested pages are transferred instead of the whole file.
+        The page count is always returned so callers can ask for specific pages.
+        Extraction runs in the parser pool, so its timeout and memory limit apply.
+        Pages beyond ``max_output_bytes`` are returned by the call resuming from ``next_cursor``.
+        """
+        raw = S3RangedFile(self.s3, bucket, object_name)
+        options = {"pages": pages, "max_pages": max_pages}
+        start = 0
+        if cursor:
+            state = decode_read_cursor(cursor, bucket, object_name)
+            check_cursor(state, 'items', options)
+            check_etag(state, raw.etag)
+            start = state["index"]
+        found, result = parsed_cache.get(bucket, object_name, raw.etag, 'pdf_pages', options)
+        cache_state = "parsed_hit"
+        bytes_fetched = raw.bytes_fetched
+        if not found:
+            started = time.perf_counter()
+            # Extraction runs in a parser worker, which opens its own ranged file on the same version
+            source = {"client": self._client_args, "bucket": bucket, "key": object_name,
+                      "size": raw.size, "etag": raw.etag}
+            result = parser_pool.call(extract_s3_pdf_pages, source, pages, max_pages, size=raw.size)
+            bytes_fetched += result.pop("bytes_fetched")
+            parsed_cache.put(bucket, object_name, raw.etag, 'pdf_pages', result, options,
+                             elapsed=time.perf_counter() - started)
+            cache_state = "miss"
+        data, next_index = page_items(result["pages"], start, OutputBudget(max_output_bytes))
+        response = {
+            "status": "success",
+            "data": data,
+            "page_count": result["page_count"],
+            "truncated": result["truncated"],
+            "bytes_fetched": bytes_fetched,
+            "object_size": raw.size,
+            "cache": cache_state,
+            "complete": next_index is None
+        }
+        if next_index is not None:
+            response["next_cursor"] = encode_read_cursor(bucket, object_name, raw.etag, 'items', options,
+                                                         index=next_index)
+        return response
+
+    def _read_stream(self, bucket: str, object_name: str, parser: str, read: Any,
+                     start: Optional[Dict[str, Any]] = None, seekable: bool = True,
+                     paging: Optional[Dict[str, Any]] = None, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run a streaming reader over the object's body.
+
+        With ``options`` set, a parsed result cached for the same ETag and options
+        is reused (closing the S3 body unread) and an expensive result is cached;
+        pages of a streamed read are not, since their keys rarely repeat. A resumed
+        read (``start`` from a cursor) opens the object at the recorded byte offset,
+        or from the beginning when it is not ``seekable``. With ``paging`` set, a
+        reader's ``resume`` position is returned as ``next_cursor``.
+        """
+        if start and start["offset"]:
+            body, meta = self._open_at(bucket, object_name, start["offset"] if seekable else 0, start["e"])
+        else:
+            body, meta = object_cache.open(self.s3, bucket, object_name)
+        found = False
+        if options is not None:
+            found, result = parsed_cache.get(bucket, object_name, meta["etag"], parser, options)
+        if found:
+            body.close()
+            cache_state = "parsed_hit"
+        else:
+            started = time.perf_counter()
+            result = read(body)
+            if options is not None:
+                parsed_cache.put(bucket, object_name, meta["etag"], parser, result, options,
+                                 elapsed=time.perf_counter() - started)
+            cache_state = meta["cache"]
+        result = dict(result)
+        resume = result.pop("resume", None)
+        response = {
+            "status": "success",
+            "data": result.pop("rows"),
+            **result,
+            "cache": cache_state
+        }
+        if resume is not None and paging is not None:
+            response["next_cursor"] = encode_read_cursor(bucket, object_name, meta["etag"], parser, paging, **resume)
+        return response
+
+    def _open_at(self, bucket: str, object_name: str, offset: int, etag: Optional[str]) -> Any:
+        """Open the object from byte ``offset`` for a resumed read, failing if it no longer has ``etag``."""
+        response = self._ranged_get(bucket, object_name, f"{offset}-", if_match=etag)
+        if response is None:
+            # The cursor points at the end of the object
+            return io.BytesIO(b""), {"etag": etag, "cache": "miss"}
+        return response['Body'], {"etag": (response.get('ETag') or '').strip('"'), "cache": "miss"}
+
+    @staticmethod
+    def _object_size(response: Dict[str, Any]) -> Optional[int]:
+        """Extract the full object size from a ranged GET's Content-Range header."""
+        content_range = response.get('ContentRange')
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            return int(total) if total.isdigit() else None
+        return response.get('ContentLength')
+
+    @staticmethod
+    def _split_lines(content: bytes) -> List[str]:
+        """Decode bytes and split into lines, tolerating a cut multi-byte character."""
+        return content.decode('utf-8', errors='replace').splitlines()
+
+    def _probe(self, bucket: str, object_name: str) -> Dict[str, Any]:
+        """Fetch the leading bytes with one range GET, which also reports the size and Content-Type."""
+        response = self._ranged_get(bucket, object_name, f"0-{S3_PARSER_PROBE_BYTES - 1}")
+        if response is None:
+            return {"size": 0, "content_type": None, "content_encoding": None, "etag": None, "head": b""}
+        return {
+            "size": self._object_size(response),
+            "content_type": response.get('ContentType'),
+            "content_encoding": response.get('ContentEncoding'),
+            "etag": (response.get('ETag') or '').strip('"'),
+            "head": bytes(read_body(response['Body'], response.get('ContentLength'), spill=False))
+        }
+
+    def _ranged_get(self, bucket: str, object_name: str, byte_range: str,
+                    if_match: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Issue a GET with a Range header; returns None for an unsatisfiable range (e.g. empty object).
+
+        With ``if_match`` set the GET only succeeds while the object still has that ETag.
+        """
+        params = {"Bucket": bucket, "Key": object_name, "Range": f"bytes={byte_range}"}
+        if if_match:
+            params["IfMatch"] = f'"{if_match}"'
+        try:
+            return self.s3.get_object(**params)
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if code == 'InvalidRange':
+                return None
+            if code in ('PreconditionFailed', '412'):
+                raise ValueError(STALE_CURSOR_MESSAGE)
+            raise
+
+    def _read_text_page(self, bucket: str, object_name: str, probe: Optional[Dict[str, Any]],
+                        cursor: Optional[str], max_output_bytes: int) -> Optional[Dict[str, Any]]:
+        """
+        Read one budget-sized page of a text object with a ranged GET.
+
+        Pages end after the last complete line that fits. Returns None when the
+        whole object fits the budget and no cursor was given, so the regular
+        (cached) read applies.
+        """
+        if cursor:
+            state = decode_read_cursor(cursor, bucket, object_name)
+            check_cursor(state, 'text', {})
+            start, etag = state["offset"], state["e"]
+        else:
+            meta = probe or object_cache.known_meta(bucket, object_name) or self._probe(bucket, object_name)
+            if meta.get("size") is None or meta["size"] <= max_output_bytes:
+                return None
+            # Cached metadata may predate an overwrite; the first page takes its ETag from the GET itself
+            start, etag = 0, None
+
+        response = self._ranged_get(bucket, object_name, f"{start}-{start + max_output_bytes - 1}", if_match=etag)
+        if response is None:
+            content, object_size = b"", start
+        else:
+            content = read_body(response['Body'], response.get('ContentLength'), spill=False)
+            object_size = self._object_size(response)
+            etag = (response.get('ETag') or '').strip('"') or etag
+        end = start + cut_text(content, max_output_bytes, start + len(content) >= object_size)
+        result = {
+            "status": "success",
+            "data": str(content[:end - start], 'utf-8', 'replace'),
+            "parser": "text",
+            "range": {"start": start, "bytes_read": len(content), "object_size": object_size},
+            "complete": end >= object_size
+        }
+        if end < object_size:
+            result["next_cursor"] = encode_read_cursor(bucket, object_name, etag, 'text', {}, offset=end)
         return result
 
+    @staticmethod
+    def _encode_rows(result: Dict[str, Any], output_format: str, from_text: bool = False) -> Dict[str, Any]:
+        """Re-encode the rows of a tabular result in a columnar ``output_format``."""
+        if result.get("status") == "success" and output_format != "records":
+            result["data"] = encode_table(result["data"], output_format, result.get("columns"), from_text)
+            result["output_format"] = output_format
+        return result
+
+    @staticmethod
+    def _fit_lines(result: Dict[str, Any], max_output_bytes: Optional[int], from_end: bool = False) -> Dict[str, Any]:
+        """Drop the lines of a head (or, ``from_end``, tail) read that do not fit the output budget."""
+        if result.get("status") != "success" or max_output_bytes is None:
+            return result
+        lines = result["data"]
+        budget = OutputBudget(max_output_bytes)
+        ordered = reversed(lines) if from_end else lines
+        kept = next((count for count, line in enumerate(ordered) if not budget.add(line)), len(lines))
+        if kept < len(lines):
+            result["data"] = lines[len(lines) - kept:] if from_end else lines[:kept]
+            result["output_truncated"] = True
+        return result
+
+    def read_byte_range(self, bucket: str, object_name: str, byte_start: Optional[int] = None,
+                        byte_end: Optional[int] = None, max_bytes: Optional[int] = None,
+                        cursor: Optional[str] = None, max_output_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Read an inclusive byte range of an object as text.
+
+        A missing ``byte_start`` with ``byte_end`` set reads the last ``byte_end`` bytes,
+        mirroring HTTP suffix ranges. ``max_bytes`` and ``max_output_bytes`` cap the
+        range length; the rest of a capped range is read by resuming from ``next_cursor``.
+        """
+        etag = None
+        if cursor:
+            state = decode_read_cursor(cursor, bucket, object_name)
+            check_cursor(state, 'bytes', {})
+            byte_start, byte_end, etag = state["offset"], state.get("end"), state["e"]
+        requested_end = byte_end
+        if max_output_bytes is not None:
+            max_bytes = max_output_bytes if max_bytes is None else min(max_bytes, max_output_bytes)
+        if byte_start is None:
+            length = byte_end if max_bytes is None else min(byte_end, max_bytes)
+            byte_range = f"-{length}"
+        else:
+            if max_bytes is not None:
+                limit = byte_start + max_bytes - 1
+                byte_end = limit if byte_end is None else min(byte_end, limit)
+            byte_range = f"{byte_start}-{'' if byte_end is None else byte_end}"
+
+        response = self._ranged_get(bucket, object_name, byte_range, if_match=etag)
+        if response is None:
+            return {"status": "success", "data": "", "range": {"requested": byte_range, "bytes_read": 0}}
+        content = read_body(response['Body'], response.get('ContentLength'))
+        object_size = self._object_size(response)
+        content_range = response.get('ContentRange', '')
+        next_start = None
+        if byte_start is not None and object_size is not None:
+            last = object_size - 1 if requested_end is None else min(requested_end, object_size - 1)
+            if byte_start + len(content) <= last:
+                # The range was capped: stop before a split character and continue from there
+                content = memoryview(content)[:utf8_boundary(content)]
+                next_start = byte_start + len(content)
+        result = {
+            "status": "success",
+            "data": str(content, 'utf-8', 'replace'),
+            "range": {
+                "requested": byte_range,
+                "content_range": content_range,
+                "bytes_read": len(content),
+                "object_size": object_size,
+                "truncated": object_size is not None and len(content) < object_size
+            }
+        }
+        if next_start is not None:
+            result["next_cursor"] = encode_read_cursor(
+                bucket, object_name, etag or (response.get('ETag') or '').strip('"'), 'bytes', {},
+                offset=next_start, end=requested_end
+            )
+        return result
+
+    def read_head_lines(self, bucket: str, object_name: str, num_lines: int,
+                        max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the first ``num_lines`` lines, closing the stream as soon as they arrive.
+
+        Compressed objects are inflated as they stream; ``max_bytes`` then counts decompressed bytes.
+        """
+        codec = detect_codec(object_name)
+        if codec is not None:
+            return self._read_head_lines_compressed(bucket, object_name, num_lines, max_bytes, codec)
+        byte_range = f"0-{max_bytes - 1}" if max_bytes else "0-"
+        response = self._ranged_get(bucket, object_name, byte_range)
+        if response is None:
+            return {"status": "success", "data": [], "range": {"bytes_read": 0, "object_size": 0}}
+
+        body = response['Body']
+        chunks = []
+        newlines = 0
+        bytes_read = 0
+        try:
+            for chunk in body.iter_chunks(READ_CHUNK_SIZE):
+                chunks.append(chunk)
+                bytes_read += len(chunk)
+                newlines += chunk.count(b'\n')
+                if newlines >= num_lines:
+                    break
+        finally:
+            body.close()
+
+        object_size = self._object_size(response)
+        lines = self._split_lines(b''.join(chunks))[:num_lines]
+        return {
+            "status": "success",
+            "data": lines,
+            "range": {
+                "bytes_read": bytes_read,
+                "object_size": object_size,
+                "truncated": object_size is not None and bytes_read < object_size
+            }
+        }
+
+    def read_line_range(self, bucket: str, object_name: str, line_start: int, line_count: int) -> Dict[str, Any]:
+        """
+        Return ``line_count`` lines from the 1-based ``line_start`` with a single bounded range GET.
+
+        The byte range comes from the object's line index, which is built by
+        streaming the object once and then reused (and extended in place for
+        appended objects), so reaching line 4,000,000 costs at most one index
+        stride of extra lines rather than a scan from the start.
+        """
+        if line_start < 1 or line_count < 0:
+            raise ValueError("line_start must be at least 1 and line_count must not be negative")
+        if detect_codec(object_name) is not None:
+            raise ValueError("Line ranges need random access, which compressed objects do not support; "
+                             "use head_lines or s3_grep instead")
+        for attempt in range(2):
+            index, index_state = line_index_store.get(self.s3, bucket, object_name)
+            first = line_start - 1
+            if first >= index.total_lines or line_count == 0:
+                data, bytes_read = [], 0
+                break
+            start, end, skip = index.span(first, first + line_count)
+            try:
+                response = self._ranged_get(bucket, object_name, f"{start}-{'' if end is None else end - 1}",
+                                            if_match=index.etag)
+            except ValueError:
+                if attempt:
+                    raise
+                # Replaced between indexing and reading: index the new version
+                continue
+            lines = LineStream(response['Body'], start_offset=start)
+            try:
+                data = [line.decode('utf-8', errors='replace').rstrip('\r\n')
+                        for line in islice(lines, skip, skip + line_count)]
+            finally:
+                lines.close()
+            bytes_read = lines.bytes_read
+            break
+        return {
+            "status": "success",
+            "data": data,
+            "line_start": line_start,
+            "total_lines": index.total_lines,
+            "index": {"state": index_state, "stride": index.stride},
+            "range": {"bytes_read": bytes_read, "object_size": index.size}
+        }
+
+    def _read_head_lines_compressed(self, bucket: str, object_name: str, num_lines: int,
+                                    max_bytes: Optional[int], codec: str) -> Dict[str, Any]:
+        response = self.s3.get_object(Bucket=bucket, Key=object_name)
+        reader = self._decompressing_reader(response['Body'], codec)
+        lines = LineStream(reader, max_bytes=max_bytes)
+        try:
+            data = [line.decode('utf-8', errors='replace').rstrip('\r\n') for line in islice(lines, max(num_lines, 0))]
+        finally:
+            lines.close()
+        return {
+            "status": "success",
+            "data": data,
+            "codec": codec,
+            "range": {
+                "bytes_read": lines.bytes_read,
+                "compressed_bytes_read": reader.compressed_bytes,
+                "object_size": response.get('ContentLength'),
+                "truncated": not lines.exhausted
+            }
+        }
+
+    def read_tail_lines(self, bucket: str, object_name: str, num_lines: int,
+                        max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the last ``num_lines`` lines using suffix and backward ranged GETs.
+
+        The first request fetches a suffix window; further windows are fetched
+        backwards, each twice the size of the previous, until enough line breaks
+        have been seen, the start of the object is reached or ``max_bytes`` is spent.
+        """
+        window = READ_CHUNK_SIZE if max_bytes is None else min(READ_CHUNK_SIZE, max_bytes)
+        response = self._ranged_get(bucket, object_name, f"-{window}")
+        if response is None:
+            return {"status": "success", "data": [], "range": {"bytes_read": 0, "object_size": 0}}
+
+        object_size = self._object_size(response)
+        # Windows are scanned with bytes methods, so they stay in memory
+        chunks = [read_body(response['Body'], response.get('ContentLength'), spill=False)]
+        bytes_read = len(chunks[0])
+        start = object_size - bytes_read
+
+        # A trailing newline terminates the last line rather than starting a new one
+        def enough_lines() -> bool:
+            newlines = sum(chunk.count(b'\n') for chunk in chunks)
+            if chunks[-1].endswith(b'\n'):
+                newlines -= 1
+            return newlines >= num_lines
+
+        while start > 0 and not enough_lines():
+            if max_bytes is not None and bytes_read >= max_bytes:
+                break
+            window *= 2
+            if max_bytes is not None:
+                window = min(window, max_bytes - bytes_read)
+            window_start = max(0, start - window)
+            part_response = self._ranged_get(bucket, object_name, f"{window_start}-{start - 1}")
+            part = read_body(part_response['Body'], part_response.get('ContentLength'), spill=False)
+            chunks.insert(0, part)
+            bytes_read += len(part)
+            start = window_start
+
+        lines = self._split_lines(b''.join(chunks))
+        if start > 0 and lines:
+            # The first line is cut off unless we reached the start of the object
+            lines = lines[1:]
+        return {
+            "status": "success",
+            "data": lines[-num_lines:] if num_lines > 0 else [],
+            "range": {
+                "bytes_read": bytes_read,
+                "object_size": object_size,
+                "truncated": start > 0
+            }
+        }
+
+    def _parse_json(self, content: bytes) -> Any:
+        """Parse JSON content, in a worker process for large documents."""
+        return parser_pool.run(parse_json_content, content)
+
     def _parse_text(self, content: bytes) -> str:
-        """Parse text or markdown content."""
-        return content.decode('utf-8')
+        """Parse text or markdown content; decodes any bytes-like buffer without copying it first."""
+        return str(content, 'utf-8')
 
     def _parse_pdf(self, content: bytes) -> list:
-        """Parse PDF content to list of page texts."""
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        return [page.extract_text() for page in pdf_reader.pages]
+        """Parse PDF content to list of page texts, in a worker process for large documents."""
+        return parser_pool.run(parse_pdf_content, content)
 
 
@@ -1,5 +1,4 @@
 import os
-import boto3
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError, NoCredentialsError
@@ -9,6 +8,14 @@ import sys
 import logging
 import base64
 
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_listing import (
+    S3_MAX_KEYS_PER_PAGE, S3_LIST_PARALLEL_MIN_KEYS, ParallelLister, encode_cursor, decode_cursor, iter_object_pages, object_summary
+)
+from src.s3_utils.s3_index import listing_index
+from src.s3_utils.s3_ranged_io import parallel_getter
+from itertools import islice
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
@@ -34,12 +41,7 @@ class S3Client:
     AWS S3 Client wrapper for basic operations.
     """
     def __init__(self, access_key: str, secret_key: str, region_name: str = "eu-central-1"):
-        self.s3 = boto3.client(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region_name
-        )
+        self.s3 = client_pool.get_client(access_key, secret_key, region_name)
 
     def list_buckets(self):
         """
@@ -137,8 +139,8 @@ class S3Client:
 
     def download_file(self, bucket: str, object_name: str) -> Dict[str, Any]:
         try:
-            response = self.s3.get_object(Bucket=bucket, Key=object_name)
-            file_content = response['Body'].read()  # Read the file content
+            # Large objects are fetched as parallel ranged GETs
+            file_content, response = parallel_getter.read(self.s3, bucket, object_name)
             file_name = os.path.basename(object_name)  # Extract file name for download
             content_type = response.get('ContentType', 'application/octet-stream')
             
@@ -159,14 +161,132 @@ class S3Client:
             logger.error("Unexpected error: %s", str(e))
             return {"status": "error", "message": f"Unexpected error: {str(e)}"}
 
-    def list_objects(self, bucket: str, prefix: str = "") -> Dict[str, Any]:
+    def list_objects(self, bucket: str, prefix: str = "", max_keys: int = S3_MAX_KEYS_PER_PAGE,
+                     start_after: Optional[str] = None, cursor: Optional[str] = None,
+                     include_metadata: bool = False, parallel: bool = False) -> Dict[str, Any]:
+        """
+        List one page of objects, following continuation tokens up to ``max_keys``.
+
+        With ``parallel`` set, pages of at least ``S3_LIST_PARALLEL_MIN_KEYS`` keys
+        are listed by ``ParallelLister``, which partitions the key space by prefix
+        and lists partitions concurrently; results are still returned in key order.
+        Smaller pages need only a few sequential requests and are listed that way.
+        Buckets opted in to the local listing index are served from it instead.
+
+        Args:
+            bucket (str): Name of the S3 bucket.
+            prefix (str, optional): Key prefix filter. Defaults to "".
+            max_keys (int, optional): Maximum number of keys to return. Defaults to 1000.
+            start_after (str, optional): Only list keys after this key. Ignored when a cursor is given.
+            cursor (str, optional): Opaque cursor returned by a previous call as ``next_cursor``.
+            include_metadata (bool, optional): Return size, ETag, LastModified and storage class
+                instead of bare key names. Defaults to False.
+            parallel (bool, optional): Use the prefix-partitioned concurrent lister for bulk pages. Defaults to False.
+
+        Returns:
+            Dict[str, Any]: Status, the listed objects, ``is_truncated`` and ``next_cursor``
+                (None once the listing is complete).
+        """
         try:
-            response = self.s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-            objects = [obj["Key"] for obj in response.get("Contents", [])]
-            return {"status": "success", "bucket": bucket, "objects": objects}
+            token = None
+            if cursor:
+                state = decode_cursor(cursor, bucket, prefix)
+                token = state.get("t")
+                start_after = state.get("a", start_after)
+
+            if listing_index.is_enabled(bucket) and not token:
+                return self._list_objects_from_index(bucket, prefix, max_keys, start_after, include_metadata)
+            if parallel and not token and max_keys >= S3_LIST_PARALLEL_MIN_KEYS:
+                return self._list_objects_parallel(bucket, prefix, max_keys, start_after, include_metadata)
+
+            objects = []
+            last_page = None
+            for page in iter_object_pages(self.s3, bucket, prefix, start_after=start_after,
+                                          continuation_token=token, max_keys=max_keys):
+                last_page = page
+                for obj in page.get("Contents", []):
+                    objects.append(object_summary(obj) if include_metadata else obj["Key"])
+
+            is_truncated = bool(last_page and last_page.get("IsTruncated"))
+            next_cursor = None
+            if is_truncated:
+                next_cursor = encode_cursor(bucket, prefix, last_page.get("NextContinuationToken"))
+            return {
+                "status": "success",
+                "bucket": bucket,
+                "objects": objects,
+                "is_truncated": is_truncated,
+                "next_cursor": next_cursor
+            }
         except Exception as e:
             return format_error_response("Failed to list objects in S3 bucket", str(e))
 
+    def _list_objects_parallel(self, bucket: str, prefix: str, max_keys: int,
+                               start_after: Optional[str], include_metadata: bool) -> Dict[str, Any]:
+        """
+        Return one page from the parallel lister; the cursor resumes after the last key.
+
+        Each page plans its own partitions, which is only worth it for bulk pages.
+        """
+        stream = ParallelLister(self.s3).iter_objects(bucket, prefix, start_after=start_after)
+        try:
+            # Pull one extra key to learn whether the listing continues
+            page = list(islice(stream, max_keys + 1))
+        finally:
+            stream.close()
+        is_truncated = len(page) > max_keys
+        page = page[:max_keys]
+        next_cursor = encode_cursor(bucket, prefix, start_after=page[-1]["Key"]) if is_truncated else None
+        return {
+            "status": "success",
+            "bucket": bucket,
+            "objects": [object_summary(obj) if include_metadata else obj["Key"] for obj in page],
+            "is_truncated": is_truncated,
+            "next_cursor": next_cursor
+        }
+
+    def _list_objects_from_index(self, bucket: str, prefix: str, max_keys: int,
+                                 start_after: Optional[str], include_metadata: bool) -> Dict[str, Any]:
+        """Return one page from the local listing index, refreshing it first if stale."""
+        index_status = listing_index.ensure_fresh(self.s3, bucket, prefix)
+        rows = listing_index.query(bucket, prefix, start_after=start_after, limit=max_keys + 1)
+        is_truncated = len(rows) > max_keys
+        rows = rows[:max_keys]
+        next_cursor = encode_cursor(bucket, prefix, start_after=rows[-1]["key"]) if is_truncated else None
+        return {
+            "status": "success",
+            "bucket": bucket,
+            "objects": rows if include_metadata else [row["key"] for row in rows],
+            "is_truncated": is_truncated,
+            "next_cursor": next_cursor,
+            "index": index_status
+        }
+
+    def query_object_index(self, bucket: str, prefix: str = "", refresh: bool = False, **filters) -> Dict[str, Any]:
+        """
+        Filter and sort objects from the local listing index.
+
+        Args:
+            bucket (str): Name of an indexed S3 bucket.
+            prefix (str, optional): Key prefix filter. Defaults to "".
+            refresh (bool, optional): Force a full reconcile with S3 before querying. Defaults to False.
+            **filters: Keyword filters accepted by ``ListingIndex.query``.
+
+        Returns:
+            Dict[str, Any]: Status, matching objects with metadata and index staleness.
+        """
+        if not listing_index.is_enabled(bucket):
+            return format_error_response(
+                "Listing index is not enabled for this bucket",
+                f"Add '{bucket}' to S3_INDEX_BUCKETS to opt in"
+            )
+        try:
+            index_status = listing_index.ensure_fresh(self.s3, bucket, prefix, force=refresh)
+            objects = listing_index.query(bucket, prefix, **filters)
+            return {"status": "success", "bucket": bucket, "objects": objects, "index": index_status}
+        except Exception as e:
+            return format_error_response("Failed to query listing index", str(e))
+
     def delete_object(self, bucket: str, object_name: str) -> Dict[str, Any]:
         try:
             self.s3.delete_object(Bucket=bucket, Key=object_name)
@@ -0,0 +1,293 @@
+import os
+import re
+import sys
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from typing import Dict, Any, Callable, List, Optional
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_cache import object_cache
+from src.s3_utils.s3_listing import iter_objects
+from src.s3_utils.s3_parsers import parser_registry
+from src.s3_utils.s3_streaming import LineStream, S3_STREAM_BUFFER_SIZE
+from src.s3_utils.s3_compression import DecompressingReader, detect_codec, peek_decompressed, strip_codec_suffix
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+S3_GREP_WORKERS = int(os.getenv("S3_GREP_WORKERS", "16"))
+# Bytes transferred from S3 across all objects of one search; 0 disables the budget
+S3_GREP_MAX_BYTES = int(os.getenv("S3_GREP_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Matched lines longer than this are cut in the response
+S3_GREP_MAX_LINE_CHARS = int(os.getenv("S3_GREP_MAX_LINE_CHARS", "500"))
+
+# Formats that are not line-oriented text, even when decompressed
+_BINARY_PARSERS = ("parquet", "pdf")
+
+
+class ByteBudget:
+    """A byte allowance shared by concurrent readers; reservations shrink as it runs out."""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> int:
+        """Reserve up to ``size`` bytes and return how many were granted."""
+        with self._lock:
+            if self.limit is not None:
+                size = max(0, min(size, self.limit - self.used))
+            self.used += size
+            return size
+
+    def refund(self, size: int) -> None:
+        with self._lock:
+            self.used -= size
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self.limit is not None and self.used >= self.limit
+
+
+class _BudgetedBody:
+    """Reads an S3 body within a shared ``ByteBudget``, replaying bytes already read for sniffing."""
+
+    def __init__(self, body, budget: ByteBudget):
+        self.body = body
+        self.budget = budget
+        self.head = b""
+        self.truncated = False
+
+    def read(self, size: int = -1) -> bytes:
+        if self.head:
+            chunk = self.head if size < 0 else self.head[:size]
+            self.head = self.head[len(chunk):]
+            return chunk
+        granted = self.budget.take(S3_STREAM_BUFFER_SIZE if size < 0 else size)
+        if not granted:
+            self.truncated = True
+            return b""
+        chunk = self.body.read(granted)
+        self.budget.refund(granted - len(chunk))
+        return chunk
+
+    def close(self) -> None:
+        self.body.close()
+
+
+class S3Grep:
+    """
+    Searches every object under a prefix for a literal string or regular expression.
+
+    Objects are listed lazily and searched on a bounded thread pool, each as a
+    stream of lines: compressed objects are inflated on the fly and an object's
+    GET is closed as soon as it has ``max_matches_per_object`` matches. Lines
+    are matched as bytes, so only matching lines are decoded. All reads draw on
+    one ``ByteBudget``; when it runs out, or ``max_matches`` is reached, the
+    search stops and reports the key it can be resumed after.
+
+    Args:
+        s3: A boto3 S3 client.
+        pattern (str): The text or regular expression to search for.
+        regex (bool, optional): Treat ``pattern`` as a regular expression. Defaults to False.
+        ignore_case (bool, optional): Match case-insensitively. Defaults to False.
+        max_matches_per_object (int, optional): Stop reading an object after this many matches.
+        max_matches (int, optional): Stop the whole search after this many matches.
+        max_bytes (int, optional): Byte budget for the whole search. Defaults to ``S3_GREP_MAX_BYTES``.
+        max_workers (int, optional): Objects searched concurrently.
+        progress (Callable[[int, int], None], optional): Called with (objects searched, objects listed).
+
+    Raises:
+        ValueError: If ``pattern`` is empty or not a valid regular expression.
+    """
+
+    def __init__(self, s3, pattern: str, regex: bool = False, ignore_case: bool = False,
+                 max_matches_per_object: int = 10, max_matches: int = 1000,
+                 max_bytes: Optional[int] = None, max_workers: int = S3_GREP_WORKERS,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        if not pattern:
+            raise ValueError("The search pattern must not be empty")
+        self.s3 = s3
+        self.max_matches_per_object = max_matches_per_object
+        self.max_matches = max_matches
+        self.budget = ByteBudget(max_bytes if max_bytes is not None else (S3_GREP_MAX_BYTES or None))
+        self.max_workers = max(1, max_workers)
+        self.progress = progress
+        # A literal search without case folding needs no regular expression at all
+        self._needle = pattern.encode("utf-8") if not regex and not ignore_case else None
+        if self._needle is None:
+            try:
+                self._regex = re.compile((pattern if regex else re.escape(pattern)).encode("utf-8"),
+                                         re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {str(e)}")
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._match_count = 0
+
+    def _matches(self, line: bytes) -> bool:
+        if self._needle is not None:
+            return self._needle in line
+        return self._regex.search(line) is not None
+
+    def _reserve_match(self) -> bool:
+        """Count a match against ``max_matches``; False once the global limit is reached."""
+        with self._lock:
+            if self._match_count >= self.max_matches:
+                self._stop.set()
+                return False
+            self._match_count += 1
+            if self._match_count >= self.max_matches:
+                self._stop.set()
+            return True
+
+    def search_object(self, bucket: str, key: str) -> Dict[str, Any]:
+        """
+        Search one object and return its matches with line numbers and byte offsets.
+
+        Offsets are positions in the decompressed content, where lines are counted.
+        """
+        result = {"key": key, "matches": [], "bytes_scanned": 0, "complete": False}
+        spec = parser_registry.by_extension(strip_codec_suffix(key))
+        if spec is not None and spec.name in _BINARY_PARSERS:
+            result["skipped"] = f"{spec.name} objects are not searched"
+            result["complete"] = True
+            return result
+
+        body, _ = object_cache.open(self.s3, bucket, key)
+        budgeted = _BudgetedBody(body, self.budget)
+        head = budgeted.read(S3_STREAM_BUFFER_SIZE)
+        budgeted.head = head
+        codec = detect_codec(key, head=head)
+        sample = peek_decompressed(head, codec) if codec else head
+        if sample and b"\x00" in sample[:8192]:
+            body.close()
+            result.update(skipped="binary content", complete=True, bytes_scanned=len(head))
+            return result
+
+        reader = DecompressingReader(budgeted, codec) if codec else budgeted
+        if codec:
+            result["codec"] = codec
+        lines = LineStream(reader)
+        finished = False
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                if self._stop.is_set():
+                    break
+                if not self._matches(line):
+                    continue
+                if not self._reserve_match():
+                    break
+                text = line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+                result["matches"].append({
+                    "key": key,
+                    "line": line_number,
+                    "offset": lines.offset - len(line),
+                    "text": text[:S3_GREP_MAX_LINE_CHARS]
+                })
+                if len(result["matches"]) >= self.max_matches_per_object:
+                    # Enough for this object: later lines cannot change the answer
+                    finished = True
+                    break
+            else:
+                # A body cut off by the budget ends like a complete one
+                finished = lines.exhausted and not budgeted.truncated
+            result["complete"] = finished
+        finally:
+            lines.close()
+            result["bytes_scanned"] = reader.compressed_bytes if codec else lines.bytes_read
+        return result
+
+    def search(self, bucket: str, prefix: str = "", suffix: Optional[str] = None,
+               start_after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Search every object under ``prefix`` (optionally only keys ending with ``suffix``).
+
+        At most ``2 * max_workers`` objects are in flight, so listing never
+        runs far ahead of searching.
+
+        Returns:
+            Dict[str, Any]: ``matches`` (sorted by key and line), ``objects_searched``,
+                ``objects_listed``, ``objects_skipped``, ``bytes_scanned``, ``complete`` and,
+                when incomplete, ``resume_after`` (pass as ``start_after`` to continue).
+        """
+        listed: List[str] = []
+        results: Dict[str, Dict[str, Any]] = {}
+        listing_complete = False
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="s3-grep")
+        pending: Dict[Any, str] = {}
+        try:
+            objects = iter_objects(self.s3, bucket, prefix, start_after=start_after)
+            for obj in objects:
+                key = obj["Key"]
+                if (suffix and not key.endswith(suffix)) or not obj.get("Size"):
+                    continue
+                if self._stop.is_set() or self.budget.exhausted:
+                    break
+                while len(pending) >= 2 * self.max_workers:
+                    self._collect(pending, results, len(listed))
+                listed.append(key)
+                pending[pool.submit(self.search_object, bucket, key)] = key
+            else:
+                listing_complete = True
+            while pending:
+                self._collect(pending, results, len(listed))
+        finally:
+            self._stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        # Keys are listed in order, so the search can resume after the last key of the
+        # leading run of fully searched objects
+        resume_after = None
+        for key in listed:
+            if not results.get(key, {}).get("complete"):
+                break
+            resume_after = key
+        complete = listing_complete and all(results.get(key, {}).get("complete") for key in listed)
+
+        matches = [match for key in sorted(results) for match in results[key]["matches"]]
+        errors = [{"key": key, "error": results[key]["error"]} for key in sorted(results) if "error" in results[key]]
+        response = {
+            "matches": matches,
+            "match_count": len(matches),
+            "objects_listed": len(listed),
+            "objects_searched": sum(1 for result in results.values() if result.get("complete") and "error" not in result),
+            "objects_skipped": sum(1 for result in results.values() if "skipped" in result),
+            "bytes_scanned": self.budget.used,
+            "complete": complete
+        }
+        if errors:
+            response["errors"] = errors
+        if not complete:
+            response["resume_after"] = resume_after or start_after
+            response["stopped_by"] = "max_matches" if self._match_count >= self.max_matches else "max_bytes"
+        return response
+
+    def _collect(self, pending: Dict[Any, str], results: Dict[str, Dict[str, Any]], listed: int) -> None:
+        """Wait for at least one in-flight object, record its result and report progress."""
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            key = pending.pop(future)
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                # One unreadable object (deleted, access denied, corrupt) should not fail the search
+                logger.warning("Skipping object %s during search: %s", key, str(e))
+                results[key] = {"key": key, "matches": [], "error": str(e), "complete": True}
+        if self.progress is not None:
+            try:
+                self.progress(len(results), listed)
+            except Exception as e:
+                logger.debug("Progress callback failed: %s", str(e))
@@ -0,0 +1,315 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_listing import iter_objects, object_summary
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+
+def _split_env_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+S3_INDEX_PATH = os.getenv("S3_INDEX_PATH", "/tmp/s3_mcp_index.sqlite3")
+# Buckets served from the local index; "*" enables every bucket
+S3_INDEX_BUCKETS = _split_env_list(os.getenv("S3_INDEX_BUCKETS", ""))
+# "bucket/prefix" entries whose keys are only ever appended in sort order
+S3_INDEX_APPEND_ONLY_PREFIXES = _split_env_list(os.getenv("S3_INDEX_APPEND_ONLY_PREFIXES", ""))
+S3_INDEX_REFRESH_SECONDS = float(os.getenv("S3_INDEX_REFRESH_SECONDS", "300"))
+S3_INDEX_FULL_REFRESH_SECONDS = float(os.getenv("S3_INDEX_FULL_REFRESH_SECONDS", "3600"))
+
+# Sorts after every character S3 allows in a key, so prefix + this bounds a prefix range
+_PREFIX_UPPER_BOUND = "\U0010ffff"
+
+_ORDER_COLUMNS = {"key": "key", "size": "size", "last_modified": "last_modified", "etag": "etag"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    storage_class TEXT,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (bucket, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_last_modified ON objects (bucket, last_modified);
+CREATE INDEX IF NOT EXISTS objects_size ON objects (bucket, size);
+CREATE TABLE IF NOT EXISTS scopes (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    full_refreshed_at REAL NOT NULL,
+    PRIMARY KEY (bucket, prefix)
+);
+"""
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _stored_timestamp(value: str) -> str:
+    """
+    Convert an ISO 8601 timestamp to the UTC form stored for ``last_modified``.
+
+    Stored values compare as strings, so bound values must use the same offset
+    and layout. Timestamps without an offset are taken as UTC.
+
+    Raises:
+        ValueError: If ``value`` is not an ISO 8601 timestamp.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+class ListingIndex:
+    """
+    Local SQLite catalog of object listings for opted-in buckets.
+
+    Each indexed (bucket, prefix) is a scope with its own refresh timestamps.
+    Append-only prefixes refresh incrementally by listing with ``StartAfter`` set
+    to the largest indexed key; every scope is fully reconciled against S3 once
+    ``full_refresh_seconds`` have elapsed, which also drops deleted keys.
+    """
+
+    def __init__(self, path: str = S3_INDEX_PATH, buckets: Optional[List[str]] = None,
+                 append_only_prefixes: Optional[List[str]] = None,
+                 refresh_seconds: float = S3_INDEX_REFRESH_SECONDS,
+                 full_refresh_seconds: float = S3_INDEX_FULL_REFRESH_SECONDS):
+        self.path = path
+        self.buckets = set(S3_INDEX_BUCKETS if buckets is None else buckets)
+        self.append_only_prefixes = list(S3_INDEX_APPEND_ONLY_PREFIXES if append_only_prefixes is None
+                                         else append_only_prefixes)
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._scope_locks: Dict[tuple, threading.Lock] = {}
+
+    def is_enabled(self, bucket: str) -> bool:
+        """Return True if the bucket has opted in to index-backed listing."""
+        return "*" in self.buckets or bucket in self.buckets
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database lazily. Caller must hold the lock."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _scope_lock(self, bucket: str, prefix: str) -> threading.Lock:
+        with self._lock:
+            return self._scope_locks.setdefault((bucket, prefix), threading.Lock())
+
+    @staticmethod
+    def _key_range(prefix: str) -> tuple:
+        return prefix, prefix + _PREFIX_UPPER_BOUND
+
+    def _is_append_only(self, bucket: str, prefix: str) -> bool:
+        scope = f"{bucket}/{prefix}"
+        return any(scope.startswith(entry) for entry in self.append_only_prefixes)
+
+    def _covering_scope(self, bucket: str, prefix: str) -> Optional[sqlite3.Row]:
+        """Return the most specific indexed scope whose prefix contains ``prefix``."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT * FROM scopes WHERE bucket = ? ORDER BY length(prefix) DESC", (bucket,)
+            ).fetchall()
+        for row in rows:
+            if prefix.startswith(row["prefix"]):
+                return row
+        return None
+
+    def refresh(self, s3, bucket: str, prefix: str = "", full: bool = False) -> Dict[str, Any]:
+        """
+        Synchronise one scope with S3.
+
+        Args:
+            s3: A boto3 S3 client.
+            bucket (str): Bucket to index.
+            prefix (str, optional): Prefix of the scope. Defaults to "".
+            full (bool, optional): Force a full reconcile instead of an incremental refresh.
+
+        Returns:
+            Dict[str, Any]: The refresh mode used and the number of upserted and removed keys.
+        """
+        with self._scope_lock(bucket, prefix):
+            started_at = time.time()
+            low, high = self._key_range(prefix)
+            with self._lock:
+                scope = self._connection().execute(
+                    "SELECT * FROM scopes WHERE bucket = ? AND prefix = ?", (bucket, prefix)
+                ).fetchone()
+            incremental = scope is not None and not full and self._is_append_only(bucket, prefix)
+
+            start_after = None
+            if incremental:
+                with self._lock:
+                    row = self._connection().execute(
+                        "SELECT max(key) FROM objects WHERE bucket = ? AND key >= ? AND key < ?",
+                        (bucket, low, high)
+                    ).fetchone()
+                start_after = row[0]
+
+            upserted = 0
+            batch = []
+            for obj in iter_objects(s3, bucket, prefix, start_after=start_after):
+                summary = object_summary(obj)
+                batch.append((bucket, summary["key"], summary["size"], summary["etag"],
+                              summary["last_modified"], summary["storage_class"], started_at))
+                if len(batch) >= 1000:
+                    upserted += self._upsert(batch)
+                    batch = []
+            if batch:
+                upserted += self._upsert(batch)
+
+            removed = 0
+            with self._lock:
+                conn = self._connection()
+                if not incremental:
+                    removed = conn.execute(
+                        "DELETE FROM objects WHERE bucket = ? AND key >= ? AND key < ? AND seen_at < ?",
+                        (bucket, low, high, started_at)
+                    ).rowcount
+                full_refreshed_at = scope["full_refreshed_at"] if incremental else started_at
+                conn.execute(
+                    "INSERT OR REPLACE INTO scopes (bucket, prefix, refreshed_at, full_refreshed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (bucket, prefix, started_at, full_refreshed_at)
+                )
+                conn.commit()
+
+            mode = "incremental" if incremental else "full"
+            logger.info("Refreshed %s index for bucket: %s prefix: %s (%d upserted, %d removed).",
+                        mode, bucket, prefix, upserted, removed)
+            return {"mode": mode, "upserted": upserted, "removed": removed}
+
+    def _upsert(self, rows: List[tuple]) -> int:
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT INTO objects (bucket, key, size, etag, last_modified, storage_class, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (bucket, key) DO UPDATE SET size = excluded.size, etag = excluded.etag, "
+                "last_modified = excluded.last_modified, storage_class = excluded.storage_class, "
+                "seen_at = excluded.seen_at",
+                rows
+            )
+            conn.commit()
+        return len(rows)
+
+    def ensure_fresh(self, s3, bucket: str, prefix: str = "", force: bool = False) -> Dict[str, Any]:
+        """
+        Refresh the scope covering ``prefix`` if it is missing or stale.
+
+        Returns:
+            Dict[str, Any]: Staleness information for the covering scope.
+        """
+        scope = self._covering_scope(bucket, prefix)
+        now = time.time()
+        if scope is None or force or now - scope["full_refreshed_at"] > self.full_refresh_seconds:
+            self.refresh(s3, bucket, scope["prefix"] if scope is not None else prefix, full=True)
+        elif now - scope["refreshed_at"] > self.refresh_seconds:
+            self.refresh(s3, bucket, scope["prefix"])
+        return self.staleness(bucket, prefix)
+
+    def staleness(self, bucket: str, prefix: str = "") -> Dict[str, Any]:
+        """Describe how old the index data for ``prefix`` is."""
+        scope = self._covering_scope(bucket, prefix)
+        if scope is None:
+            return {"indexed": False}
+        now = time.time()
+        return {
+            "indexed": True,
+            "scope_prefix": scope["prefix"],
+            "refreshed_at": _isoformat(scope["refreshed_at"]),
+            "full_refreshed_at": _isoformat(scope["full_refreshed_at"]),
+            "staleness_seconds": round(now - scope["refreshed_at"], 3)
+        }
+
+    def query(self, bucket: str, prefix: str = "", start_after: Optional[str] = None,
+              suffix: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+              modified_after: Optional[str] = None, modified_before: Optional[str] = None,
+              storage_class: Optional[str] = None, order_by: str = "key", descending: bool = False,
+              limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Filter and sort indexed objects without contacting S3.
+
+        Timestamps are ISO 8601 strings with any offset (UTC if none) and are
+        converted to UTC before they are compared with the stored values.
+
+        Raises:
+            ValueError: If ``order_by`` is not a known column or a timestamp cannot be parsed.
+        """
+        if order_by not in _ORDER_COLUMNS:
+            raise ValueError(f"Unsupported order_by: {order_by}. Use one of {sorted(_ORDER_COLUMNS)}")
+        low, high = self._key_range(prefix)
+        clauses = ["bucket = ?", "key >= ?", "key < ?"]
+        params: List[Any] = [bucket, low, high]
+        if start_after:
+            clauses.append("key > ?")
+            params.append(start_after)
+        if suffix:
+            clauses.append("substr(key, -?) = ?")
+            params.extend([len(suffix), suffix])
+        if min_size is not None:
+            clauses.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("size <= ?")
+            params.append(max_size)
+        if modified_after:
+            clauses.append("last_modified > ?")
+            params.append(_stored_timestamp(modified_after))
+        if modified_before:
+            clauses.append("last_modified < ?")
+            params.append(_stored_timestamp(modified_before))
+        if storage_class:
+            clauses.append("storage_class = ?")
+            params.append(storage_class)
+
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            "SELECT key, size, etag, last_modified, storage_class FROM objects "
+            f"WHERE {' AND '.join(clauses)} ORDER BY {_ORDER_COLUMNS[order_by]} {direction}, key {direction} "
+            "LIMIT ? OFFSET ?"
+        )
+        params.extend([limit, offset])
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+
+listing_index = ListingIndex()
@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
+from botocore.exceptions import ClientError
+
+from src.s3_utils.s3_streaming import LineStream, S3_STREAM_BUFFER_SIZE
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Leave empty to keep line indexes in memory only
+S3_LINE_INDEX_DIR = os.getenv("S3_LINE_INDEX_DIR", "/tmp/s3_mcp_cache/lines")
+# A byte offset is recorded every this many lines; a lookup reads at most this many extra lines
+S3_LINE_INDEX_STRIDE = int(os.getenv("S3_LINE_INDEX_STRIDE", "1000"))
+
+# Bytes before the indexed end that are hashed to tell an append from a rewrite
+_TAIL_BYTES = 4096
+
+
+class LineIndex:
+    """
+    Sparse line-offset index of one object version.
+
+    ``offsets[j]`` is the byte offset of line ``j * stride`` (0-based). Only
+    newline-terminated lines are indexed: ``lines`` of them end at byte ``end``,
+    and ``tail_hash`` fingerprints the bytes just before ``end`` so an appended
+    version can be recognised and indexed from ``end`` onwards.
+    """
+
+    def __init__(self, bucket: str, key: str, stride: int = S3_LINE_INDEX_STRIDE,
+                 etag: Optional[str] = None, size: int = 0, lines: int = 0, end: int = 0,
+                 offsets: Optional[List[int]] = None, tail_hash: Optional[str] = None):
+        self.bucket = bucket
+        self.key = key
+        self.stride = stride
+        self.etag = etag
+        self.size = size
+        self.lines = lines
+        self.end = end
+        self.offsets = offsets if offsets is not None else []
+        self.tail_hash = tail_hash
+
+    @property
+    def total_lines(self) -> int:
+        """Lines in the object, counting a final line without a newline."""
+        return self.lines + (1 if self.size > self.end else 0)
+
+    def span(self, first: int, stop: int) -> Tuple[int, Optional[int], int]:
+        """
+        Byte range holding 0-based lines ``first`` up to ``stop`` (exclusive).
+
+        Returns:
+            Tuple[int, Optional[int], int]: The start offset, the exclusive end offset
+                (None for the rest of the object) and the lines to skip after the start.
+        """
+        checkpoint = min(first // self.stride, len(self.offsets) - 1) if self.offsets else 0
+        start = self.offsets[checkpoint] if self.offsets else 0
+        after = -(-stop // self.stride)
+        end = self.offsets[after] if after < len(self.offsets) else None
+        return start, end, first - checkpoint * self.stride
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket": self.bucket, "key": self.key, "stride": self.stride, "etag": self.etag,
+            "size": self.size, "lines": self.lines, "end": self.end, "offsets": self.offsets,
+            "tail_hash": self.tail_hash
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LineIndex":
+        return cls(**data)
+
+
+class LineIndexStore:
+    """
+    Builds line indexes by streaming objects once, and keeps them in memory and on disk.
+
+    An index is reused while the object's ETag is unchanged. When the ETag
+    changes but the object grew and the bytes before the old indexed end are
+    unchanged, only the appended bytes are streamed; otherwise the index is
+    rebuilt from the start. Concurrent requests for the same object wait for
+    a single build.
+
+    Args:
+        disk_dir (str, optional): Directory for persisted indexes; empty keeps them in memory only.
+        stride (int, optional): Lines between recorded offsets.
+    """
+
+    def __init__(self, disk_dir: Optional[str] = S3_LINE_INDEX_DIR, stride: int = S3_LINE_INDEX_STRIDE):
+        self.disk_dir = disk_dir
+        self.stride = max(1, stride)
+        self._memory: Dict[Tuple[str, str], LineIndex] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "builds": 0, "appends": 0, "bytes_scanned": 0}
+
+    def _path(self, bucket: str, key: str) -> str:
+        name = hashlib.sha1(f"{bucket}\0{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, name[:2], name + ".json")
+
+    def _load(self, bucket: str, key: str) -> Optional[LineIndex]:
+        index = self._memory.get((bucket, key))
+        if index is not None or not self.disk_dir:
+            return index
+        try:
+            with open(self._path(bucket, key), "r", encoding="utf-8") as index_file:
+                index = LineIndex.from_dict(json.load(index_file))
+        except (OSError, ValueError, TypeError):
+            return None
+        return index if index.stride == self.stride else None
+
+    def _save(self, index: LineIndex) -> None:
+        self._memory[(index.bucket, index.key)] = index
+        if not self.disk_dir:
+            return
+        path = self._path(index.bucket, index.key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as index_file:
+                json.dump(index.to_dict(), index_file, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error("Failed to write line index to disk: %s", str(e))
+
+    def get(self, s3, bucket: str, key: str) -> Tuple[LineIndex, str]:
+        """
+        Return an up-to-date index of the object and how it was obtained.
+
+        Returns:
+            Tuple[LineIndex, str]: The index and "hit", "appended" or "built".
+        """
+        with self._lock:
+            key_lock = self._locks.setdefault((bucket, key), threading.Lock())
+        with key_lock:
+            head = s3.head_object(Bucket=bucket, Key=key)
+            etag = (head.get("ETag") or "").strip('"')
+            size = head.get("ContentLength") or 0
+
+            index = self._load(bucket, key)
+            if index is not None and index.etag == etag:
+                with self._lock:
+                    self._stats["hits"] += 1
+                self._memory[(bucket, key)] = index
+                return index, "hit"
+
+            tail = self._appended_tail(s3, bucket, key, index, etag, size) if index is not None else None
+            if tail is None:
+                index, tail, state = LineIndex(bucket, key, self.stride), b"", "built"
+            else:
+                state = "appended"
+            self._extend(s3, index, etag, tail)
+            index.etag, index.size = etag, size
+            self._save(index)
+            with self._lock:
+                self._stats["builds" if state == "built" else "appends"] += 1
+            logger.info("Line index of %s/%s %s: %d lines.", bucket, key, state, index.total_lines)
+            return index, state
+
+    @staticmethod
+    def _appended_tail(s3, bucket: str, key: str, index: LineIndex, etag: str, size: int) -> Optional[bytes]:
+        """The bytes before ``index.end`` if the new version only appended to the indexed one, else None."""
+        if size < index.end:
+            return None
+        if index.end == 0:
+            return b""
+        try:
+            response = s3.get_object(Bucket=bucket, Key=key, IfMatch=f'"{etag}"',
+                                     Range=f"bytes={max(0, index.end - _TAIL_BYTES)}-{index.end - 1}")
+        except ClientError:
+            return None
+        tail = response["Body"].read()
+        return tail if hashlib.sha1(tail).hexdigest() == index.tail_hash else None
+
+    def _extend(self, s3, index: LineIndex, etag: str, tail: bytes) -> None:
+        """Stream the object from ``index.end``, recording an offset every ``stride`` lines."""
+        try:
+            response = s3.get_object(Bucket=index.bucket, Key=index.key, IfMatch=f'"{etag}"',
+                                     Range=f"bytes={index.end}-")
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "InvalidRange":
+                # Nothing past the indexed end (or an empty object)
+                return
+            raise
+        recent = bytearray(tail)
+        lines = LineStream(response["Body"], buffer_size=S3_STREAM_BUFFER_SIZE, start_offset=index.end)
+        try:
+            for line in lines:
+                if not line.endswith(b"\n"):
+                    # A final line without a newline may still grow; it is not indexed
+                    break
+                if index.lines % index.stride == 0:
+                    index.offsets.append(lines.offset - len(line))
+                index.lines += 1
+                index.end = lines.offset
+                recent += line
+                if len(recent) > 2 * _TAIL_BYTES:
+                    del recent[:-_TAIL_BYTES]
+        finally:
+            lines.close()
+            with self._lock:
+                self._stats["bytes_scanned"] += lines.bytes_read
+        index.tail_hash = hashlib.sha1(bytes(recent[-_TAIL_BYTES:])).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/build/append counters and the number of indexes held in memory."""
+        with self._lock:
+            return {**self._stats, "indexes": len(self._memory), "stride": self.stride}
+
+
+line_index_store = LineIndexStore()
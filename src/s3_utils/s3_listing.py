@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import queue
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Dict, Any, Iterator, List, Optional
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# list_objects_v2 never returns more than 1000 keys per request
+S3_MAX_KEYS_PER_PAGE = 1000
+
+S3_LIST_PARALLELISM = int(os.getenv("S3_LIST_PARALLELISM", "16"))
+# Pages within a partition are sequential and only ``queue_pages`` are buffered ahead, so
+# partitions must be small (a few pages each) for workers to list ahead of the consumer
+S3_LIST_TARGET_PARTITIONS = int(os.getenv("S3_LIST_TARGET_PARTITIONS", "256"))
+# Smaller pages are listed sequentially even when parallel listing is requested:
+# planning alone costs more requests than the page needs
+S3_LIST_PARALLEL_MIN_KEYS = int(os.getenv("S3_LIST_PARALLEL_MIN_KEYS", "10000"))
+# Boundaries used to split a flat prefix into key ranges listed via StartAfter
+S3_LIST_SPLIT_CHARS = os.getenv(
+    "S3_LIST_SPLIT_CHARS", "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+)
+
+
+# Sorts after every character a key can contain, so prefix + _MAX_CHAR bounds all keys under prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def encode_cursor(bucket: str, prefix: str, continuation_token: Optional[str] = None,
+                  start_after: Optional[str] = None) -> str:
+    """
+    Encode listing state into an opaque, URL-safe cursor.
+
+    The bucket and prefix are embedded so a cursor cannot be replayed against a
+    different listing.
+    """
+    state = {"v": 1, "b": bucket, "p": prefix}
+    if continuation_token:
+        state["t"] = continuation_token
+    if start_after:
+        state["a"] = start_after
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, bucket: str, prefix: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another bucket/prefix.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid listing cursor: {str(e)}")
+    if not isinstance(state, dict) or state.get("v") != 1:
+        raise ValueError("Invalid listing cursor: unsupported version")
+    if state.get("b") != bucket or state.get("p") != prefix:
+        raise ValueError("Listing cursor does not match the requested bucket and prefix")
+    return state
+
+
+def object_summary(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a list_objects_v2 ``Contents`` entry into a JSON-friendly dict."""
+    last_modified = obj.get("LastModified")
+    return {
+        "key": obj["Key"],
+        "size": obj.get("Size"),
+        "etag": (obj.get("ETag") or "").strip('"'),
+        "last_modified": last_modified.isoformat() if hasattr(last_modified, "isoformat") else last_modified,
+        "storage_class": obj.get("StorageClass")
+    }
+
+
+def iter_object_pages(s3, bucket: str, prefix: str = "", start_after: Optional[str] = None,
+                      continuation_token: Optional[str] = None, max_keys: Optional[int] = None,
+                      page_size: int = S3_MAX_KEYS_PER_PAGE, delimiter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield raw list_objects_v2 responses, following ``ContinuationToken``.
+
+    Only one page is held in memory at a time. When ``max_keys`` is set, the last
+    request asks for exactly the remaining number of keys so every yielded page
+    ends on a boundary that ``NextContinuationToken`` can resume from.
+
+    Args:
+        s3: A boto3 S3 client.
+        bucket (str): Bucket to list.
+        prefix (str, optional): Key prefix filter.
+        start_after (str, optional): Only return keys after this key. Ignored when resuming.
+        continuation_token (str, optional): Token to resume a previous listing.
+        max_keys (int, optional): Stop after this many keys in total.
+        page_size (int, optional): Keys per request, capped at 1000.
+        delimiter (str, optional): Group keys sharing a prefix up to this delimiter.
+    """
+    remaining = max_keys
+    token = continuation_token
+    while True:
+        request = {"Bucket": bucket, "Prefix": prefix}
+        per_page = min(page_size, S3_MAX_KEYS_PER_PAGE)
+        if remaining is not None:
+            if remaining <= 0:
+                return
+            per_page = min(per_page, remaining)
+        request["MaxKeys"] = per_page
+        if token:
+            request["ContinuationToken"] = token
+        elif start_after:
+            request["StartAfter"] = start_after
+        if delimiter:
+            request["Delimiter"] = delimiter
+
+        response = s3.list_objects_v2(**request)
+        yield response
+
+        if remaining is not None:
+            remaining -= response.get("KeyCount", len(response.get("Contents", [])))
+        if not response.get("IsTruncated"):
+            return
+        token = response.get("NextContinuationToken")
+
+
+def iter_objects(s3, bucket: str, prefix: str = "", start_after: Optional[str] = None,
+                 page_size: int = S3_MAX_KEYS_PER_PAGE) -> Iterator[Dict[str, Any]]:
+    """Yield every ``Contents`` entry under a prefix, one page in memory at a time."""
+    for page in iter_object_pages(s3, bucket, prefix, start_after=start_after, page_size=page_size):
+        for obj in page.get("Contents", []):
+            yield obj
+
+
+class ParallelLister:
+    """
+    Lists a large key space concurrently by partitioning it into disjoint ranges.
+
+    The key space under ``prefix`` is first explored with delimited listings:
+    ``CommonPrefixes`` become sub-ranges that are expanded breadth-first until
+    ``target_partitions`` is reached, while keys found directly at a level are
+    kept as single-key partitions. A level with too many direct keys to explore
+    cheaply is split into character ranges listed with ``StartAfter``.
+
+    A level can expand into far more partitions than ``target_partitions`` (e.g.
+    thousands of small daily directories); runs of neighbouring partitions are
+    then coalesced into ``target_partitions`` bounded ranges so each worker
+    still lists full pages.
+
+    Because partitions are disjoint, contiguous and sorted, listing them
+    concurrently and emitting them in partition order yields a globally sorted
+    stream. Each partition buffers at most ``queue_pages`` pages, so memory is
+    bounded by ``max_workers * queue_pages`` pages regardless of bucket size.
+    The flip side is that a partition much larger than ``queue_pages`` pages is
+    listed at sequential speed once the consumer reaches it; flat key spaces,
+    which can only be split by their leading character, gain the least.
+    """
+
+    def __init__(self, s3, max_workers: int = S3_LIST_PARALLELISM,
+                 target_partitions: int = S3_LIST_TARGET_PARTITIONS, max_depth: int = 4,
+                 delimiter: str = "/", split_chars: str = S3_LIST_SPLIT_CHARS,
+                 discovery_pages: int = 1, queue_pages: int = 4):
+        self.s3 = s3
+        self.max_workers = max(1, max_workers)
+        self.target_partitions = target_partitions
+        self.max_depth = max_depth
+        self.delimiter = delimiter
+        self.split_chars = "".join(sorted(set(split_chars)))
+        self.discovery_pages = discovery_pages
+        self.queue_pages = queue_pages
+
+    @staticmethod
+    def _range(prefix: str, low: Optional[str] = None, high: Optional[str] = None,
+               expandable: bool = True) -> Dict[str, Any]:
+        """A key range under ``prefix`` covering keys in (low, high]."""
+        return {"kind": "range", "prefix": prefix, "low": low, "high": high, "expandable": expandable}
+
+    @staticmethod
+    def _sort_key(partition: Dict[str, Any]) -> str:
+        if partition["kind"] == "key":
+            return partition["object"]["Key"]
+        return partition["low"] if partition["low"] is not None else partition["prefix"]
+
+    @staticmethod
+    def _upper_bound(partition: Dict[str, Any]) -> str:
+        """The greatest key a partition can hold."""
+        if partition["kind"] == "key":
+            return partition["object"]["Key"]
+        if partition["high"] is not None:
+            return partition["high"]
+        return partition["prefix"] + _MAX_CHAR
+
+    def _coalesce(self, prefix: str, partitions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge runs of sorted, contiguous partitions into ``target_partitions`` ranges under ``prefix``."""
+        count = max(1, self.target_partitions)
+        if len(partitions) <= count:
+            return partitions
+        merged, low = [], None
+        for group in range(count):
+            members = partitions[group * len(partitions) // count:(group + 1) * len(partitions) // count]
+            # The last range stays open so nothing after the final discovered key is missed
+            high = self._upper_bound(members[-1]) if group < count - 1 else None
+            merged.append(self._range(prefix, low, high, expandable=False))
+            low = high
+        return merged
+
+    def _split_range(self, prefix: str) -> List[Dict[str, Any]]:
+        """Split a flat prefix into character ranges bounded by prefix + split char."""
+        bounds = [None] + [prefix + char for char in self.split_chars] + [None]
+        return [self._range(prefix, bounds[i], bounds[i + 1], expandable=False) for i in range(len(bounds) - 1)]
+
+    def _discovery_start(self, prefix: str, start_after: Optional[str]) -> Optional[str]:
+        """
+        StartAfter for a delimited listing of ``prefix`` that still returns the sub-prefix holding ``start_after``.
+
+        A common prefix sorts before the keys it rolls up, so passing a key inside
+        it unchanged would skip the whole sub-prefix.
+        """
+        if not start_after or not start_after.startswith(prefix):
+            return start_after
+        cut = start_after.find(self.delimiter, len(prefix))
+        return start_after if cut < 0 else start_after[:cut]
+
+    def _expand(self, bucket: str, partition: Dict[str, Any], start_after: Optional[str]) -> List[Dict[str, Any]]:
+        """Replace one prefix range with its direct keys and sub-prefix ranges."""
+        prefix = partition["prefix"]
+        contents, prefixes, truncated = [], [], False
+        for page in iter_object_pages(self.s3, bucket, prefix, start_after=self._discovery_start(prefix, start_after),
+                                      max_keys=self.discovery_pages * S3_MAX_KEYS_PER_PAGE,
+                                      delimiter=self.delimiter):
+            contents.extend(page.get("Contents", []))
+            prefixes.extend(item["Prefix"] for item in page.get("CommonPrefixes", []))
+            truncated = bool(page.get("IsTruncated"))
+
+        if truncated:
+            # Too wide to enumerate cheaply; fall back to character ranges
+            return self._split_range(prefix)
+        children = [{"kind": "key", "object": obj} for obj in contents]
+        children.extend(self._range(sub_prefix) for sub_prefix in prefixes)
+        return children
+
+    def plan(self, bucket: str, prefix: str = "", start_after: Optional[str] = None,
+             pool: Optional[ThreadPoolExecutor] = None) -> List[Dict[str, Any]]:
+        """
+        Partition the key space under ``prefix`` into sorted, disjoint partitions.
+
+        Discovery requests for one level run concurrently on ``pool`` when given.
+        """
+        partitions = [self._range(prefix)]
+        for _ in range(self.max_depth):
+            expandable = [p for p in partitions if p["kind"] == "range" and p["expandable"]]
+            if not expandable or len(partitions) >= self.target_partitions:
+                break
+            if pool is not None:
+                expanded = list(pool.map(lambda p: self._expand(bucket, p, start_after), expandable))
+            else:
+                expanded = [self._expand(bucket, p, start_after) for p in expandable]
+            replacements = {id(p): children for p, children in zip(expandable, expanded)}
+            partitions = [child for p in partitions for child in replacements.get(id(p), [p])]
+
+        if start_after:
+            partitions = [p for p in partitions if not (
+                (p["kind"] == "key" and p["object"]["Key"] <= start_after)
+                or (p["kind"] == "range" and p["high"] is not None and p["high"] <= start_after)
+            )]
+        partitions.sort(key=self._sort_key)
+        partitions = self._coalesce(prefix, partitions)
+        logger.info("Planned %d listing partitions for bucket: %s prefix: %s.", len(partitions), bucket, prefix)
+        return partitions
+
+    def _list_range(self, bucket: str, partition: Dict[str, Any], start_after: Optional[str],
+                    output: "queue.Queue", cancelled: threading.Event) -> None:
+        """Worker: list one range and push its pages onto ``output``."""
+        def put(item) -> bool:
+            while not cancelled.is_set():
+                try:
+                    output.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            low = partition["low"]
+            if start_after is not None and (low is None or start_after > low):
+                low = start_after
+            high = partition["high"]
+            for page in iter_object_pages(self.s3, bucket, partition["prefix"], start_after=low):
+                contents = page.get("Contents", [])
+                done = False
+                if high is not None and contents and contents[-1]["Key"] > high:
+                    contents = [obj for obj in contents if obj["Key"] <= high]
+                    done = True
+                if contents and not put(contents):
+                    return
+                if done or cancelled.is_set():
+                    break
+            put(None)
+        except Exception as e:
+            put(e)
+
+    def iter_objects(self, bucket: str, prefix: str = "", start_after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every ``Contents`` entry under ``prefix`` in key order, listing partitions concurrently.
+
+        Closing the generator early cancels outstanding partition listings.
+        """
+        cancelled = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="s3-list")
+        try:
+            partitions = self.plan(bucket, prefix, start_after, pool=pool)
+            # Ranges are submitted in key order, so the range being consumed always has a worker
+            queues = []
+            for partition in partitions:
+                if partition["kind"] == "range":
+                    output = queue.Queue(maxsize=self.queue_pages)
+                    pool.submit(self._list_range, bucket, partition, start_after, output, cancelled)
+                    queues.append(output)
+                else:
+                    queues.append(None)
+
+            for partition, output in zip(partitions, queues):
+                if output is None:
+                    yield partition["object"]
+                    continue
+                while True:
+                    item = output.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    for obj in item:
+                        yield obj
+        finally:
+            cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
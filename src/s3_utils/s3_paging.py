@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import base64
+import hashlib
+import logging
+
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_serialization import dumps
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Default size of the data returned by one read, measured as compact JSON; 0 disables the budget
+S3_READ_MAX_OUTPUT_BYTES = int(os.getenv("S3_READ_MAX_OUTPUT_BYTES", str(1024 * 1024)))
+# Rough conversion used for token budgets; JSON-heavy output averages about four bytes per token
+BYTES_PER_TOKEN = 4
+
+STALE_CURSOR_MESSAGE = "Object changed since the cursor was issued; restart the read without a cursor"
+
+
+def output_limit(max_output_bytes: Optional[int] = None, max_output_tokens: Optional[int] = None) -> Optional[int]:
+    """Resolve the output budget in bytes: the tighter of the byte and token limits, else the server default."""
+    limits = [limit for limit in (max_output_bytes,
+                                  max_output_tokens * BYTES_PER_TOKEN if max_output_tokens else None) if limit]
+    if limits:
+        return min(limits)
+    return S3_READ_MAX_OUTPUT_BYTES or None
+
+
+def json_size(value: Any) -> int:
+    """Size of ``value`` serialized as compact JSON, the way it is sent to the client."""
+    return len(dumps(value).encode("utf-8"))
+
+
+class OutputBudget:
+    """
+    Admits items into a response until their combined serialized size reaches a limit.
+
+    The first item is always admitted, so a single oversized row still makes
+    progress and a cursor never points at the row it was issued for.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self.items = 0
+
+    def add(self, item: Any, size: Optional[int] = None) -> bool:
+        """
+        Count ``item`` against the budget; False if it does not fit and must not be returned.
+
+        Callers that already know the item's ``json_size`` pass it as ``size`` to avoid serializing twice.
+        """
+        if self.limit is None:
+            self.items += 1
+            return True
+        size = (json_size(item) if size is None else size) + 1
+        if self.items and self.used + size > self.limit:
+            return False
+        self.used += size
+        self.items += 1
+        return True
+
+
+def options_digest(options: Dict[str, Any]) -> str:
+    """Short fingerprint of the read options a cursor was issued for."""
+    raw = json.dumps(options, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_read_cursor(bucket: str, key: str, etag: Optional[str], kind: str, options: Dict[str, Any],
+                       **position) -> str:
+    """
+    Encode the position a read stopped at into an opaque, URL-safe cursor.
+
+    The bucket, key, ETag and a digest of the read options are embedded, so a
+    cursor cannot be replayed against another object, a changed object or a
+    different projection or filter.
+
+    Args:
+        kind (str): The read path that issued the cursor ("csv", "jsonl", "parquet", "text", "items", "bytes").
+        options (Dict[str, Any]): Read options that must match on resume.
+        **position: Resume state, e.g. ``offset`` (byte offset) and ``row`` (row index).
+    """
+    state = {"v": 1, "b": bucket, "k": key, "e": etag, "t": kind, "q": options_digest(options), **position}
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_read_cursor(cursor: str, bucket: str, key: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by ``encode_read_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another object.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid read cursor: {str(e)}")
+    if not isinstance(state, dict) or state.get("v") != 1:
+        raise ValueError("Invalid read cursor: unsupported version")
+    if state.get("b") != bucket or state.get("k") != key:
+        raise ValueError("Read cursor does not match the requested bucket and object")
+    return state
+
+
+def check_cursor(state: Dict[str, Any], kind: str, options: Dict[str, Any]) -> None:
+    """
+    Raises:
+        ValueError: If the cursor was issued by another read path or for different options.
+    """
+    if state.get("t") != kind:
+        raise ValueError(f"Read cursor was issued for a {state.get('t')} read, not a {kind} read")
+    if state.get("q") != options_digest(options):
+        raise ValueError("Read cursor was issued for different columns, filters, fields or pages")
+
+
+def check_etag(state: Dict[str, Any], etag: Optional[str]) -> None:
+    """
+    Raises:
+        ValueError: If the object changed since the cursor was issued.
+    """
+    if state.get("e") and etag and state["e"] != etag:
+        raise ValueError(STALE_CURSOR_MESSAGE)
+
+
+def page_items(data: Any, start: int, budget: OutputBudget) -> Tuple[Any, Optional[int]]:
+    """
+    Return the part of a parsed document that fits the budget, starting at item ``start``.
+
+    Lists page by element, objects by top-level key and strings by character.
+    Other values are returned whole. The second value is the index to resume
+    from, or None when the rest of the document was returned.
+    """
+    if isinstance(data, list):
+        page: List[Any] = []
+        for index in range(start, len(data)):
+            if not budget.add(data[index]):
+                return page, index
+            page.append(data[index])
+        return page, None
+    if isinstance(data, dict):
+        keys = list(data)
+        page_dict: Dict[str, Any] = {}
+        for index in range(start, len(keys)):
+            if not budget.add({keys[index]: data[keys[index]]}):
+                return page_dict, index
+            page_dict[keys[index]] = data[keys[index]]
+        return page_dict, None
+    if isinstance(data, str):
+        text = data[start:]
+        if budget.limit is None or json_size(text) <= budget.limit:
+            budget.add(text)
+            return text, None
+        # Characters take one to four bytes (six when escaped); shrink until the cut fits
+        end = budget.limit
+        while end > 1 and json_size(text[:end]) > budget.limit:
+            end = end * budget.limit // json_size(text[:end])
+        end = max(end, 1)
+        budget.add(text[:end])
+        return text[:end], start + end
+    budget.add(data)
+    return data, None
+
+
+def utf8_boundary(content: bytes) -> int:
+    """Length of ``content`` without a multi-byte UTF-8 character cut off at its end."""
+    end = len(content)
+    for back in range(1, min(4, end) + 1):
+        byte = content[end - back]
+        if byte & 0xC0 == 0x80:
+            continue
+        # ASCII or a lead byte: drop the character if it needs more bytes than remain
+        needed = 1 if byte < 0xC0 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+        return end - back if needed > back else end
+    return end
+
+
+def cut_text(content: bytes, limit: Optional[int], at_eof: bool) -> int:
+    """
+    Number of leading bytes of ``content`` to return as one page of text.
+
+    The page ends after the last complete line that fits ``limit``; a single
+    longer line is cut at a UTF-8 character boundary instead.
+    """
+    if limit is None or len(content) <= limit:
+        if at_eof:
+            return len(content)
+        newline = content.rfind(b"\n")
+        return newline + 1 if newline != -1 else len(content)
+    newline = content.rfind(b"\n", 0, limit)
+    if newline != -1:
+        return newline + 1
+    end = limit
+    # Step back over UTF-8 continuation bytes so no character is split
+    while end > 0 and content[end] & 0xC0 == 0x80:
+        end -= 1
+    return end or limit
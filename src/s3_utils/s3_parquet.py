@@ -0,0 +1,402 @@
+import sys
+import base64
+import logging
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.s3_utils.s3_ranged_io import S3RangedFile
+from src.s3_utils.s3_streaming import build_predicate, normalize_filters
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Hidden column carrying each row's position within its row group through filtering
+_POSITION = "__s3_row_position__"
+# Rows converted to Python at a time once filtered
+_CONVERT_ROWS = 1024
+
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet objects requires the optional 'pyarrow' package")
+    return pq
+
+
+def jsonable(value: Any) -> Any:
+    """Convert Arrow scalars that JSON cannot represent (timestamps, decimals, binary)."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(value).decode("ascii")
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [jsonable(item) for item in value]
+    return value
+
+
+def _align(value: Any, reference: Any) -> Any:
+    """Cast a filter value (often a JSON string) to the type of a statistics value."""
+    if isinstance(reference, bool) or isinstance(value, type(reference)):
+        return value
+    if isinstance(reference, (int, float)) and isinstance(value, str):
+        return float(value)
+    if isinstance(reference, datetime) and isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+        if reference.tzinfo is not None and parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=reference.tzinfo)
+        return parsed
+    if isinstance(reference, date) and isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def _reference(column_type) -> Any:
+    """A sample value of an Arrow type, for ``_align`` to cast filter values to; None if not needed."""
+    import pyarrow as pa
+
+    if pa.types.is_timestamp(column_type):
+        return datetime(1970, 1, 1, tzinfo=timezone.utc if column_type.tz else None)
+    if pa.types.is_date(column_type):
+        return date(1970, 1, 1)
+    if pa.types.is_integer(column_type) or pa.types.is_floating(column_type):
+        return 0.0
+    return None
+
+
+def align_conditions(conditions: List[tuple], schema) -> List[tuple]:
+    """
+    Cast filter values to the Python type of their column, as statistics pruning does.
+
+    Values that do not parse as the column's type are left unchanged.
+    """
+    aligned = []
+    for column, op, value in conditions:
+        reference = _reference(schema.field(column).type)
+        if reference is not None and op not in ("contains", "startswith"):
+            try:
+                if op == "in":
+                    value = [_align(item, reference) for item in value]
+                else:
+                    value = _align(value, reference)
+            except (TypeError, ValueError):
+                pass
+        aligned.append((column, op, value))
+    return aligned
+
+
+def arrow_filter(conditions: List[tuple], schema) -> Optional[Any]:
+    """
+    Translate aligned filters into an Arrow compute expression evaluated over whole column chunks.
+
+    Returns None when a condition cannot be expressed with the column's type,
+    in which case the caller filters row by row instead.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    expression = None
+    try:
+        for column, op, value in conditions:
+            field = pc.field(column)
+            if op == "contains":
+                condition = pc.match_substring(field.cast(pa.string()), str(value))
+            elif op == "startswith":
+                condition = pc.starts_with(field.cast(pa.string()), str(value))
+            elif op == "in":
+                condition = field.isin(pa.array(list(value)))
+            else:
+                scalar = pa.scalar(value)
+                if op in ("==", "eq"):
+                    condition = field == scalar
+                elif op in ("!=", "ne"):
+                    # Match the row predicate, where a missing value differs from any value
+                    condition = (field != scalar) | field.is_null()
+                elif op in (">", "gt"):
+                    condition = field > scalar
+                elif op in (">=", "gte"):
+                    condition = field >= scalar
+                elif op in ("<", "lt"):
+                    condition = field < scalar
+                else:
+                    condition = field <= scalar
+            expression = condition if expression is None else expression & condition
+        # Type mismatches only surface when the expression is bound to the schema
+        schema.empty_table().filter(expression)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, TypeError, ValueError) as e:
+        logger.debug("Filters not vectorizable, evaluating per row: %s", str(e))
+        return None
+    return expression
+
+
+def row_filter(conditions: List[tuple], schema) -> Tuple[Optional[Any], Optional[Callable[[Any], bool]]]:
+    """
+    Return an Arrow expression for ``conditions``, or else a row predicate over aligned values.
+
+    Returns:
+        Tuple: ``(expression, predicate)``; at most one is set, neither without conditions.
+    """
+    if not conditions:
+        return None, None
+    aligned = align_conditions(conditions, schema)
+    expression = arrow_filter(aligned, schema)
+    if expression is not None:
+        return expression, None
+    return None, build_predicate([{"column": column, "op": op, "value": value} for column, op, value in aligned])
+
+
+def apply_filter(table, expression: Optional[Any], predicate: Optional[Callable[[Any], bool]],
+                 columns: List[str]):
+    """Keep the rows of ``table`` that match; ``columns`` are the ones the predicate reads."""
+    if expression is not None:
+        return table.filter(expression)
+    if predicate is not None:
+        return table.filter([predicate(row) for row in table.select(columns).to_pylist()])
+    return table
+
+
+def _may_match(op: str, minimum: Any, maximum: Any, value: Any) -> bool:
+    """Return False only when column statistics prove no row can satisfy the condition."""
+    try:
+        if op == "in":
+            return any(_may_match("==", minimum, maximum, item) for item in value)
+        value = _align(value, minimum)
+        if op in ("==", "eq"):
+            return minimum <= value <= maximum
+        if op in ("!=", "ne"):
+            return not (minimum == maximum == value)
+        if op in (">", "gt"):
+            return maximum > value
+        if op in (">=", "gte"):
+            return maximum >= value
+        if op in ("<", "lt"):
+            return minimum < value
+        if op in ("<=", "lte"):
+            return minimum <= value
+    except (TypeError, ValueError):
+        # Incomparable types: the row group has to be read to decide
+        pass
+    return True
+
+
+def _row_group_may_match(row_group, column_index: Dict[str, int], conditions: List[tuple]) -> bool:
+    for column, op, value in conditions:
+        position = column_index.get(column)
+        if position is None:
+            continue
+        statistics = row_group.column(position).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        if not _may_match(op, statistics.min, statistics.max, value):
+            return False
+    return True
+
+
+def _chunk_ranges(row_group, columns: List[str]) -> List[tuple]:
+    """Byte ranges of the column chunks holding ``columns`` (and their nested leaves)."""
+    ranges = []
+    for position in range(row_group.num_columns):
+        chunk = row_group.column(position)
+        path = chunk.path_in_schema
+        if not any(path == column or path.startswith(column + ".") for column in columns):
+            continue
+        start = chunk.data_page_offset
+        if chunk.has_dictionary_page and chunk.dictionary_page_offset is not None:
+            start = min(start, chunk.dictionary_page_offset)
+        ranges.append((start, start + chunk.total_compressed_size))
+    return ranges
+
+
+class RowGroupScan:
+    """
+    Iterates the row groups of a Parquet file that may hold matching rows, as Arrow tables.
+
+    Row groups whose min/max statistics rule out ``conditions`` are skipped
+    without a request, as are leading row groups covered by ``skip_rows``.
+    For each remaining row group the chunks of ``columns`` are fetched with
+    concurrent range GETs before decoding. Iteration stops before the next
+    row group once ``max_bytes`` have been fetched. While iterating, ``index``
+    is the row group of the current table and ``first_row`` the position of
+    its first row within that group.
+
+    Args:
+        parquet_file: A ``pyarrow.parquet.ParquetFile`` opened over ``raw``.
+        raw (S3RangedFile): The ranged reader the file was opened over.
+        columns (List[str]): Top-level columns to decode.
+        conditions (List[tuple]): Normalized filters, see ``normalize_filters``.
+        max_bytes (int, optional): Fetch budget in bytes.
+        skip_rows (int, optional): Leading rows to drop; only valid without conditions,
+            except for rows within ``start_group`` when resuming.
+        start_group (int, optional): First row group to consider. Defaults to 0.
+    """
+
+    def __init__(self, parquet_file, raw: S3RangedFile, columns: List[str], conditions: List[tuple],
+                 max_bytes: Optional[int] = None, skip_rows: int = 0, start_group: int = 0):
+        self.parquet_file = parquet_file
+        self.raw = raw
+        self.columns = columns
+        self.conditions = conditions
+        self.max_bytes = max_bytes
+        self.skip_rows = skip_rows
+        self.start_group = start_group
+        self.index = start_group
+        self.first_row = 0
+        self.read = 0
+        self.pruned = 0
+        self.truncated = False
+        metadata = parquet_file.metadata
+        # Statistics are per leaf column; only top-level primitive columns can prune
+        self._column_index = {}
+        if metadata.num_row_groups:
+            first = metadata.row_group(0)
+            self._column_index = {first.column(position).path_in_schema: position
+                                  for position in range(first.num_columns)}
+
+    def __iter__(self):
+        metadata = self.parquet_file.metadata
+        for index in range(self.start_group, metadata.num_row_groups):
+            self.index = index
+            if self.max_bytes is not None and self.raw.bytes_fetched >= self.max_bytes:
+                self.truncated = True
+                return
+            row_group = metadata.row_group(index)
+            if self.conditions and not _row_group_may_match(row_group, self._column_index, self.conditions):
+                self.pruned += 1
+                continue
+            if self.skip_rows >= row_group.num_rows:
+                self.skip_rows -= row_group.num_rows
+                self.pruned += 1
+                continue
+
+            self.raw.prefetch(_chunk_ranges(row_group, self.columns))
+            table = self.parquet_file.read_row_group(index, columns=self.columns)
+            self.read += 1
+            self.first_row = self.skip_rows
+            if self.skip_rows:
+                table = table.slice(self.skip_rows)
+                self.skip_rows = 0
+            yield table
+        self.index = metadata.num_row_groups
+
+    def stats(self) -> Dict[str, int]:
+        return {"total": self.parquet_file.metadata.num_row_groups, "read": self.read, "pruned": self.pruned}
+
+
+def read_parquet(raw: S3RangedFile, columns: Optional[List[str]] = None, offset: int = 0,
+                 limit: Optional[int] = None, filters: Optional[Any] = None,
+                 max_bytes: Optional[int] = None, start_group: int = 0, start_row: int = 0,
+                 budget: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Read rows from a Parquet file opened over ranged GETs.
+
+    Only the footer is read up front. Row groups whose min/max statistics rule
+    out the filters are skipped, as are leading row groups covered by ``offset``
+    when there are no filters. For each remaining row group, the column chunks
+    of the projected and filtered columns are fetched concurrently, then
+    decoded. Filters run as an Arrow expression over the row group, with
+    values cast to the column types, and the offset and limit are applied as
+    slices, so only returned rows are converted to Python. Reading stops once
+    ``limit`` rows are collected, the next row does not fit ``budget`` or
+    ``max_bytes`` have been fetched.
+
+    Args:
+        raw (S3RangedFile): The object, ideally opened with ``S3RangedFile.from_suffix``.
+        columns (List[str], optional): Top-level columns to return. Defaults to all.
+        offset (int, optional): Matching rows to skip. Defaults to 0.
+        limit (int, optional): Maximum number of rows to return.
+        filters (optional): Row filters, see ``build_predicate``.
+        max_bytes (int, optional): Stop before the next row group once this many bytes were fetched.
+        start_group (int, optional): Row group to resume from.
+        start_row (int, optional): Row within ``start_group`` to resume from.
+        budget (OutputBudget, optional): Output size budget, see ``s3_paging.OutputBudget``.
+
+    Returns:
+        Dict[str, Any]: ``rows``, ``columns``, ``schema``, ``num_rows``, ``rows_scanned``,
+            ``row_groups`` (total, read, pruned), ``complete`` and, when incomplete,
+            ``resume`` (``group`` and ``row`` of the first unreturned row).
+
+    Raises:
+        ValueError: If a requested or filtered column does not exist, or pyarrow is missing.
+    """
+    pq = _import_parquet()
+    import pyarrow as pa
+
+    parquet_file = pq.ParquetFile(raw)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    names = schema.names
+
+    conditions = normalize_filters(filters)
+    filter_columns = [column for column, _, _ in conditions]
+    missing = [column for column in (columns or []) + filter_columns if column not in names]
+    if missing:
+        raise ValueError(f"Unknown Parquet columns: {missing}")
+    output_columns = columns or names
+    read_columns = list(dict.fromkeys(output_columns + filter_columns))
+    expression, predicate = row_filter(conditions, schema)
+
+    # Without filters, leading rows covered by the offset are dropped by the scan
+    scan = RowGroupScan(parquet_file, raw, read_columns, conditions, max_bytes,
+                        skip_rows=start_row + (offset if not conditions else 0), start_group=start_group)
+    rows: List[Dict[str, Any]] = []
+    skip = offset if conditions else 0
+    scanned = 0
+    resume = None
+    if limit is not None and limit <= 0:
+        resume = {"group": start_group, "row": start_row}
+    for table in ([] if resume else scan):
+        scanned += table.num_rows
+        # Positions within the row group survive filtering, so a cursor can point at the next row
+        table = table.append_column(_POSITION, pa.array(range(scan.first_row, scan.first_row + table.num_rows),
+                                                        pa.int64()))
+        table = apply_filter(table, expression, predicate, filter_columns)
+        if skip:
+            skipped = min(skip, table.num_rows)
+            table = table.slice(skipped)
+            skip -= skipped
+        if limit is not None:
+            table = table.slice(0, limit - len(rows))
+        # Convert a batch at a time so a tight budget does not convert the whole row group
+        for start in range(0, table.num_rows, _CONVERT_ROWS):
+            batch = table.slice(start, _CONVERT_ROWS)
+            positions = batch.column(_POSITION).to_pylist()
+            for position, row in zip(positions, batch.select(output_columns).to_pylist()):
+                row = {column: jsonable(value) for column, value in row.items()}
+                if budget is not None and not budget.add(row):
+                    resume = {"group": scan.index, "row": position}
+                    break
+                rows.append(row)
+            if resume:
+                break
+        if resume:
+            break
+        if limit is not None and len(rows) >= limit:
+            resume = {"group": scan.index, "row": positions[-1] + 1}
+            break
+    if resume is None and scan.truncated:
+        resume = {"group": scan.index, "row": 0}
+
+    return {
+        "rows": rows,
+        "columns": output_columns,
+        "schema": {field.name: str(field.type) for field in schema if field.name in read_columns},
+        "num_rows": metadata.num_rows,
+        "rows_scanned": scanned,
+        "row_groups": scan.stats(),
+        "complete": resume is None,
+        **({"resume": resume} if resume else {})
+    }
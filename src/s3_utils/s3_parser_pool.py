@@ -0,0 +1,268 @@
+import io
+import os
+import sys
+import json
+import mmap
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from typing import Any, Callable, Dict, List, Optional, Union
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_client_pool import client_pool
+from src.s3_utils.s3_ranged_io import MemoryReader, S3RangedFile, SpilledBuffer
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MB = 1024 * 1024
+
+S3_PARSER_PROCESSES = int(os.getenv("S3_PARSER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+S3_PARSER_TIMEOUT = float(os.getenv("S3_PARSER_TIMEOUT", "60"))
+# Address-space limit per worker process in bytes; 0 disables the limit
+S3_PARSER_MEMORY_LIMIT = int(os.getenv("S3_PARSER_MEMORY_LIMIT", str(2048 * MB)))
+# Payloads smaller than this are parsed inline; shipping them to a worker costs more than parsing
+S3_PARSER_POOL_MIN_BYTES = int(os.getenv("S3_PARSER_POOL_MIN_BYTES", str(1 * MB)))
+S3_PARSER_START_METHOD = os.getenv("S3_PARSER_START_METHOD", "spawn")
+
+
+class ParserTimeoutError(Exception):
+    """Raised when a parser job exceeds its time budget."""
+
+
+def parse_json_content(content: bytes) -> Any:
+    """Parse JSON content from any bytes-like buffer, including a memory-mapped file."""
+    if not isinstance(content, (bytes, bytearray)):
+        # json.loads only takes str, bytes or bytearray; decode without an intermediate bytes copy
+        content = str(content, json.detect_encoding(content[:4]))
+    return json.loads(content)
+
+
+def parse_pdf_content(content: bytes) -> list:
+    """Parse PDF content to list of page texts."""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BufferedReader(MemoryReader(content)))
+    return [page.extract_text() for page in pdf_reader.pages]
+
+
+def parse_page_spec(pages: Union[str, List[int]], page_count: int) -> List[int]:
+    """
+    Expand a 1-based page specification such as "1-3,7,10-" into sorted page numbers.
+
+    Pages beyond ``page_count`` are dropped; an open-ended range runs to the last page.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    if isinstance(pages, int):
+        pages = [pages]
+    if isinstance(pages, (list, tuple)):
+        numbers = {int(page) for page in pages}
+    else:
+        numbers = set()
+        for part in str(pages).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                first, last = part.split("-", 1)
+                start = int(first) if first.strip() else 1
+                end = int(last) if last.strip() else page_count
+                if start > end:
+                    raise ValueError(f"Invalid page range: {part}")
+                numbers.update(range(start, min(end, page_count) + 1))
+            else:
+                numbers.add(int(part))
+    return sorted(page for page in numbers if 1 <= page <= page_count)
+
+
+def extract_pdf_pages(stream, pages: Optional[Union[str, List[int]]] = None,
+                      max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract text from selected pages of a PDF read from a seekable stream.
+
+    PyPDF2 only reads the trailer, the cross-reference table and the objects of
+    pages that are actually extracted, so a lazily fetched stream transfers a
+    fraction of a large document. ``max_pages=0`` returns only the page count.
+
+    Returns:
+        Dict[str, Any]: ``page_count``, ``pages`` (list of {"page", "text"}) and ``truncated``.
+    """
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(stream)
+    page_count = len(pdf_reader.pages)
+    selected = parse_page_spec(pages, page_count) if pages else list(range(1, page_count + 1))
+    truncated = max_pages is not None and len(selected) > max_pages
+    if truncated:
+        selected = selected[:max_pages]
+    return {
+        "page_count": page_count,
+        "pages": [{"page": number, "text": pdf_reader.pages[number - 1].extract_text()} for number in selected],
+        "truncated": truncated
+    }
+
+
+def extract_s3_pdf_pages(source: Dict[str, Any], pages: Optional[Union[str, List[int]]] = None,
+                         max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Worker-side entry point: open a PDF in S3 through ranged GETs and extract the selected pages.
+
+    ``source`` holds the client arguments, bucket, key, size and ETag seen by the
+    caller, so the worker opens the same version without another HEAD request.
+
+    Returns:
+        Dict[str, Any]: The result of ``extract_pdf_pages`` plus ``bytes_fetched``.
+    """
+    s3 = client_pool.get_client(**source["client"])
+    raw = S3RangedFile(s3, source["bucket"], source["key"], size=source["size"], etag=source["etag"])
+    result = extract_pdf_pages(io.BufferedReader(raw, buffer_size=raw.block_size), pages, max_pages)
+    return {**result, "bytes_fetched": raw.bytes_fetched}
+
+
+def _parse_spilled(func: Callable[[Any], Any], path: str) -> Any:
+    """Worker-side entry point: map a spilled body by path instead of receiving it pickled."""
+    with open(path, "rb") as spill_file:
+        content = mmap.mmap(spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+    # Not closed explicitly: parsers may still hold views of it; it is unmapped when collected
+    return func(content)
+
+
+def _limit_worker_memory(memory_limit: int) -> None:
+    """Process pool initializer: cap the worker's address space so runaway parses raise MemoryError."""
+    if memory_limit <= 0:
+        return
+    try:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning("Could not apply parser memory limit: %s", str(e))
+
+
+class ParserPool:
+    """
+    Runs CPU-bound parsers in worker processes so they do not hold the server's GIL.
+
+    Each job has a timeout; because a running job cannot be cancelled, a timed
+    out or crashed pool is torn down (terminating its workers) and rebuilt on
+    the next submission. Jobs that were running in the torn-down pool fail
+    with an error rather than hanging.
+    """
+
+    def __init__(self, processes: int = S3_PARSER_PROCESSES, timeout: float = S3_PARSER_TIMEOUT,
+                 memory_limit: int = S3_PARSER_MEMORY_LIMIT, min_bytes: int = S3_PARSER_POOL_MIN_BYTES,
+                 start_method: str = S3_PARSER_START_METHOD):
+        self.processes = processes
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.min_bytes = min_bytes
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"inline": 0, "submitted": 0, "timeouts": 0, "failures": 0, "restarts": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_limit_worker_memory,
+                    initargs=(self.memory_limit,)
+                )
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """Terminate a pool whose workers may be stuck; the next job starts a fresh one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats["restarts"] += 1
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, func: Callable[[bytes], Any], content: bytes, timeout: Optional[float] = None) -> Any:
+        """
+        Run ``func(content)`` in a worker process, or inline for small payloads.
+
+        Raises:
+            ParserTimeoutError: If the job does not finish within the timeout.
+        """
+        size = len(content)
+        if self._use_pool(size):
+            if isinstance(content, SpilledBuffer):
+                # The body stays alive (and its file in place) until this call returns
+                return self.call(_parse_spilled, func, content.path, size=size, timeout=timeout)
+            # bytes and bytearray pickle as they are; only a memoryview needs materialising
+            if isinstance(content, memoryview):
+                content = content.tobytes()
+        return self.call(func, content, size=size, timeout=timeout)
+
+    def _use_pool(self, size: int) -> bool:
+        return self.processes > 0 and size >= self.min_bytes
+
+    def call(self, func: Callable[..., Any], *args: Any, size: int, timeout: Optional[float] = None) -> Any:
+        """
+        Run ``func(*args)`` in a worker process, or inline when ``size`` is below ``min_bytes``.
+
+        ``size`` is the number of bytes the job works on, which for jobs that
+        fetch their own input (such as ``extract_s3_pdf_pages``) is not the size
+        of the arguments.
+
+        Raises:
+            ParserTimeoutError: If the job does not finish within the timeout.
+        """
+        name = args[0].__name__ if func is _parse_spilled else func.__name__
+        if not self._use_pool(size):
+            with self._lock:
+                self._stats["inline"] += 1
+            return func(*args)
+
+        timeout = self.timeout if timeout is None else timeout
+        executor = self._get_executor()
+        with self._lock:
+            self._stats["submitted"] += 1
+        try:
+            return executor.submit(func, *args).result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            logger.error("Parser %s timed out after %ss; restarting parser pool.", name, timeout)
+            self._restart(executor)
+            raise ParserTimeoutError(f"Parsing timed out after {timeout} seconds")
+        except BrokenProcessPool:
+            with self._lock:
+                self._stats["failures"] += 1
+            logger.error("Parser pool broke while running %s; restarting.", name)
+            self._restart(executor)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Return job counters and pool configuration."""
+        with self._lock:
+            return {
+                **self._stats,
+                "processes": self.processes,
+                "timeout": self.timeout,
+                "memory_limit": self.memory_limit,
+                "running": self._executor is not None
+            }
+
+
+parser_pool = ParserPool()
@@ -0,0 +1,167 @@
+import os
+import sys
+import logging
+
+from typing import Dict, Any, Callable, List, Optional, Sequence
+from dotenv import load_dotenv
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MB = 1024 * 1024
+
+# Bytes fetched with a range GET to sniff an object's type before the bulk transfer
+S3_PARSER_PROBE_BYTES = int(os.getenv("S3_PARSER_PROBE_BYTES", str(4 * 1024)))
+
+
+def _env_limit(name: str, default: Optional[int]) -> Optional[int]:
+    """Read a size limit in bytes; 0 disables it."""
+    value = int(os.getenv(name, str(default or 0)))
+    return value or None
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if b"\x00" in head:
+        return False
+    try:
+        # The probe may end inside a multi-byte character
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return e.start >= len(head) - 3 and e.reason == "unexpected end of data"
+    return True
+
+
+def _sniff_json(head: bytes) -> bool:
+    stripped = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    return _looks_like_text(head) and stripped[:1] in (b"{", b"[") and not _sniff_jsonl(head)
+
+
+def _sniff_jsonl(head: bytes) -> bool:
+    if not _looks_like_text(head):
+        return False
+    # Only complete lines count; the last one may be cut by the probe
+    lines = [line.strip() for line in head.splitlines()[:-1] if line.strip()]
+    return len(lines) >= 2 and all(line[:1] == b"{" and line[-1:] == b"}" for line in lines)
+
+
+class ParserSpec:
+    """
+    Declares how an object type is recognised and what its parser can handle.
+
+    Args:
+        name (str): Registry name, also used as the parser key in the parsed-result cache.
+        extensions (Sequence[str]): File extensions without the dot.
+        content_types (Sequence[str]): MIME types, matched without parameters.
+        magic (Sequence[bytes]): Byte prefixes identifying the format.
+        sniff (Callable[[bytes], bool], optional): Fallback test on the probed leading bytes.
+        streaming (bool): True if the parser reads incrementally and needs no size limit.
+        max_bytes (int, optional): Largest object the parser will load whole.
+    """
+
+    def __init__(self, name: str, extensions: Sequence[str] = (), content_types: Sequence[str] = (),
+                 magic: Sequence[bytes] = (), sniff: Optional[Callable[[bytes], bool]] = None,
+                 streaming: bool = False, max_bytes: Optional[int] = None):
+        self.name = name
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.content_types = tuple(content_type.lower() for content_type in content_types)
+        self.magic = tuple(magic)
+        self.sniff = sniff
+        self.streaming = streaming
+        self.max_bytes = max_bytes
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "extensions": list(self.extensions),
+            "content_types": list(self.content_types),
+            "streaming": self.streaming,
+            "max_bytes": self.max_bytes
+        }
+
+
+class ParserRegistry:
+    """
+    Chooses a parser from an object's extension, Content-Type or leading bytes.
+
+    Lookups run in that order and only the later ones need anything from S3,
+    so callers can route on the key alone and fetch a small probe only when
+    the extension is unknown or a size limit has to be checked.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, ParserSpec] = {}
+
+    def register(self, spec: ParserSpec) -> None:
+        """Add a parser, replacing any registered under the same name."""
+        self._specs[spec.name] = spec
+
+    def get(self, name: str) -> Optional[ParserSpec]:
+        return self._specs.get(name)
+
+    def specs(self) -> List[ParserSpec]:
+        return list(self._specs.values())
+
+    def by_extension(self, object_name: str) -> Optional[ParserSpec]:
+        base_name = object_name.rsplit("/", 1)[-1].lower()
+        if "." not in base_name:
+            return None
+        extension = base_name.rsplit(".", 1)[1]
+        return next((spec for spec in self._specs.values() if extension in spec.extensions), None)
+
+    def by_content_type(self, content_type: Optional[str]) -> Optional[ParserSpec]:
+        if not content_type:
+            return None
+        mime_type = content_type.split(";", 1)[0].strip().lower()
+        return next((spec for spec in self._specs.values() if mime_type in spec.content_types), None)
+
+    def by_head(self, head: bytes) -> Optional[ParserSpec]:
+        # Exact magic numbers win over heuristic sniffers
+        for spec in self._specs.values():
+            if any(head.startswith(prefix) for prefix in spec.magic):
+                return spec
+        return next((spec for spec in self._specs.values() if spec.sniff is not None and spec.sniff(head)), None)
+
+    def resolve(self, object_name: str, content_type: Optional[str] = None,
+                head: Optional[bytes] = None) -> Optional[ParserSpec]:
+        """Return the first parser matching the extension, then the Content-Type, then the leading bytes."""
+        spec = self.by_extension(object_name) or self.by_content_type(content_type)
+        if spec is None and head is not None:
+            spec = self.by_head(head)
+        return spec
+
+
+parser_registry = ParserRegistry()
+parser_registry.register(ParserSpec(
+    "csv", extensions=("csv",), content_types=("text/csv", "application/csv"), streaming=True
+))
+parser_registry.register(ParserSpec(
+    "jsonl", extensions=("jsonl", "ndjson"),
+    content_types=("application/x-ndjson", "application/jsonl", "application/json-lines", "application/x-jsonlines"),
+    sniff=_sniff_jsonl, streaming=True
+))
+# Read over ranged GETs (footer, then projected column chunks), so no size limit applies
+parser_registry.register(ParserSpec(
+    "parquet", extensions=("parquet", "pq"),
+    content_types=("application/vnd.apache.parquet", "application/x-parquet"), magic=(b"PAR1",), streaming=True
+))
+parser_registry.register(ParserSpec(
+    "json", extensions=("json",), content_types=("application/json",), sniff=_sniff_json,
+    max_bytes=_env_limit("S3_PARSER_MAX_BYTES_JSON", 512 * MB)
+))
+parser_registry.register(ParserSpec(
+    "pdf", extensions=("pdf",), content_types=("application/pdf",), magic=(b"%PDF-",),
+    max_bytes=_env_limit("S3_PARSER_MAX_BYTES_PDF", 512 * MB)
+))
+# Registered last: any valid UTF-8 sniffs as text
+parser_registry.register(ParserSpec(
+    "text", extensions=("txt", "md"), content_types=("text/plain", "text/markdown"), sniff=_looks_like_text,
+    max_bytes=_env_limit("S3_PARSER_MAX_BYTES_TEXT", 256 * MB)
+))
@@ -0,0 +1,505 @@
+import os
+import sys
+import csv
+import json
+import logging
+from itertools import islice
+
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_streaming import (
+    LineStream, TextLines, build_predicate, coerce_value, normalize_filters, resolve_pointer
+)
+from src.s3_utils.s3_ranged_io import S3RangedFile
+from src.s3_utils.s3_parquet import RowGroupScan, _import_parquet, apply_filter, jsonable, row_filter
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Rows parsed from CSV/JSONL before they are filtered and aggregated together
+S3_QUERY_BATCH_SIZE = int(os.getenv("S3_QUERY_BATCH_SIZE", "4096"))
+
+AGGREGATE_OPS = ("count", "sum", "avg", "min", "max", "count_distinct")
+
+
+def _getter(row: Dict[str, Any], column: str) -> Any:
+    return row.get(column)
+
+
+def _coerce_column(values: List[str]) -> List[Any]:
+    """Convert a column of CSV strings to numbers, whole-column first and per value only if that fails."""
+    for convert in (int, float):
+        try:
+            return [convert(value) for value in values]
+        except ValueError:
+            continue
+    return [coerce_value(value) for value in values]
+
+
+def _extreme(func: Callable, values: List[Any]) -> Any:
+    try:
+        return func(values)
+    except TypeError:
+        # Mixed types in one column (e.g. "n/a" among numbers): compare as strings
+        return func(values, key=str)
+
+
+def _group_key(value: Any) -> Any:
+    # JSON objects and arrays are unhashable; group on their canonical serialization
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+class QueryPlan:
+    """
+    A validated tabular query: projection, filters, grouping, aggregates, ordering and limit.
+
+    Args:
+        select (List[str], optional): Columns to return for a non-aggregating query. Defaults to all.
+        filters (optional): Row filters, see ``normalize_filters``.
+        group_by (List[str], optional): Columns to group on.
+        aggregates (List[Dict[str, str]], optional): ``{"op": ..., "column": ..., "as": ...}`` entries;
+            ``op`` is one of ``AGGREGATE_OPS`` and ``column`` may be omitted for ``count``.
+        order_by (optional): Output columns to sort on, as names (``"-total"`` sorts descending)
+            or ``{"column": ..., "descending": bool}`` entries.
+        limit (int, optional): Maximum number of result rows.
+
+    Raises:
+        ValueError: If an aggregate, ordering or projection is invalid.
+    """
+
+    def __init__(self, select: Optional[List[str]] = None, filters: Optional[Any] = None,
+                 group_by: Optional[List[str]] = None, aggregates: Optional[List[Dict[str, str]]] = None,
+                 order_by: Optional[Any] = None, limit: Optional[int] = None):
+        self.select = list(select or [])
+        self.filters = filters
+        self.conditions = normalize_filters(filters)
+        self.group_by = list(group_by or [])
+        self.aggregates = self._normalize_aggregates(aggregates)
+        self.order_by = self._normalize_order_by(order_by)
+        self.limit = limit
+
+        if self.aggregating and self.select and any(column not in self.group_by for column in self.select):
+            raise ValueError("With group_by or aggregates, select may only name group_by columns")
+        if self.aggregating:
+            self.output_columns = self.group_by + [alias for _, _, alias in self.aggregates]
+            unknown = [column for column, _ in self.order_by if column not in self.output_columns]
+            if unknown:
+                raise ValueError(f"order_by must name group_by columns or aggregate aliases: {unknown}")
+        else:
+            unknown = [column for column, _ in self.order_by if self.select and column not in self.select]
+            if unknown:
+                raise ValueError(f"order_by must name selected columns: {unknown}")
+            # Empty until resolved against the object's columns
+            self.output_columns = self.select
+
+    @staticmethod
+    def _normalize_aggregates(aggregates: Optional[List[Dict[str, str]]]) -> List[tuple]:
+        normalized = []
+        for aggregate in aggregates or []:
+            if not isinstance(aggregate, dict) or "op" not in aggregate:
+                raise ValueError(f"Invalid aggregate: {aggregate}")
+            op = aggregate["op"]
+            column = aggregate.get("column")
+            if op not in AGGREGATE_OPS:
+                raise ValueError(f"Unsupported aggregate: {op}")
+            if column is None and op != "count":
+                raise ValueError(f"Aggregate {op} needs a column")
+            alias = aggregate.get("as") or (f"{op}_{column}" if column else op)
+            normalized.append((op, column, alias))
+        aliases = [alias for _, _, alias in normalized]
+        if len(set(aliases)) != len(aliases):
+            raise ValueError(f"Duplicate aggregate names: {aliases}")
+        return normalized
+
+    @staticmethod
+    def _normalize_order_by(order_by: Optional[Any]) -> List[tuple]:
+        if not order_by:
+            return []
+        if isinstance(order_by, (str, dict)):
+            order_by = [order_by]
+        normalized = []
+        for item in order_by:
+            if isinstance(item, str):
+                normalized.append((item[1:], True) if item.startswith("-") else (item, False))
+            elif isinstance(item, dict) and "column" in item:
+                normalized.append((item["column"], bool(item.get("descending", False))))
+            else:
+                raise ValueError(f"Invalid order_by: {item}")
+        return normalized
+
+    @property
+    def aggregating(self) -> bool:
+        return bool(self.group_by or self.aggregates)
+
+    def input_columns(self) -> List[str]:
+        """Columns the query reads: projection or group keys, aggregate inputs and filters."""
+        columns = self.group_by + [column for _, column, _ in self.aggregates if column] if self.aggregating \
+            else self.select + [column for column, _ in self.order_by]
+        return list(dict.fromkeys(columns + [column for column, _, _ in self.conditions]))
+
+    def options(self) -> Dict[str, Any]:
+        """The query as a cache key."""
+        return {
+            "select": self.select,
+            "filters": self.filters,
+            "group_by": self.group_by,
+            "aggregates": self.aggregates,
+            "order_by": self.order_by,
+            "limit": self.limit
+        }
+
+
+class _Aggregator:
+    """Per-group aggregate state, fed with batches of rows or with partial results computed by Arrow."""
+
+    def __init__(self, plan: QueryPlan, numeric: bool):
+        self.plan = plan
+        # CSV values arrive as strings and are converted before sums and comparisons
+        self.numeric = numeric
+        self.groups: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def _states(self, key: tuple) -> List[Dict[str, Any]]:
+        states = self.groups.get(key)
+        if states is None:
+            states = [{"count": 0, "sum": None, "min": None, "max": None, "distinct": set()}
+                      for _ in self.plan.aggregates]
+            self.groups[key] = states
+        return states
+
+    def add_rows(self, rows: List[Any], getter: Callable[[Any, str], Any]) -> None:
+        """Partition a batch by group key, then aggregate each partition's column values with builtins."""
+        group_by = self.plan.group_by
+        if group_by:
+            partitions: Dict[tuple, List[Any]] = {}
+            for row in rows:
+                key = tuple(_group_key(getter(row, column)) for column in group_by)
+                partitions.setdefault(key, []).append(row)
+        else:
+            partitions = {(): rows}
+
+        for key, members in partitions.items():
+            states = self._states(key)
+            values_by_column: Dict[str, List[Any]] = {}
+            for (op, column, _), state in zip(self.plan.aggregates, states):
+                if column is None:
+                    state["count"] += len(members)
+                    continue
+                values = values_by_column.get(column)
+                if values is None:
+                    values = [value for value in (getter(row, column) for row in members)
+                              if value is not None and value != ""]
+                    if self.numeric:
+                        values = _coerce_column(values)
+                    values_by_column[column] = values
+                if op == "count_distinct":
+                    state["distinct"].update(_group_key(value) for value in values)
+                elif not values:
+                    continue
+                elif op in ("sum", "avg"):
+                    try:
+                        total = sum(values)
+                    except TypeError:
+                        raise ValueError(f"Cannot {op} non-numeric column: {column}")
+                    self.merge(state, op, len(values), total)
+                elif op in ("min", "max"):
+                    self.merge(state, op, len(values), _extreme(min if op == "min" else max, values))
+                else:
+                    self.merge(state, op, len(values))
+
+    @staticmethod
+    def merge(state: Dict[str, Any], op: str, count: int, value: Any = None) -> None:
+        """Fold a partial result (the count, and the sum, min or max for ``op``) into a group's state."""
+        state["count"] += count
+        if value is None:
+            return
+        if op in ("sum", "avg"):
+            state["sum"] = value if state["sum"] is None else state["sum"] + value
+        elif op in ("min", "max"):
+            current = state[op]
+            state[op] = value if current is None else _extreme(min if op == "min" else max, [current, value])
+
+    def results(self) -> List[Dict[str, Any]]:
+        if not self.groups and not self.plan.group_by:
+            # An ungrouped aggregate over no rows still returns one row
+            self._states(())
+        rows = []
+        for key, states in self.groups.items():
+            row = dict(zip(self.plan.group_by, key))
+            for (op, _, alias), state in zip(self.plan.aggregates, states):
+                if op == "count":
+                    value = state["count"]
+                elif op == "count_distinct":
+                    value = len(state["distinct"])
+                elif op == "avg":
+                    value = state["sum"] / state["count"] if state["count"] and state["sum"] is not None else None
+                else:
+                    value = state[op]
+                row[alias] = value
+            rows.append(row)
+        return rows
+
+
+def _sort_key(value: Any) -> tuple:
+    # Numbers before strings before nulls, so mixed columns still sort; CSV strings sort as numbers
+    value = coerce_value(value)
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value))
+
+
+def sort_rows(rows: List[Dict[str, Any]], order_by: List[tuple]) -> List[Dict[str, Any]]:
+    """Sort result rows on several columns, each ascending or descending (stable sorts, last key first)."""
+    for column, descending in reversed(order_by):
+        rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=descending)
+    return rows
+
+
+class _RowCollector:
+    """Keeps projected rows for a non-aggregating query, bounded by ``limit``."""
+
+    def __init__(self, plan: QueryPlan):
+        self.plan = plan
+        self.rows: List[Dict[str, Any]] = []
+
+    @property
+    def full(self) -> bool:
+        """True once no later row can change the result (a limit without ordering)."""
+        return not self.plan.order_by and self.plan.limit is not None and len(self.rows) >= self.plan.limit
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows.extend(rows)
+        limit = self.plan.limit
+        if limit is None:
+            return
+        if not self.plan.order_by:
+            del self.rows[limit:]
+        elif len(self.rows) >= 2 * max(limit, S3_QUERY_BATCH_SIZE):
+            # Top-k: trim periodically so memory stays bounded by the limit
+            del sort_rows(self.rows, self.plan.order_by)[limit:]
+
+    def results(self) -> List[Dict[str, Any]]:
+        rows = sort_rows(self.rows, self.plan.order_by) if self.plan.order_by else self.rows
+        return rows[:self.plan.limit] if self.plan.limit is not None else rows
+
+
+def _finish(plan: QueryPlan, aggregator: Optional[_Aggregator], collector: Optional[_RowCollector],
+            columns: List[str]) -> Dict[str, Any]:
+    if aggregator is not None:
+        rows = aggregator.results()
+        groups = len(rows)
+        if plan.order_by:
+            sort_rows(rows, plan.order_by)
+        if plan.limit is not None:
+            rows = rows[:plan.limit]
+        if plan.select:
+            # Group keys not selected are dropped from the output
+            drop = [column for column in plan.group_by if column not in plan.select]
+            rows = [{column: value for column, value in row.items() if column not in drop} for row in rows]
+            columns = [column for column in columns if column not in drop]
+        return {"rows": [jsonable(row) for row in rows], "columns": columns, "groups": groups}
+    return {"rows": [jsonable(row) for row in collector.results()], "columns": columns}
+
+
+def _batches(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_rows(rows: Iterable[Any], plan: QueryPlan, columns: List[str],
+             getter: Callable[[Any, str], Any] = _getter, numeric: bool = False,
+             batch_size: int = S3_QUERY_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Evaluate a query over an iterator of row objects, one batch at a time.
+
+    Each batch is filtered, then either folded into per-group aggregate state
+    or projected and kept for ordering. Without aggregates or ordering, the
+    iterator is abandoned once ``limit`` rows are collected.
+
+    Args:
+        rows (Iterable): Row objects (dicts for CSV, decoded documents for JSONL).
+        plan (QueryPlan): The query.
+        columns (List[str]): Output columns of a non-aggregating query without ``select``.
+        getter (Callable, optional): Extracts a column from a row. Defaults to ``row.get(column)``.
+        numeric (bool, optional): Convert numeric-looking strings before aggregating.
+        batch_size (int, optional): Rows evaluated together.
+
+    Returns:
+        Dict[str, Any]: ``rows``, ``columns``, ``rows_scanned``, ``rows_matched`` and ``groups`` when aggregating.
+    """
+    predicate = build_predicate(plan.filters, getter=getter)
+    output_columns = plan.output_columns or columns
+    aggregator = _Aggregator(plan, numeric) if plan.aggregating else None
+    collector = None if plan.aggregating else _RowCollector(plan)
+    scanned = 0
+    matched = 0
+    for batch in _batches(rows, batch_size):
+        scanned += len(batch)
+        if predicate is not None:
+            batch = [row for row in batch if predicate(row)]
+        matched += len(batch)
+        if aggregator is not None:
+            aggregator.add_rows(batch, getter)
+            continue
+        collector.add([{column: getter(row, column) for column in output_columns} for row in batch])
+        if collector.full:
+            break
+    return {**_finish(plan, aggregator, collector, output_columns), "rows_scanned": scanned, "rows_matched": matched}
+
+
+def query_csv(body, plan: QueryPlan, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run a query over a CSV body as it streams in.
+
+    Returns:
+        Dict[str, Any]: The ``run_rows`` result plus ``bytes_scanned`` and ``complete``.
+
+    Raises:
+        ValueError: If the query names a column missing from the header.
+    """
+    lines = LineStream(body, max_bytes=max_bytes)
+    try:
+        reader = csv.DictReader(TextLines(lines))
+        header = reader.fieldnames or []
+        missing = [column for column in plan.input_columns() if column not in header]
+        if missing:
+            raise ValueError(f"Unknown CSV columns: {missing}")
+        result = run_rows(reader, plan, header, numeric=True)
+        return {**result, "bytes_scanned": lines.bytes_read, "complete": not lines.truncated}
+    finally:
+        lines.close()
+
+
+def query_jsonl(body, plan: QueryPlan, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run a query over a JSON Lines body as it streams in; columns may be JSON pointers.
+
+    Returns:
+        Dict[str, Any]: The ``run_rows`` result plus ``bytes_scanned`` and ``complete``.
+
+    Raises:
+        ValueError: If a line is not valid JSON, or a non-aggregating query has no ``select``.
+    """
+    if not plan.aggregating and not plan.select:
+        raise ValueError("Queries over JSONL objects need select, group_by or aggregates")
+    lines = LineStream(body, max_bytes=max_bytes)
+
+    def records():
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {str(e)}")
+
+    try:
+        result = run_rows(records(), plan, plan.select, getter=resolve_pointer)
+        return {**result, "bytes_scanned": lines.bytes_read, "complete": not lines.truncated}
+    finally:
+        lines.close()
+
+
+def _aggregate_table(table, plan: QueryPlan, aggregator: _Aggregator) -> None:
+    """Aggregate one row group with Arrow's hash aggregation and merge the partial results."""
+    import pyarrow.compute as pc
+
+    group_by = plan.group_by
+    # Arrow names each output column "<column>_<function>"; count_all has no input column
+    functions = []
+    for op, column, _ in plan.aggregates:
+        if column is None:
+            functions.append(([], "count_all"))
+        elif op == "count_distinct":
+            if group_by:
+                functions.append((column, "distinct"))
+        else:
+            functions.append((column, "count"))
+            if op in ("sum", "avg", "min", "max"):
+                functions.append((column, "sum" if op == "avg" else op))
+    # Deduplicated by hand: the count_all entry holds a list and cannot be hashed
+    functions = [function for position, function in enumerate(functions) if function not in functions[:position]]
+    partials = table.group_by(group_by).aggregate(functions).to_pylist() if functions else [{}]
+
+    for partial in partials:
+        states = aggregator._states(tuple(partial.get(column) for column in group_by))
+        for (op, column, _), state in zip(plan.aggregates, states):
+            if column is None:
+                state["count"] += partial["count_all"]
+            elif op == "count_distinct":
+                values = partial[f"{column}_distinct"] if group_by else pc.unique(table[column]).to_pylist()
+                state["distinct"].update(_group_key(value) for value in values if value is not None)
+            else:
+                value = partial.get(f"{column}_{'sum' if op == 'avg' else op}") if op != "count" else None
+                aggregator.merge(state, op, partial[f"{column}_count"], value)
+
+
+def query_parquet(raw: S3RangedFile, plan: QueryPlan, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run a query over a Parquet file opened over ranged GETs, one row group at a time.
+
+    Row groups are pruned by statistics and only the queried columns are
+    fetched, as in ``read_parquet``. Within a row group, filters and
+    aggregates run as Arrow compute kernels over the column chunks; only the
+    partial results per group are converted to Python.
+
+    Returns:
+        Dict[str, Any]: ``rows``, ``columns``, ``rows_scanned``, ``rows_matched``, ``groups`` when
+            aggregating, ``row_groups`` (total, read, pruned) and ``complete``.
+
+    Raises:
+        ValueError: If the query names a column the file does not have, or pyarrow is missing.
+    """
+    pq = _import_parquet()
+    parquet_file = pq.ParquetFile(raw)
+    schema = parquet_file.schema_arrow
+    names = schema.names
+    input_columns = plan.input_columns()
+    missing = [column for column in input_columns if column not in names]
+    if missing:
+        raise ValueError(f"Unknown Parquet columns: {missing}")
+    output_columns = plan.output_columns or names
+    read_columns = input_columns if plan.aggregating else list(dict.fromkeys(output_columns + input_columns))
+
+    expression, predicate = row_filter(plan.conditions, schema)
+    aggregator = _Aggregator(plan, numeric=False) if plan.aggregating else None
+    collector = None if plan.aggregating else _RowCollector(plan)
+    scan = RowGroupScan(parquet_file, raw, read_columns, plan.conditions, max_bytes)
+    scanned = 0
+    matched = 0
+    for table in scan:
+        scanned += table.num_rows
+        # Filters Arrow cannot evaluate on a column's type fall back to the row predicate
+        table = apply_filter(table, expression, predicate, [column for column, _, _ in plan.conditions])
+        matched += table.num_rows
+        if not table.num_rows:
+            continue
+        if aggregator is not None:
+            _aggregate_table(table, plan, aggregator)
+            continue
+        collector.add(table.select(output_columns).to_pylist())
+        if collector.full:
+            break
+
+    result = _finish(plan, aggregator, collector, output_columns)
+    return {
+        **result,
+        "rows_scanned": scanned,
+        "rows_matched": matched,
+        "row_groups": scan.stats(),
+        "complete": not scan.truncated
+    }
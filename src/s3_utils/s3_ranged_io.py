@@ -0,0 +1,447 @@
+import io
+import os
+import sys
+import mmap
+import weakref
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+S3_RANGED_BLOCK_SIZE = int(os.getenv("S3_RANGED_BLOCK_SIZE", str(256 * 1024)))
+S3_RANGED_MAX_BLOCKS = int(os.getenv("S3_RANGED_MAX_BLOCKS", "64"))
+
+MB = 1024 * 1024
+
+# Objects at least this large are read as concurrent ranged GETs; smaller ones use the single GET
+S3_PARALLEL_GET_THRESHOLD = int(os.getenv("S3_PARALLEL_GET_THRESHOLD", str(16 * MB)))
+S3_PARALLEL_GET_PART_SIZE = int(os.getenv("S3_PARALLEL_GET_PART_SIZE", str(8 * MB)))
+# Part requests in flight across all reads; keep below S3_CLIENT_POOL_SIZE
+S3_PARALLEL_GET_WORKERS = int(os.getenv("S3_PARALLEL_GET_WORKERS", "16"))
+
+# Bodies at least this large are spooled to a memory-mapped temporary file instead of RAM
+S3_SPILL_THRESHOLD = int(os.getenv("S3_SPILL_THRESHOLD", str(64 * MB)))
+S3_SPILL_DIR = os.getenv("S3_SPILL_DIR", tempfile.gettempdir())
+
+# Concurrent GETs used by S3RangedFile.prefetch
+S3_RANGED_PREFETCH_WORKERS = int(os.getenv("S3_RANGED_PREFETCH_WORKERS", "8"))
+
+_READ_CHUNK_SIZE = 1 * MB
+
+
+class S3RangedFile(io.RawIOBase):
+    """
+    Seekable, read-only file object over an S3 object, backed by ranged GETs.
+
+    Reads are served from fixed-size blocks fetched on demand and kept in a
+    small LRU, so libraries that seek around a file (PDF xref tables, Parquet
+    footers) transfer only the regions they touch. Every GET carries
+    ``If-Match`` with the ETag seen at open time, so a concurrent overwrite
+    fails loudly instead of mixing two versions.
+    """
+
+    def __init__(self, s3, bucket: str, key: str, size: Optional[int] = None, etag: Optional[str] = None,
+                 block_size: int = S3_RANGED_BLOCK_SIZE, max_blocks: int = S3_RANGED_MAX_BLOCKS):
+        super().__init__()
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        if size is None or etag is None:
+            head = s3.head_object(Bucket=bucket, Key=key)
+            size = head["ContentLength"]
+            etag = (head.get("ETag") or "").strip('"')
+        self.size = size
+        self.etag = etag
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._position = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_suffix(cls, s3, bucket: str, key: str, suffix_bytes: Optional[int] = None,
+                    **kwargs) -> "S3RangedFile":
+        """
+        Open a file with one suffix-range GET instead of a HEAD.
+
+        The response reports the object size and ETag and its bytes seed the
+        block cache, so formats that start reading at the end (Parquet footers,
+        PDF trailers) need no further request for their tail.
+        """
+        block_size = kwargs.get("block_size", S3_RANGED_BLOCK_SIZE)
+        suffix_bytes = suffix_bytes or 2 * block_size
+        response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{suffix_bytes}")
+        content_range = response.get("ContentRange") or ""
+        size = int(content_range.rsplit("/", 1)[1]) if "/" in content_range else response["ContentLength"]
+        raw = cls(s3, bucket, key, size=size, etag=(response.get("ETag") or "").strip('"'), **kwargs)
+        tail = response["Body"].read()
+        raw.bytes_fetched += len(tail)
+        raw.requests += 1
+        tail_start = size - len(tail)
+        # Keep only blocks that the suffix covers completely
+        for index in range(-(-tail_start // raw.block_size), (size + raw.block_size - 1) // raw.block_size):
+            start = index * raw.block_size
+            raw.store_block(index, tail[start - tail_start:min(start + raw.block_size, size) - tail_start])
+        return raw
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def fetch(self, start: int, end: int) -> bytes:
+        """Fetch bytes [start, end] (inclusive) with a single ranged GET."""
+        request = {"Bucket": self.bucket, "Key": self.key, "Range": f"bytes={start}-{end}"}
+        if self.etag:
+            request["IfMatch"] = f'"{self.etag}"'
+        data = self.s3.get_object(**request)["Body"].read()
+        with self._lock:
+            self.bytes_fetched += len(data)
+            self.requests += 1
+        return data
+
+    def _block(self, index: int) -> bytes:
+        with self._lock:
+            block = self._blocks.get(index)
+            if block is not None:
+                self._blocks.move_to_end(index)
+                return block
+        start = index * self.block_size
+        block = self.fetch(start, min(start + self.block_size, self.size) - 1)
+        self.store_block(index, block)
+        return block
+
+    def store_block(self, index: int, block: bytes) -> None:
+        """Insert a fetched block into the LRU, evicting the oldest when full."""
+        with self._lock:
+            self._blocks[index] = block
+            self._blocks.move_to_end(index)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+
+    def prefetch(self, ranges, max_workers: int = S3_RANGED_PREFETCH_WORKERS,
+                 max_request_bytes: int = S3_PARALLEL_GET_PART_SIZE) -> int:
+        """
+        Load the blocks covering the byte ranges ``[start, end)`` concurrently.
+
+        Adjacent missing blocks are coalesced into one GET of at most
+        ``max_request_bytes``. The LRU grows to hold every requested block so
+        the prefetched data is still there when it is read.
+
+        Returns:
+            int: Number of GET requests issued.
+        """
+        needed = sorted({index for start, end in ranges if end > start
+                         for index in range(start // self.block_size, (end - 1) // self.block_size + 1)})
+        with self._lock:
+            missing = [index for index in needed if index not in self._blocks]
+            self.max_blocks = max(self.max_blocks, len(needed))
+        blocks_per_request = max(1, max_request_bytes // self.block_size)
+        runs = []
+        for index in missing:
+            if runs and index == runs[-1][-1] + 1 and len(runs[-1]) < blocks_per_request:
+                runs[-1].append(index)
+            else:
+                runs.append([index])
+        if not runs:
+            return 0
+
+        def fetch_run(run):
+            start = run[0] * self.block_size
+            data = self.fetch(start, min((run[-1] + 1) * self.block_size, self.size) - 1)
+            for offset, index in enumerate(run):
+                self.store_block(index, data[offset * self.block_size:(offset + 1) * self.block_size])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(runs)))) as executor:
+            list(executor.map(fetch_run, runs))
+        return len(runs)
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self.size:
+            return 0
+        view = memoryview(buffer).cast("B")
+        wanted = min(len(view), self.size - self._position)
+        written = 0
+        while written < wanted:
+            index, block_offset = divmod(self._position, self.block_size)
+            block = self._block(index)
+            count = min(len(block) - block_offset, wanted - written)
+            if count <= 0:
+                break
+            view[written:written + count] = block[block_offset:block_offset + count]
+            written += count
+            self._position += count
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Return transfer counters for this file."""
+        return {"object_size": self.size, "bytes_fetched": self.bytes_fetched, "requests": self.requests}
+
+
+def read_into(body, view: memoryview) -> int:
+    """Fill ``view`` from a response body, using ``readinto`` when the body has it."""
+    readinto = getattr(body, "readinto", None)
+    written = 0
+    while written < len(view):
+        if readinto is not None:
+            count = readinto(view[written:])
+        else:
+            chunk = body.read(min(len(view) - written, _READ_CHUNK_SIZE))
+            count = len(chunk)
+            view[written:written + count] = chunk
+        if not count:
+            break
+        written += count
+    return written
+
+
+class SpilledBuffer(mmap.mmap):
+    """
+    An object body spooled to a temporary file and mapped into memory.
+
+    Supports the buffer protocol, slicing and ``len`` like ``bytes``, but its
+    pages live in the page cache where the kernel can write them back and
+    evict them, so the server's anonymous memory does not grow with object
+    size. ``path`` lets worker processes map the same file instead of
+    receiving a pickled copy. The file is removed when the buffer is collected.
+    """
+
+    path: str
+
+
+def _remove_spill_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def allocate_buffer(size: int, spill: bool = True):
+    """Return a writable buffer of ``size`` bytes, file-backed at or above ``S3_SPILL_THRESHOLD``."""
+    if not spill or size <= 0 or size < S3_SPILL_THRESHOLD:
+        return bytearray(size)
+    os.makedirs(S3_SPILL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="s3-body-", dir=S3_SPILL_DIR)
+    try:
+        os.ftruncate(fd, size)
+        buffer = SpilledBuffer(fd, size)
+    except BaseException:
+        _remove_spill_file(path)
+        raise
+    finally:
+        # The mapping keeps its own reference to the file
+        os.close(fd)
+    buffer.path = path
+    weakref.finalize(buffer, _remove_spill_file, path)
+    return buffer
+
+
+def read_body(body, size: Optional[int], spill: bool = True) -> bytes:
+    """
+    Read a whole response body into a buffer allocated once at its final size.
+
+    ``body.read()`` may build the payload from chunks and join them, briefly
+    holding it twice; reading into a preallocated buffer keeps the peak at the
+    body size plus one chunk. Large bodies are spooled to disk unless ``spill``
+    is False. Falls back to ``read()`` when the size is unknown.
+    """
+    if size is None:
+        return body.read()
+    buffer = allocate_buffer(size, spill)
+    written = read_into(body, memoryview(buffer))
+    if written < size:
+        if not isinstance(buffer, bytearray):
+            raise IOError(f"Response body ended after {written} of {size} bytes")
+        # Resizing a bytearray at its end happens in place
+        del buffer[written:]
+    return buffer
+
+
+class MemoryReader(io.RawIOBase):
+    """
+    Seekable read-only stream over a bytes-like object without copying it.
+
+    ``io.BytesIO`` copies anything that is not ``bytes``; parsers that need a
+    file object (PyPDF2) read straight from the caller's buffer through this instead.
+    """
+
+    def __init__(self, data):
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        count = max(0, min(len(view), len(self._view) - self._position))
+        view[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+
+class ParallelGetter:
+    """
+    Reads whole objects over several connections at once.
+
+    A single GET is limited to the throughput of one TCP connection. Objects of
+    at least ``threshold`` bytes are split into ``part_size`` ranges that are
+    fetched concurrently straight into slices of one preallocated buffer, so
+    reassembly needs no extra copy. The body of the initial GET supplies the
+    first part, and the remaining parts carry ``If-Match`` so an object
+    overwritten mid-read fails instead of mixing versions.
+    """
+
+    def __init__(self, threshold: int = S3_PARALLEL_GET_THRESHOLD, part_size: int = S3_PARALLEL_GET_PART_SIZE,
+                 max_workers: int = S3_PARALLEL_GET_WORKERS):
+        self.threshold = threshold
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"single_reads": 0, "parallel_reads": 0, "parts": 0, "bytes": 0, "spilled_reads": 0}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="s3-ranged-get")
+            return self._executor
+
+    @staticmethod
+    def _fetch_part(s3, bucket: str, key: str, etag: Optional[str], view: memoryview, start: int) -> None:
+        request = {"Bucket": bucket, "Key": key, "Range": f"bytes={start}-{start + len(view) - 1}"}
+        if etag:
+            request["IfMatch"] = etag
+        body = s3.get_object(**request)["Body"]
+        try:
+            if read_into(body, view) != len(view):
+                raise IOError(f"Short read for s3://{bucket}/{key} at byte {start}")
+        finally:
+            body.close()
+
+    def read(self, s3, bucket: str, key: str,
+             response: Optional[Dict[str, Any]] = None) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Read an object completely.
+
+        Args:
+            s3: A boto3 S3 client.
+            bucket (str): Bucket name.
+            key (str): Object key.
+            response (Dict[str, Any], optional): An unread ``get_object`` response already in
+                hand, e.g. from a conditional GET. One is issued if not given.
+
+        Returns:
+            Tuple[bytes, Dict[str, Any]]: The body (a ``bytearray``, or a ``SpilledBuffer`` above
+                ``S3_SPILL_THRESHOLD``) and the ``get_object`` response whose headers describe it.
+        """
+        if response is None:
+            response = s3.get_object(Bucket=bucket, Key=key)
+        body = response["Body"]
+        size = response.get("ContentLength")
+        if size is None or size < self.threshold or size <= self.part_size or self.max_workers <= 1:
+            data = read_body(body, size)
+            with self._lock:
+                self._stats["single_reads"] += 1
+                self._stats["bytes"] += len(data)
+                self._stats["spilled_reads"] += isinstance(data, SpilledBuffer)
+            return data, response
+
+        buffer = allocate_buffer(size)
+        view = memoryview(buffer)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._fetch_part, s3, bucket, key, response.get("ETag"),
+                            view[start:start + self.part_size], start)
+            for start in range(self.part_size, size, self.part_size)
+        ]
+        try:
+            # The open body streams the first part while the others are in flight;
+            # closing it afterwards drops the rest of that transfer
+            try:
+                if read_into(body, view[:self.part_size]) != self.part_size:
+                    raise IOError(f"Short read for s3://{bucket}/{key} at byte 0")
+            finally:
+                body.close()
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        with self._lock:
+            self._stats["parallel_reads"] += 1
+            self._stats["parts"] += len(futures) + 1
+            self._stats["bytes"] += size
+            self._stats["spilled_reads"] += isinstance(buffer, SpilledBuffer)
+        logger.info("Read %s bytes of s3://%s/%s in %d parallel parts.", size, bucket, key, len(futures) + 1)
+        return buffer, response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return read counters and the split configuration."""
+        with self._lock:
+            return {
+                **self._stats,
+                "threshold": self.threshold,
+                "part_size": self.part_size,
+                "max_workers": self.max_workers
+            }
+
+
+parallel_getter = ParallelGetter()
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import logging
+from datetime import date, datetime
+
+from typing import Dict, Any, Callable, Tuple
+from dotenv import load_dotenv
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# "auto" uses orjson when it is installed and the standard library otherwise
+S3_JSON_SERIALIZER = os.getenv("S3_JSON_SERIALIZER", "auto").lower()
+
+
+def _default(value: Any) -> Any:
+    """Serialize values JSON has no type for: dates as ISO 8601, bytes as text, anything else via ``str``."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+_SERIALIZERS: Dict[str, Callable[[Any], str]] = {"json": _json_dumps}
+
+try:
+    import orjson
+
+    def _orjson_dumps(value: Any) -> str:
+        try:
+            return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson rejects integers beyond 64 bits and a few other edge cases the standard library handles
+            return _json_dumps(value)
+
+    _SERIALIZERS["orjson"] = _orjson_dumps
+except ImportError:
+    orjson = None
+
+
+def register_serializer(name: str, dumps: Callable[[Any], str]) -> None:
+    """Make a serializer selectable by name; ``dumps`` must return compact JSON text."""
+    _SERIALIZERS[name] = dumps
+
+
+def resolve_serializer(name: str = S3_JSON_SERIALIZER) -> Tuple[str, Callable[[Any], str]]:
+    """
+    Return the serializer registered as ``name``, or the fastest available one for "auto".
+
+    Raises:
+        ValueError: If ``name`` is not registered (e.g. "orjson" without the package installed).
+    """
+    if name == "auto":
+        name = "orjson" if "orjson" in _SERIALIZERS else "json"
+    if name not in _SERIALIZERS:
+        hint = " (pip install orjson)" if name == "orjson" else ""
+        raise ValueError(f"Unknown JSON serializer: {name}{hint}; available: {sorted(_SERIALIZERS)}")
+    return name, _SERIALIZERS[name]
+
+
+serializer_name, _dumps = resolve_serializer()
+
+
+def dumps(value: Any) -> str:
+    """Serialize a tool result as compact JSON with the configured serializer."""
+    return _dumps(value)
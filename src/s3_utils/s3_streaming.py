@@ -0,0 +1,425 @@
+import os
+import sys
+import csv
+import json
+import logging
+
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+from dotenv import load_dotenv
+
+from src.s3_utils.s3_paging import json_size
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Bytes pulled from the S3 body per read; bounds memory held by the streaming readers
+S3_STREAM_BUFFER_SIZE = int(os.getenv("S3_STREAM_BUFFER_SIZE", str(64 * 1024)))
+
+csv.field_size_limit(int(os.getenv("S3_CSV_FIELD_SIZE_LIMIT", str(16 * 1024 * 1024))))
+
+
+class LineStream:
+    """
+    Splits a byte stream into lines while tracking how many bytes were consumed.
+
+    Wraps any object with ``read(n)`` (a botocore ``StreamingBody``, a file) and
+    holds at most one buffer of ``buffer_size`` bytes plus the current line.
+    ``offset`` is the byte offset just past the last line handed out, which
+    lets callers resume from a row boundary with a ranged GET. ``truncated``
+    is set once a read is refused because ``max_bytes`` is spent, as opposed
+    to ``exhausted``, which marks the end of the object.
+    """
+
+    def __init__(self, body, buffer_size: int = S3_STREAM_BUFFER_SIZE, start_offset: int = 0,
+                 max_bytes: Optional[int] = None):
+        self.body = body
+        self.buffer_size = buffer_size
+        self.offset = start_offset
+        self.bytes_read = 0
+        self.max_bytes = max_bytes
+        self.exhausted = False
+        self.truncated = False
+        self._buffer = b""
+        self._position = 0
+        # Pieces of a line that spans several chunks, joined once the line ends
+        self._pending: List[bytes] = []
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer; returns False at end of stream or budget."""
+        if self.max_bytes is not None and self.bytes_read >= self.max_bytes:
+            self.truncated = True
+            return False
+        size = self.buffer_size
+        if self.max_bytes is not None:
+            size = min(size, self.max_bytes - self.bytes_read)
+        chunk = self.body.read(size)
+        if not chunk:
+            self.exhausted = True
+            return False
+        self.bytes_read += len(chunk)
+        if self._position < len(self._buffer):
+            self._pending.append(self._buffer[self._position:])
+        self._buffer = chunk
+        self._position = 0
+        return True
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        while True:
+            end = self._buffer.find(b"\n", self._position)
+            if end != -1:
+                line = self._take(end + 1)
+                self.offset += len(line)
+                return line
+            if not self._fill():
+                # Only a line ended by end-of-object is complete; one cut by max_bytes is not
+                if self.exhausted and (self._pending or self._position < len(self._buffer)):
+                    line = self._take(len(self._buffer))
+                    self.offset += len(line)
+                    return line
+                raise StopIteration
+
+    def _take(self, end: int) -> bytes:
+        """Return the pending pieces plus the buffer up to ``end`` as one line."""
+        piece = self._buffer[self._position:end]
+        self._position = end
+        if not self._pending:
+            return piece
+        self._pending.append(piece)
+        line = b"".join(self._pending)
+        self._pending = []
+        return line
+
+    def close(self) -> None:
+        """Close the underlying body so the HTTP connection stops transferring."""
+        close = getattr(self.body, "close", None)
+        if close is not None:
+            close()
+
+
+class TextLines:
+    """Decodes a ``LineStream`` one line at a time, so no whole-object ``str`` is built."""
+
+    def __init__(self, lines: LineStream, encoding: str = "utf-8"):
+        self.lines = lines
+        self.encoding = encoding
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        # "\n" never occurs inside a multi-byte UTF-8 sequence, so each line decodes on its own
+        return next(self.lines).decode(self.encoding, errors="replace")
+
+
+def coerce_value(value: Any) -> Any:
+    """Convert numeric-looking strings so filters like ``> 5`` compare numerically."""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+
+def _compare(op: str, actual: Any, expected: Any) -> bool:
+    if op == "contains":
+        return actual is not None and str(expected) in str(actual)
+    if op == "startswith":
+        return actual is not None and str(actual).startswith(str(expected))
+    if op == "in":
+        return actual in expected or coerce_value(actual) in [coerce_value(item) for item in expected]
+
+    left, right = coerce_value(actual), coerce_value(expected)
+    if op in ("==", "eq"):
+        return left == right
+    if op in ("!=", "ne"):
+        return left != right
+    if left is None or right is None:
+        return False
+    try:
+        if op in (">", "gt"):
+            return left > right
+        if op in (">=", "gte"):
+            return left >= right
+        if op in ("<", "lt"):
+            return left < right
+        if op in ("<=", "lte"):
+            return left <= right
+    except TypeError:
+        # Mixed types (e.g. "abc" > 5): fall back to comparing as strings
+        return _compare(op, str(left), str(right))
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+SUPPORTED_FILTER_OPS = ("==", "!=", ">", ">=", "<", "<=", "eq", "ne", "gt", "gte", "lt", "lte",
+                        "contains", "startswith", "in")
+
+
+def normalize_filters(filters: Optional[Any]) -> List[tuple]:
+    """
+    Turn a filter specification into a list of ``(column, op, value)`` conditions.
+
+    Filters are either a mapping of ``{column: value}`` (equality) or a list of
+    ``{"column": ..., "op": ..., "value": ...}`` conditions, all of which must match.
+
+    Raises:
+        ValueError: If a condition is malformed or uses an unknown operator.
+    """
+    if not filters:
+        return []
+    if isinstance(filters, dict):
+        filters = [{"column": column, "op": "==", "value": value} for column, value in filters.items()]
+
+    conditions = []
+    for condition in filters:
+        if not isinstance(condition, dict) or "column" not in condition:
+            raise ValueError(f"Invalid filter: {condition}")
+        op = condition.get("op", "==")
+        if op not in SUPPORTED_FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        conditions.append((condition["column"], op, condition.get("value")))
+    return conditions
+
+
+def build_predicate(filters: Optional[Any],
+                    getter: Optional[Callable[[Any, str], Any]] = None) -> Optional[Callable[[Any], bool]]:
+    """
+    Build a row predicate from simple filters, see ``normalize_filters``.
+
+    Args:
+        filters: The filter specification, or None for no filtering.
+        getter (Callable, optional): Extracts a column from a row. Defaults to ``row.get(column)``.
+
+    Raises:
+        ValueError: If a condition is malformed or uses an unknown operator.
+    """
+    conditions = normalize_filters(filters)
+    if not conditions:
+        return None
+
+    get = getter or (lambda row, column: row.get(column))
+
+    def predicate(row) -> bool:
+        return all(_compare(op, get(row, column), value) for column, op, value in conditions)
+
+    return predicate
+
+
+def select_rows(rows: Iterable[Any], predicate: Optional[Callable[[Any], bool]] = None,
+                offset: int = 0, limit: Optional[int] = None) -> Iterator[Any]:
+    """Apply a predicate, skip ``offset`` matches and stop after ``limit`` matches."""
+    skipped = 0
+    emitted = 0
+    if limit is not None and limit <= 0:
+        return
+    for row in rows:
+        if predicate is not None and not predicate(row):
+            continue
+        if skipped < offset:
+            skipped += 1
+            continue
+        yield row
+        emitted += 1
+        if limit is not None and emitted >= limit:
+            return
+
+
+def stream_csv(body, columns: Optional[List[str]] = None, offset: int = 0, limit: Optional[int] = None,
+               filters: Optional[Any] = None, max_bytes: Optional[int] = None,
+               buffer_size: int = S3_STREAM_BUFFER_SIZE, start_offset: int = 0, start_row: int = 0,
+               header: Optional[List[str]] = None, budget: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Parse CSV rows incrementally from an S3 body.
+
+    The body is decoded line by line and fed to ``csv.DictReader``, so memory is
+    bounded by ``buffer_size`` plus the rows being returned. Once ``limit``
+    matching rows have been collected, or the next row does not fit ``budget``,
+    the body is closed, ending the GET early.
+
+    Args:
+        body: A botocore ``StreamingBody`` or any object with ``read(n)``.
+        columns (List[str], optional): Only return these columns.
+        offset (int, optional): Number of matching rows to skip. Defaults to 0.
+        limit (int, optional): Maximum number of rows to return.
+        filters (optional): Row filters, see ``build_predicate``.
+        max_bytes (int, optional): Stop after reading this many bytes from S3.
+        buffer_size (int, optional): Bytes read from the body at a time.
+        start_offset (int, optional): Byte offset of ``body`` within the object when resuming.
+        start_row (int, optional): Index of the first row of ``body`` when resuming.
+        header (List[str], optional): Column names when resuming past the header line.
+        budget (OutputBudget, optional): Output size budget, see ``s3_paging.OutputBudget``.
+
+    Returns:
+        Dict[str, Any]: ``rows``, ``columns`` (the header), ``rows_scanned``, ``bytes_scanned``,
+            ``complete`` (False if reading stopped before the end of the object) and, when
+            incomplete, ``resume`` (``offset``, ``row`` and ``header`` of the first unreturned row).
+    """
+    lines = LineStream(body, buffer_size=buffer_size, start_offset=start_offset, max_bytes=max_bytes)
+    try:
+        reader = csv.DictReader(TextLines(lines), fieldnames=header)
+        header = reader.fieldnames or []
+        if columns:
+            missing = [column for column in columns if column not in header]
+            if missing:
+                raise ValueError(f"Unknown CSV columns: {missing}")
+
+        scanned = 0
+        row_start = lines.offset
+
+        def counted(rows):
+            nonlocal scanned, row_start
+            while True:
+                row_start = lines.offset
+                row = next(rows, None)
+                if row is None:
+                    return
+                scanned += 1
+                yield row
+
+        result = []
+        resume = None
+        for row in select_rows(counted(reader), build_predicate(filters), offset, limit):
+            row = {column: row.get(column) for column in columns} if columns else row
+            if budget is not None and not budget.add(row):
+                resume = {"offset": row_start, "row": start_row + scanned - 1}
+                break
+            result.append(row)
+        if resume is None and not lines.exhausted:
+            # Stopped by limit or max_bytes: continue after the last row read
+            resume = {"offset": lines.offset, "row": start_row + scanned}
+
+        response = {
+            "rows": result,
+            "columns": columns or header,
+            "rows_scanned": scanned,
+            "bytes_scanned": lines.bytes_read,
+            "complete": resume is None
+        }
+        if resume is not None:
+            response["resume"] = {**resume, "header": header}
+        return response
+    finally:
+        lines.close()
+
+
+_MISSING = object()
+
+
+def resolve_pointer(document: Any, pointer: str, default: Any = None) -> Any:
+    """
+    Resolve an RFC 6901 JSON pointer (e.g. ``/user/id`` or ``/items/0``) against a document.
+
+    A field name without a leading slash is treated as a top-level key.
+    """
+    if not pointer.startswith("/"):
+        return document.get(pointer, default) if isinstance(document, dict) else default
+    current = document
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(current, dict):
+            current = current.get(token, _MISSING)
+        elif isinstance(current, list) and token.isdigit() and int(token) < len(current):
+            current = current[int(token)]
+        else:
+            current = _MISSING
+        if current is _MISSING:
+            return default
+    return current
+
+
+def stream_jsonl(body, fields: Optional[List[str]] = None, offset: int = 0, limit: Optional[int] = None,
+                 filters: Optional[Any] = None, max_bytes: Optional[int] = None,
+                 buffer_size: int = S3_STREAM_BUFFER_SIZE, start_offset: int = 0, start_row: int = 0,
+                 budget: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Parse JSON Lines records incrementally from an S3 body.
+
+    Each line is decoded and parsed on its own; the body is closed as soon as
+    ``limit`` matching records have been collected or the next one does not
+    fit ``budget``.
+
+    Args:
+        body: A botocore ``StreamingBody`` or any object with ``read(n)``.
+        fields (List[str], optional): JSON pointers or top-level keys to project each record onto.
+        offset (int, optional): Number of matching records to skip. Defaults to 0.
+        limit (int, optional): Maximum number of records to return.
+        filters (optional): Record filters, see ``build_predicate``; columns may be JSON pointers.
+        max_bytes (int, optional): Stop after reading this many bytes from S3.
+        buffer_size (int, optional): Bytes read from the body at a time.
+        start_offset (int, optional): Byte offset of ``body`` within the object when resuming.
+        start_row (int, optional): Number of lines before ``body`` when resuming.
+        budget (OutputBudget, optional): Output size budget, see ``s3_paging.OutputBudget``.
+
+    Returns:
+        Dict[str, Any]: ``rows``, ``rows_scanned``, ``bytes_scanned``, ``bytes_returned``
+            (compact JSON size of ``rows`` in bytes), ``complete`` and, when incomplete, ``resume``
+            (``offset`` and ``row``, the line index, of the first unreturned record).
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    lines = LineStream(body, buffer_size=buffer_size, start_offset=start_offset, max_bytes=max_bytes)
+    scanned = 0
+    line_number = start_row
+    row_start = start_offset
+
+    def records():
+        nonlocal scanned, line_number, row_start
+        while True:
+            row_start = lines.offset
+            line = next(lines, None)
+            if line is None:
+                return
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {str(e)}")
+            scanned += 1
+            yield record
+
+    try:
+        predicate = build_predicate(filters, getter=resolve_pointer)
+        result = []
+        bytes_returned = 0
+        resume = None
+        for record in select_rows(records(), predicate, offset, limit):
+            if fields:
+                record = {field: resolve_pointer(record, field) for field in fields}
+            size = json_size(record)
+            if budget is not None and not budget.add(record, size):
+                resume = {"offset": row_start, "row": line_number - 1}
+                break
+            bytes_returned += size
+            result.append(record)
+        if resume is None and not lines.exhausted:
+            resume = {"offset": lines.offset, "row": line_number}
+
+        response = {
+            "rows": result,
+            "rows_scanned": scanned,
+            "bytes_scanned": lines.bytes_read,
+            "bytes_returned": bytes_returned,
+            "complete": resume is None
+        }
+        if resume is not None:
+            response["resume"] = resume
+        return response
+    finally:
+        lines.close()
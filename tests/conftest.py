@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+import pytest
+
+# Module-level configuration is read at import time, so it must be set before src is imported
+_SCRATCH = tempfile.mkdtemp(prefix="s3_mcp_tests_")
+os.environ.update({
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "S3_ENDPOINT_URL": "",
+    "S3_CACHE_DISK_DIR": os.path.join(_SCRATCH, "cache"),
+    "S3_PARSED_CACHE_DISK_DIR": os.path.join(_SCRATCH, "cache", "parsed"),
+    "S3_LINE_INDEX_DIR": os.path.join(_SCRATCH, "lines"),
+    "S3_INDEX_PATH": os.path.join(_SCRATCH, "index.sqlite3"),
+    "S3_SPILL_DIR": _SCRATCH
+})
+
+import boto3
+from moto import mock_aws
+
+from src.s3_utils.s3_client_pool import client_pool
+
+BUCKET = "test-bucket"
+REGION = "us-east-1"
+ACCESS_KEY = "testing"
+SECRET_KEY = "testing"
+
+
+@pytest.fixture
+def s3():
+    """A moto-backed S3 client with an empty ``BUCKET``; pooled clients are rebuilt inside the mock."""
+    with mock_aws():
+        client_pool.clear()
+        client = boto3.client("s3", region_name=REGION)
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        client_pool.clear()
+
+
+@pytest.fixture
+def reader(s3, tmp_path, monkeypatch):
+    """An ``S3FileDownloader`` over the moto bucket with fresh, test-local caches."""
+    from src.s3_utils import s3_file_transfer
+    from src.s3_utils.s3_cache import ObjectCache, ParsedResultCache
+    from src.s3_utils.s3_line_index import LineIndexStore
+
+    monkeypatch.setattr(s3_file_transfer, "object_cache", ObjectCache(disk_dir=str(tmp_path / "objects")))
+    monkeypatch.setattr(s3_file_transfer, "parsed_cache", ParsedResultCache(disk_dir=str(tmp_path / "parsed")))
+    monkeypatch.setattr(s3_file_transfer, "line_index_store", LineIndexStore(disk_dir=str(tmp_path / "lines")))
+    return s3_file_transfer.S3FileDownloader(ACCESS_KEY, SECRET_KEY, REGION)
@@ -0,0 +1,56 @@
+import time
+import asyncio
+import threading
+
+from src.s3_utils.s3_async import BlockingExecutor
+
+
+def test_per_tool_limit_caps_concurrent_calls():
+    executor = BlockingExecutor(max_workers=8, default_limit=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    async def burst():
+        await asyncio.gather(*(executor.run("slow_tool", work) for _ in range(8)))
+
+    try:
+        asyncio.run(burst())
+    finally:
+        executor.shutdown()
+    assert peak[0] == 2
+
+
+def test_limit_override_from_environment(monkeypatch):
+    monkeypatch.setenv("S3_MCP_TOOL_CONCURRENCY_S3_READ_FILE", "3")
+    executor = BlockingExecutor(max_workers=4, default_limit=16)
+    try:
+        assert executor.limit_for("s3_read_file") == 3
+        assert executor.limit_for("s3_grep") == 16
+    finally:
+        executor.shutdown()
+
+
+def test_exceptions_propagate_to_the_caller():
+    executor = BlockingExecutor(max_workers=1, default_limit=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def call():
+        try:
+            await executor.run("tool", fail)
+        except ValueError as e:
+            return str(e)
+
+    try:
+        assert asyncio.run(call()) == "boom"
+    finally:
+        executor.shutdown()
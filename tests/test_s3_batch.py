@@ -0,0 +1,48 @@
+import json
+
+from src.s3_utils.s3_batch import BatchReader, glob_prefix
+from tests.conftest import BUCKET
+
+
+def test_glob_prefix():
+    assert glob_prefix("configs/prod/*.json") == "configs/prod/"
+    assert glob_prefix("a/b?/c") == "a/b"
+    assert glob_prefix("plain/key") == "plain/key"
+
+
+def _put_configs(s3):
+    for name in ("a", "b", "c"):
+        s3.put_object(Bucket=BUCKET, Key=f"configs/{name}.json", Body=json.dumps({"name": name}).encode())
+    s3.put_object(Bucket=BUCKET, Key="configs/notes.txt", Body=b"not json")
+    s3.put_object(Bucket=BUCKET, Key="configs/broken.json", Body=b"{")
+
+
+def test_read_files_by_pattern_reports_each_object(reader, s3):
+    _put_configs(s3)
+    result = reader.read_files(BUCKET, pattern="configs/*.json")
+
+    assert result["status"] == "success", result
+    by_key = {entry["key"]: entry for entry in result["results"]}
+    assert sorted(by_key) == ["configs/a.json", "configs/b.json", "configs/broken.json", "configs/c.json"]
+    assert by_key["configs/b.json"]["data"] == {"name": "b"}
+    assert by_key["configs/broken.json"]["status"] == "error"
+    assert (result["succeeded"], result["failed"], result["skipped"]) == (3, 1, 0)
+
+
+def test_explicit_keys_keep_order_and_respect_limits(reader, s3):
+    _put_configs(s3)
+    result = reader.read_files(BUCKET, ["configs/c.json", "configs/a.json", "configs/c.json", "configs/b.json"],
+                               max_objects=2)
+    assert [entry["key"] for entry in result["results"]] == ["configs/c.json", "configs/a.json"]
+    assert result["truncated"] is True
+
+
+def test_results_beyond_the_byte_budget_are_skipped(s3):
+    outcomes = {"k1": "x" * 40, "k2": "y" * 40, "k3": "z"}
+    batch = BatchReader(s3, lambda bucket, key: {"status": "success", "data": outcomes[key]}, max_total_bytes=60)
+
+    listed = [{"key": "k1", "size": 40}, {"key": "big", "size": 1000}, {"key": "k2", "size": None},
+              {"key": "k3", "size": 1}]
+    result = batch.run(BUCKET, listed)
+    assert [entry["status"] for entry in result["results"]] == ["success", "skipped", "skipped", "success"]
+    assert result["bytes_returned"] == len(json.dumps("x" * 40)) + len(json.dumps("z"))
@@ -0,0 +1,89 @@
+import threading
+
+from src.s3_utils.s3_cache import ObjectCache
+from tests.conftest import BUCKET
+
+
+def _cache(tmp_path, **options):
+    settings = {"memory_bytes": 100, "disk_dir": str(tmp_path), "disk_bytes": 1000, "max_object_bytes": 80}
+    settings.update(options)
+    return ObjectCache(**settings)
+
+
+def test_miss_then_revalidated_hit_then_change(s3, tmp_path):
+    cache = _cache(tmp_path)
+    s3.put_object(Bucket=BUCKET, Key="a.txt", Body=b"first")
+
+    assert cache.get(s3, BUCKET, "a.txt")[1]["cache"] == "miss"
+    data, meta = cache.get(s3, BUCKET, "a.txt")
+    assert (data, meta["cache"]) == (b"first", "hit")
+    assert cache.stats()["revalidations"] == 1
+
+    s3.put_object(Bucket=BUCKET, Key="a.txt", Body=b"second")
+    data, meta = cache.get(s3, BUCKET, "a.txt")
+    assert (data, meta["cache"]) == (b"second", "miss")
+    assert cache.stats()["memory_entries"] == 1
+
+
+def test_memory_victims_spill_to_disk_and_are_served_from_it(s3, tmp_path):
+    cache = _cache(tmp_path)
+    for name in ("a", "b", "c"):
+        s3.put_object(Bucket=BUCKET, Key=name, Body=name.encode() * 40)
+        cache.get(s3, BUCKET, name)
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and stats["disk_entries"] == 1
+    data, meta = cache.get(s3, BUCKET, "a")
+    assert data == b"a" * 40 and meta["cache"] == "hit"
+    assert cache.stats()["disk_hits"] == 1
+    assert ObjectCache(memory_bytes=100, disk_dir=str(tmp_path), disk_bytes=1000).stats()["disk_entries"] >= 1
+
+
+def test_uncacheable_and_evicted_objects_are_not_remembered(s3, tmp_path):
+    cache = _cache(tmp_path, disk_dir="")
+    s3.put_object(Bucket=BUCKET, Key="big", Body=b"x" * 81)
+    cache.get(s3, BUCKET, "big")
+    assert cache.known_meta(BUCKET, "big") is None
+
+    for name in ("a", "b", "c"):
+        s3.put_object(Bucket=BUCKET, Key=name, Body=b"y" * 40)
+        cache.get(s3, BUCKET, name)
+    assert cache.known_meta(BUCKET, "a") is None
+    assert cache.known_meta(BUCKET, "c")["size"] == 40
+    assert len(cache._latest) == 2
+
+
+def test_disk_writes_do_not_block_cached_reads(s3, tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    s3.put_object(Bucket=BUCKET, Key="hot", Body=b"h" * 30)
+    cache.get(s3, BUCKET, "hot")
+    cache.revalidate_seconds = 60
+
+    writing, release = threading.Event(), threading.Event()
+    write_disk = cache._write_disk
+
+    def slow_write(*args):
+        writing.set()
+        release.wait(5)
+        return write_disk(*args)
+
+    monkeypatch.setattr(cache, "_write_disk", slow_write)
+    for name in ("a", "b"):
+        s3.put_object(Bucket=BUCKET, Key=name, Body=b"z" * 40)
+    spiller = threading.Thread(target=lambda: [cache.get(s3, BUCKET, name) for name in ("a", "b")])
+    spiller.start()
+    assert writing.wait(5)
+
+    hit = []
+    reader = threading.Thread(target=lambda: hit.append(cache.get(s3, BUCKET, "hot")))
+    reader.start()
+    reader.join(2)
+    alive = reader.is_alive()
+    release.set()
+    spiller.join(5)
+    reader.join(5)
+
+    assert not alive, "cached read waited for a disk write"
+    assert hit[0][1]["cache"] == "hit"
+    # The body being spilled stays readable until its write completes
+    assert cache.get(s3, BUCKET, "hot")[0] == b"h" * 30
@@ -0,0 +1,38 @@
+import threading
+
+from src.s3_utils.s3_client_pool import S3ClientPool
+from tests.conftest import ACCESS_KEY, SECRET_KEY, REGION, BUCKET
+
+
+def test_clients_are_shared_per_credentials(s3):
+    pool = S3ClientPool()
+    client = pool.get_client(ACCESS_KEY, SECRET_KEY, REGION)
+
+    assert pool.get_client(ACCESS_KEY, SECRET_KEY, REGION) is client
+    assert pool.get_client("other", SECRET_KEY, REGION) is not client
+    assert pool.stats()["creations"] == 2
+
+
+def test_resources_are_per_thread_and_use_the_pooled_client(s3):
+    pool = S3ClientPool()
+    client = pool.get_client(ACCESS_KEY, SECRET_KEY, REGION)
+    resource = pool.get_resource(ACCESS_KEY, SECRET_KEY, REGION)
+    other = []
+    worker = threading.Thread(target=lambda: other.append(pool.get_resource(ACCESS_KEY, SECRET_KEY, REGION)))
+    worker.start()
+    worker.join()
+
+    assert pool.get_resource(ACCESS_KEY, SECRET_KEY, REGION) is resource
+    assert other[0] is not resource
+    assert resource.meta.client is client and other[0].meta.client is client
+    assert [bucket.name for bucket in resource.buckets.all()] == [BUCKET]
+
+
+def test_resource_is_rebuilt_after_clear(s3):
+    pool = S3ClientPool()
+    resource = pool.get_resource(ACCESS_KEY, SECRET_KEY, REGION)
+    pool.clear()
+
+    rebuilt = pool.get_resource(ACCESS_KEY, SECRET_KEY, REGION)
+    assert rebuilt is not resource
+    assert rebuilt.meta.client is pool.get_client(ACCESS_KEY, SECRET_KEY, REGION)
@@ -0,0 +1,44 @@
+import pytest
+
+from src.s3_utils.s3_columnar import encode_table, infer_column
+from tests.conftest import BUCKET
+
+
+def test_infer_column_converts_csv_text():
+    assert infer_column(["1", "", "3"], from_text=True) == ([1, None, 3], "int")
+    assert infer_column(["1.5", "2"], from_text=True) == ([1.5, 2.0], "float")
+    assert infer_column(["TRUE", "false", ""], from_text=True) == ([True, False, None], "bool")
+    # Leading zeros, nan and mixed text stay strings
+    assert infer_column(["007", "12"], from_text=True) == (["007", "12"], "str")
+    assert infer_column(["nan", "1.0"], from_text=True) == (["nan", "1.0"], "str")
+    assert infer_column(["1", "x"], from_text=True) == (["1", "x"], "str")
+
+
+def test_infer_column_reports_native_types():
+    assert infer_column([1, 2.5, None])[1] == "float"
+    assert infer_column([True, False])[1] == "bool"
+    assert infer_column([1, "a"])[1] == "mixed"
+    assert infer_column([None, None])[1] == "null"
+    assert infer_column([{"a": 1}])[1] == "object"
+
+
+def test_encode_table_formats():
+    rows = [{"a": 1, "b": "x"}, {"a": 2}]
+    assert encode_table(rows) is rows
+    assert encode_table(rows, "rows") == {"columns": ["a", "b"], "types": {"a": "int", "b": "str"},
+                                          "rows": [[1, "x"], [2, None]]}
+    assert encode_table(rows, "columns", columns=["b"]) == {"columns": ["b"], "types": {"b": "str"},
+                                                            "data": {"b": ["x", None]}}
+    assert encode_table([{}, {}], "rows") == {"columns": [], "types": {}, "rows": [[], []]}
+    with pytest.raises(ValueError, match="Unsupported output_format"):
+        encode_table(rows, "tsv")
+
+
+def test_csv_read_in_rows_format(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="people.csv", Body=b"name,age,zip\nana,31,01234\nbo,,98765\n")
+    result = reader.read_file_from_s3(BUCKET, "people.csv", output_format="rows")
+
+    assert result["status"] == "success", result
+    assert result["output_format"] == "rows"
+    assert result["data"] == {"columns": ["name", "age", "zip"], "types": {"name": "str", "age": "int", "zip": "str"},
+                              "rows": [["ana", 31, "01234"], ["bo", None, "98765"]]}
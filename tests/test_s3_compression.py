@@ -0,0 +1,64 @@
+import io
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from src.s3_utils.s3_compression import (
+    DecompressingReader, detect_codec, peek_decompressed, read_decompressed, strip_codec_suffix
+)
+from tests.conftest import BUCKET
+
+ROWS = b"".join(b"%d,row %d\n" % (number, number) for number in range(5000))
+
+
+def _zstd(data: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+COMPRESSORS = {"gzip": gzip.compress, "bzip2": bz2.compress, "xz": lzma.compress, "zstd": _zstd}
+
+
+def test_detect_codec_by_suffix_encoding_and_magic():
+    assert detect_codec("logs/app.csv.gz") == "gzip"
+    assert detect_codec("data.jsonl.zst") == "zstd"
+    assert detect_codec("blob", content_encoding="x-gzip") == "gzip"
+    assert detect_codec("blob", head=b"BZh91AY") == "bzip2"
+    assert detect_codec("plain.csv", head=b"a,b\n") is None
+    assert strip_codec_suffix("logs/app.csv.gz") == "logs/app.csv"
+    assert strip_codec_suffix("logs/app.csv") == "logs/app.csv"
+
+
+@pytest.mark.parametrize("codec", sorted(COMPRESSORS))
+def test_reader_inflates_every_codec(codec):
+    compressed = COMPRESSORS[codec](ROWS)
+    reader = DecompressingReader(io.BytesIO(compressed), codec)
+
+    assert read_decompressed(reader) == ROWS
+    assert reader.compressed_bytes == len(compressed)
+
+
+def test_concatenated_gzip_members_and_size_limit():
+    body = gzip.compress(b"one\n") + gzip.compress(b"two\n")
+    assert read_decompressed(DecompressingReader(io.BytesIO(body), "gzip")) == b"one\ntwo\n"
+
+    with pytest.raises(ValueError, match="exceeds the 100 byte limit"):
+        read_decompressed(DecompressingReader(io.BytesIO(gzip.compress(ROWS)), "gzip"), max_bytes=100)
+    with pytest.raises(ValueError, match="Corrupt gzip"):
+        read_decompressed(DecompressingReader(io.BytesIO(b"\x1f\x8b" + b"\x00" * 20), "gzip"))
+
+
+def test_peek_decompressed_reads_a_truncated_prefix():
+    head = gzip.compress(ROWS)[:200]
+    assert ROWS.startswith(peek_decompressed(head, "gzip"))
+    assert peek_decompressed(bz2.compress(ROWS)[:200], "bzip2") is None
+
+
+def test_compressed_csv_streams_with_a_limit(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="rows.csv.gz", Body=gzip.compress(b"n,label\n" + ROWS))
+    result = reader.read_file_from_s3(BUCKET, "rows.csv.gz", limit=2, filters={"n": "7"})
+
+    assert result["status"] == "success", result
+    assert result["data"] == [{"n": "7", "label": "row 7"}]
@@ -0,0 +1,54 @@
+import gzip
+
+from tests.conftest import BUCKET
+
+
+def _log(name: str, errors) -> bytes:
+    return b"".join(b"%s %s line %d\n" % (name.encode(), b"ERROR" if number in errors else b"ok", number)
+                    for number in range(1, 201))
+
+
+def _put_logs(s3):
+    s3.put_object(Bucket=BUCKET, Key="logs/a.log", Body=_log("a", {3, 150}))
+    s3.put_object(Bucket=BUCKET, Key="logs/b.log.gz", Body=gzip.compress(_log("b", {7})))
+    s3.put_object(Bucket=BUCKET, Key="logs/c.log", Body=_log("c", set()))
+    s3.put_object(Bucket=BUCKET, Key="logs/d.bin", Body=b"\x00\x01ERROR\x00")
+    s3.put_object(Bucket=BUCKET, Key="other/e.log", Body=_log("e", {1}))
+
+
+def test_grep_finds_matches_across_compressed_and_plain_objects(reader, s3):
+    _put_logs(s3)
+    result = reader.grep_objects(BUCKET, "ERROR", prefix="logs/")
+
+    assert result["status"] == "success", result
+    assert [(match["key"], match["line"]) for match in result["matches"]] == [
+        ("logs/a.log", 3), ("logs/a.log", 150), ("logs/b.log.gz", 7)
+    ]
+    first = result["matches"][0]
+    assert first["text"] == "a ERROR line 3"
+    assert first["offset"] == _log("a", {3, 150}).index(b"a ERROR line 3")
+    assert result["objects_listed"] == 4 and result["objects_skipped"] == 1
+    assert result["complete"] is True
+
+
+def test_regex_ignore_case_and_suffix(reader, s3):
+    _put_logs(s3)
+    result = reader.grep_objects(BUCKET, r"error line \d{3}", prefix="logs/", suffix=".log", regex=True,
+                                 ignore_case=True)
+    assert [(match["key"], match["line"]) for match in result["matches"]] == [("logs/a.log", 150)]
+
+
+def test_max_matches_stops_and_resumes(reader, s3):
+    _put_logs(s3)
+    first = reader.grep_objects(BUCKET, "ERROR", prefix="logs/", max_matches=1, max_matches_per_object=1)
+    assert first["match_count"] == 1
+    assert first["complete"] is False and first["stopped_by"] == "max_matches"
+
+    rest = reader.grep_objects(BUCKET, "ERROR", prefix="logs/", start_after=first["resume_after"])
+    keys = {match["key"] for match in first["matches"] + rest["matches"]}
+    assert keys == {"logs/a.log", "logs/b.log.gz"}
+
+
+def test_invalid_pattern_is_an_error(reader, s3):
+    assert reader.grep_objects(BUCKET, "")["status"] == "error"
+    assert reader.grep_objects(BUCKET, "(", regex=True)["status"] == "error"
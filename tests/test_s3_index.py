@@ -0,0 +1,95 @@
+import pytest
+
+from src.s3_utils import s3_functions
+from src.s3_utils.s3_functions import S3Client
+from src.s3_utils.s3_index import ListingIndex
+from tests.conftest import ACCESS_KEY, BUCKET, REGION, SECRET_KEY
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ListingIndex(path=str(tmp_path / "index.db"), buckets=[BUCKET],
+                        append_only_prefixes=[f"{BUCKET}/logs/"])
+
+
+def _put(s3, *keys, size=10):
+    for key in keys:
+        s3.put_object(Bucket=BUCKET, Key=key, Body=b"x" * size)
+
+
+def test_refresh_and_query(s3, index):
+    _put(s3, "data/a.csv", "data/b.json", "data/c.csv", "other/d.csv")
+    _put(s3, "data/big.csv", size=500)
+
+    assert index.is_enabled(BUCKET) and not index.is_enabled("elsewhere")
+    assert index.staleness(BUCKET, "data/") == {"indexed": False}
+    assert index.refresh(s3, BUCKET, "data/") == {"mode": "full", "upserted": 4, "removed": 0}
+
+    keys = [row["key"] for row in index.query(BUCKET, "data/")]
+    assert keys == ["data/a.csv", "data/b.json", "data/big.csv", "data/c.csv"]
+    assert [row["key"] for row in index.query(BUCKET, "data/", start_after="data/b.json", limit=1)] == ["data/big.csv"]
+    assert [row["key"] for row in index.query(BUCKET, "data/", suffix=".csv", max_size=100)] == [
+        "data/a.csv", "data/c.csv"
+    ]
+    assert index.query(BUCKET, "data/", order_by="size", descending=True, limit=1)[0]["key"] == "data/big.csv"
+    with pytest.raises(ValueError):
+        index.query(BUCKET, "data/", order_by="owner")
+
+
+def test_full_refresh_drops_deleted_keys(s3, index):
+    _put(s3, "data/a.csv", "data/b.csv")
+    index.refresh(s3, BUCKET, "data/")
+    s3.delete_object(Bucket=BUCKET, Key="data/a.csv")
+
+    assert index.refresh(s3, BUCKET, "data/")["removed"] == 1
+    assert [row["key"] for row in index.query(BUCKET, "data/")] == ["data/b.csv"]
+
+
+def test_append_only_prefix_refreshes_incrementally(s3, index):
+    _put(s3, "logs/001", "logs/002")
+    index.refresh(s3, BUCKET, "logs/")
+    _put(s3, "logs/003")
+
+    assert index.refresh(s3, BUCKET, "logs/") == {"mode": "incremental", "upserted": 1, "removed": 0}
+    assert index.refresh(s3, BUCKET, "logs/", full=True)["mode"] == "full"
+    assert len(index.query(BUCKET, "logs/")) == 3
+
+
+def test_ensure_fresh_uses_the_covering_scope(s3, index):
+    _put(s3, "data/a.csv", "data/sub/b.csv")
+    status = index.ensure_fresh(s3, BUCKET, "data/")
+    assert status["indexed"] is True and status["scope_prefix"] == "data/"
+
+    # A narrower prefix is served from the wider scope without another listing
+    _put(s3, "data/sub/c.csv")
+    assert index.ensure_fresh(s3, BUCKET, "data/sub/")["scope_prefix"] == "data/"
+    assert len(index.query(BUCKET, "data/sub/")) == 1
+
+    index.ensure_fresh(s3, BUCKET, "data/sub/", force=True)
+    assert len(index.query(BUCKET, "data/sub/")) == 2
+
+
+def test_list_objects_pages_through_the_index(s3, index, monkeypatch):
+    monkeypatch.setattr(s3_functions, "listing_index", index)
+    _put(s3, "data/a.csv", "data/b.csv", "data/c.csv")
+
+    client = S3Client(ACCESS_KEY, SECRET_KEY, REGION)
+    first = client.list_objects(BUCKET, prefix="data/", max_keys=2)
+    assert first["objects"] == ["data/a.csv", "data/b.csv"] and first["index"]["indexed"] is True
+    rest = client.list_objects(BUCKET, prefix="data/", max_keys=2, cursor=first["next_cursor"])
+    assert rest["objects"] == ["data/c.csv"] and rest["next_cursor"] is None
+
+
+def test_timestamp_filters_compare_in_utc(index):
+    index._upsert([(BUCKET, "data/a.csv", 1, "a", "2026-01-01T00:00:00+00:00", "STANDARD", 0.0),
+                   (BUCKET, "data/b.csv", 1, "b", "2026-01-01T06:00:00+00:00", "STANDARD", 0.0)])
+
+    def keys(**filters):
+        return [row["key"] for row in index.query(BUCKET, "data/", **filters)]
+
+    # 10:00 at +05:30 is 04:30 UTC
+    assert keys(modified_after="2026-01-01T10:00:00+05:30") == ["data/b.csv"]
+    assert keys(modified_before="2026-01-01T06:00:00Z") == ["data/a.csv"]
+    assert keys(modified_after="2025-12-31T23:59:59") == ["data/a.csv", "data/b.csv"]
+    with pytest.raises(ValueError, match="ISO 8601"):
+        index.query(BUCKET, "data/", modified_after="yesterday")
@@ -0,0 +1,65 @@
+import pytest
+
+from src.s3_utils import s3_file_transfer
+from src.s3_utils.s3_line_index import LineIndex, LineIndexStore
+from tests.conftest import BUCKET
+
+
+def _lines(first: int, stop: int) -> bytes:
+    return b"".join(b"line %d\n" % number for number in range(first, stop))
+
+
+@pytest.fixture
+def store(reader, tmp_path, monkeypatch):
+    store = LineIndexStore(disk_dir=str(tmp_path / "lines"), stride=10)
+    monkeypatch.setattr(s3_file_transfer, "line_index_store", store)
+    return store
+
+
+def test_span_starts_at_the_nearest_checkpoint():
+    index = LineIndex(BUCKET, "a.txt", stride=10, offsets=[0, 100, 200], lines=25, end=250, size=250)
+    assert index.span(0, 5) == (0, 100, 0)
+    assert index.span(13, 15) == (100, 200, 3)
+    assert index.span(21, 40) == (200, None, 1)
+
+
+def test_line_range_reads_from_the_index(reader, s3, store):
+    s3.put_object(Bucket=BUCKET, Key="log.txt", Body=_lines(1, 1001) + b"unterminated")
+
+    result = reader.read_line_range(BUCKET, "log.txt", 500, 3)
+    assert result["data"] == ["line 500", "line 501", "line 502"]
+    assert result["total_lines"] == 1001
+    assert result["index"]["state"] == "built"
+    # One stride of lines at most is read before the first requested line
+    assert result["range"]["bytes_read"] < 300
+
+    assert reader.read_line_range(BUCKET, "log.txt", 1001, 5)["data"] == ["unterminated"]
+    assert reader.read_line_range(BUCKET, "log.txt", 2000, 5)["data"] == []
+    assert reader.read_line_range(BUCKET, "log.txt", 1, 1)["index"]["state"] == "hit"
+
+
+def test_appended_object_is_indexed_incrementally(reader, s3, store):
+    s3.put_object(Bucket=BUCKET, Key="log.txt", Body=_lines(1, 501))
+    reader.read_line_range(BUCKET, "log.txt", 1, 1)
+    scanned = store.stats()["bytes_scanned"]
+
+    s3.put_object(Bucket=BUCKET, Key="log.txt", Body=_lines(1, 601))
+    result = reader.read_line_range(BUCKET, "log.txt", 550, 2)
+    assert result["data"] == ["line 550", "line 551"]
+    assert result["index"]["state"] == "appended"
+    assert store.stats()["bytes_scanned"] - scanned == len(_lines(501, 601))
+
+    # A rewritten prefix forces a rebuild
+    s3.put_object(Bucket=BUCKET, Key="log.txt", Body=b"changed\n" + _lines(2, 700))
+    result = reader.read_line_range(BUCKET, "log.txt", 1, 2)
+    assert result["data"] == ["changed", "line 2"]
+    assert result["index"]["state"] == "built"
+
+
+def test_index_persists_across_stores(reader, s3, store, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="log.txt", Body=_lines(1, 101))
+    reader.read_line_range(BUCKET, "log.txt", 1, 1)
+
+    restarted = LineIndexStore(disk_dir=str(tmp_path / "lines"), stride=10)
+    index, state = restarted.get(s3, BUCKET, "log.txt")
+    assert state == "hit" and index.total_lines == 100
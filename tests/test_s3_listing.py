@@ -0,0 +1,96 @@
+import pytest
+
+from src.s3_utils.s3_listing import ParallelLister, encode_cursor, decode_cursor, iter_objects
+from src.s3_utils.s3_functions import S3Client
+from tests.conftest import ACCESS_KEY, SECRET_KEY, REGION, BUCKET
+
+
+def _seed(s3, keys):
+    for key in keys:
+        s3.put_object(Bucket=BUCKET, Key=key, Body=b"x")
+
+
+def _count_lists(client):
+    calls = []
+    client.meta.events.register("before-call.s3.ListObjectsV2", lambda **_: calls.append(1))
+    return calls
+
+
+HIERARCHY = sorted(
+    [f"logs/{shard:02d}/{day:02d}/part-{part}.json" for shard in range(4) for day in range(6) for part in range(3)]
+    + ["logs/readme.txt", "top.txt"]
+)
+
+
+def test_cursor_round_trip_and_mismatch():
+    cursor = encode_cursor(BUCKET, "logs/", start_after="logs/a")
+    assert decode_cursor(cursor, BUCKET, "logs/")["a"] == "logs/a"
+    with pytest.raises(ValueError, match="does not match"):
+        decode_cursor(cursor, BUCKET, "other/")
+    with pytest.raises(ValueError, match="Invalid listing cursor"):
+        decode_cursor("not-a-cursor!", BUCKET, "logs/")
+
+
+def test_split_range_covers_the_prefix_contiguously():
+    ranges = ParallelLister(None, split_chars="ba")._split_range("p/")
+    assert [(r["low"], r["high"]) for r in ranges] == [(None, "p/a"), ("p/a", "p/b"), ("p/b", None)]
+
+
+def test_coalesce_merges_into_contiguous_bounded_ranges():
+    lister = ParallelLister(None, target_partitions=2)
+    partitions = [lister._range(f"p/{index}/") for index in range(4)]
+    merged = lister._coalesce("p/", partitions)
+
+    assert [(r["prefix"], r["low"], r["high"]) for r in merged] == [
+        ("p/", None, "p/1/\U0010ffff"), ("p/", "p/1/\U0010ffff", None)
+    ]
+
+
+@pytest.mark.parametrize("target", [2, 5, 64])
+def test_parallel_listing_matches_sequential_order(s3, target):
+    _seed(s3, HIERARCHY)
+    lister = ParallelLister(s3, max_workers=4, target_partitions=target)
+
+    assert [obj["Key"] for obj in lister.iter_objects(BUCKET)] == HIERARCHY
+    assert [obj["Key"] for obj in iter_objects(s3, BUCKET)] == HIERARCHY
+    start = HIERARCHY[20]
+    assert [obj["Key"] for obj in lister.iter_objects(BUCKET, start_after=start)] == HIERARCHY[21:]
+
+
+def test_flat_prefix_is_split_into_character_ranges(s3, monkeypatch):
+    # Five keys per discovery request, so the level is too wide to enumerate
+    monkeypatch.setattr("src.s3_utils.s3_listing.S3_MAX_KEYS_PER_PAGE", 5)
+    keys = sorted(f"{char}{index}" for char in "0aZ" for index in range(5))
+    _seed(s3, keys)
+    lister = ParallelLister(s3, max_workers=4)
+    assert len(lister.plan(BUCKET)) > 1
+
+    assert [obj["Key"] for obj in lister.iter_objects(BUCKET)] == keys
+
+
+def test_small_parallel_page_is_listed_sequentially(s3):
+    _seed(s3, HIERARCHY)
+    client = S3Client(ACCESS_KEY, SECRET_KEY, REGION)
+    calls = _count_lists(client.s3)
+
+    page = client.list_objects(BUCKET, max_keys=10, parallel=True)
+    assert page["objects"] == HIERARCHY[:10] and page["is_truncated"]
+    assert len(calls) == 1
+
+    rest = client.list_objects(BUCKET, max_keys=1000, cursor=page["next_cursor"], parallel=True)
+    assert rest["objects"] == HIERARCHY[10:] and rest["next_cursor"] is None
+
+
+def test_bulk_parallel_pages_resume_after_the_last_key(s3, monkeypatch):
+    monkeypatch.setattr("src.s3_utils.s3_functions.S3_LIST_PARALLEL_MIN_KEYS", 10)
+    _seed(s3, HIERARCHY)
+    client = S3Client(ACCESS_KEY, SECRET_KEY, REGION)
+
+    listed, cursor = [], None
+    while True:
+        page = client.list_objects(BUCKET, max_keys=30, cursor=cursor, parallel=True)
+        listed.extend(page["objects"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert listed == HIERARCHY
@@ -0,0 +1,50 @@
+import json
+import asyncio
+
+import pytest
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from src import s3_mcp_server
+from src.s3_utils.s3_async import BlockingExecutor
+from tests.conftest import BUCKET, REGION
+
+
+@pytest.fixture
+def server(reader, monkeypatch):
+    """The MCP server with a fresh blocking executor; ``reader`` isolates the caches."""
+    executor = BlockingExecutor(max_workers=4)
+    monkeypatch.setattr(s3_mcp_server, "blocking_executor", executor)
+    yield s3_mcp_server.mcp
+    executor.shutdown()
+
+
+def test_json_tool_returns_compact_text(server, s3):
+    s3.put_object(Bucket=BUCKET, Key="config.json", Body=b'{"name": "demo", "tags": ["a", "b"]}')
+
+    content = asyncio.run(server.call_tool("s3_read_file", {"bucket": BUCKET, "object_name": "config.json",
+                                                            "region_name": REGION}))
+    assert len(content) == 1 and content[0].type == "text"
+    assert "\n" not in content[0].text
+    result = json.loads(content[0].text)
+    assert result["status"] == "success" and result["data"] == {"name": "demo", "tags": ["a", "b"]}
+
+
+def test_grep_reports_progress_to_the_client(server, s3):
+    for index in range(3):
+        s3.put_object(Bucket=BUCKET, Key=f"logs/{index}.log", Body=b"ok\nERROR %d\n" % index)
+    progress = []
+
+    async def on_progress(searched, listed, message):
+        progress.append((searched, listed))
+
+    async def call():
+        async with create_connected_server_and_client_session(server._mcp_server) as session:
+            return await session.call_tool("s3_grep", {"bucket": BUCKET, "pattern": "ERROR", "prefix": "logs/",
+                                                       "region_name": REGION}, progress_callback=on_progress)
+
+    response = asyncio.run(call())
+    assert not response.isError
+    result = json.loads(response.content[0].text)
+    assert sorted(match["text"] for match in result["matches"]) == ["ERROR 0", "ERROR 1", "ERROR 2"]
+    assert progress and progress[-1] == (3, 3)
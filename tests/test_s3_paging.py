@@ -0,0 +1,99 @@
+import pytest
+
+from src.s3_utils.s3_paging import (
+    STALE_CURSOR_MESSAGE, OutputBudget, check_cursor, check_etag, cut_text, decode_read_cursor,
+    encode_read_cursor, json_size, page_items, utf8_boundary
+)
+from tests.conftest import BUCKET
+
+MB = 1024 * 1024
+
+
+def test_cursor_round_trip_and_mismatches():
+    cursor = encode_read_cursor(BUCKET, "a.csv", "etag-1", "csv", {"columns": ["a"]}, offset=10, row=2)
+    state = decode_read_cursor(cursor, BUCKET, "a.csv")
+    assert (state["offset"], state["row"], state["e"]) == (10, 2, "etag-1")
+
+    check_cursor(state, "csv", {"columns": ["a"]})
+    with pytest.raises(ValueError, match="jsonl read"):
+        check_cursor(state, "jsonl", {"columns": ["a"]})
+    with pytest.raises(ValueError, match="different columns"):
+        check_cursor(state, "csv", {"columns": ["b"]})
+    with pytest.raises(ValueError, match="does not match"):
+        decode_read_cursor(cursor, BUCKET, "b.csv")
+    with pytest.raises(ValueError, match="Invalid read cursor"):
+        decode_read_cursor("not a cursor", BUCKET, "a.csv")
+
+    check_etag(state, "etag-1")
+    with pytest.raises(ValueError, match=STALE_CURSOR_MESSAGE):
+        check_etag(state, "etag-2")
+
+
+def test_budget_admits_the_first_item_even_when_oversized():
+    budget = OutputBudget(5)
+    assert budget.add("a long string")
+    assert not budget.add("x")
+    assert OutputBudget(None).add("anything")
+
+
+def test_page_items_pages_lists_objects_and_strings():
+    page, resume = page_items(list(range(10)), 0, OutputBudget(8))
+    assert (page, resume) == ([0, 1, 2, 3], 4)
+    assert page_items(list(range(10)), 8, OutputBudget(8)) == ([8, 9], None)
+
+    page, resume = page_items({"a": 1, "b": 2, "c": 3}, 1, OutputBudget(8))
+    assert (page, resume) == ({"b": 2}, 2)
+
+    text = "é" * 100
+    page, resume = page_items(text, 0, OutputBudget(50))
+    assert json_size(page) <= 50 and text.startswith(page) and resume == len(page)
+    assert page_items(42, 0, OutputBudget(1)) == (42, None)
+
+
+def test_cut_text_ends_on_lines_and_character_boundaries():
+    assert cut_text(b"one\ntwo\nthree", 9, at_eof=False) == 8
+    assert cut_text(b"one\ntwo\n", None, at_eof=False) == 8
+    assert cut_text(b"one\ntwo", None, at_eof=True) == 7
+    # No newline within the limit: cut before the split two-byte character
+    assert cut_text("aé".encode() + b"bc", 2, at_eof=False) == 1
+    assert utf8_boundary("aé".encode()[:2]) == 1
+    assert utf8_boundary("aé".encode()) == 3
+
+
+def _text(lines: int, tag: str) -> bytes:
+    return b"".join(b"%s line %07d\n" % (tag.encode(), number) for number in range(lines))
+
+
+def test_text_pages_cover_the_object(reader, s3):
+    body = _text(200_000, "v1")
+    s3.put_object(Bucket=BUCKET, Key="big.txt", Body=body)
+
+    pages = []
+    cursor = None
+    while True:
+        page = reader.read_file_from_s3(BUCKET, "big.txt", cursor=cursor, max_output_bytes=MB)
+        assert page["status"] == "success", page
+        pages.append(page["data"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            break
+    assert len(pages) > 2
+    assert all(text.endswith("\n") for text in pages)
+    assert "".join(pages).encode() == body
+
+
+def test_read_without_cursor_after_overwrite_is_not_stale(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="big.txt", Body=_text(200_000, "v1"))
+    # A whole read caches the object, so its (soon stale) metadata is known locally
+    assert reader.read_file_from_s3(BUCKET, "big.txt", max_output_bytes=8 * MB)["status"] == "success"
+    first = reader.read_file_from_s3(BUCKET, "big.txt", max_output_bytes=MB)
+
+    s3.put_object(Bucket=BUCKET, Key="big.txt", Body=_text(200_000, "v2"))
+    fresh = reader.read_file_from_s3(BUCKET, "big.txt", max_output_bytes=MB)
+    assert fresh["status"] == "success", fresh
+    assert fresh["data"].startswith("v2 line 0000000")
+
+    # A cursor issued before the overwrite is stale, and says so
+    stale = reader.read_file_from_s3(BUCKET, "big.txt", cursor=first["next_cursor"], max_output_bytes=MB)
+    assert stale["status"] == "error"
+    assert STALE_CURSOR_MESSAGE in stale["message"]
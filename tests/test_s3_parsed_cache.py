@@ -0,0 +1,48 @@
+import json
+
+from src.s3_utils.s3_cache import ParsedResultCache
+from tests.conftest import BUCKET
+
+
+def test_fast_results_are_not_stored(tmp_path):
+    cache = ParsedResultCache(disk_dir=str(tmp_path), min_seconds=0.05)
+    cache.put(BUCKET, "a.json", "etag", "json", {"a": 1}, elapsed=0.001)
+    cache.flush()
+
+    assert cache.get(BUCKET, "a.json", "etag", "json") == (False, None)
+    assert cache.stats()["skipped"] == 1 and cache.stats()["disk_entries"] == 0
+
+
+def test_slow_results_are_kept_in_memory_and_written_to_disk(tmp_path):
+    cache = ParsedResultCache(disk_dir=str(tmp_path), min_seconds=0.05)
+    cache.put(BUCKET, "a.pdf", "etag", "pdf", ["page one"], options={"pages": "1"}, elapsed=2.0)
+    assert cache.get(BUCKET, "a.pdf", "etag", "pdf", {"pages": "1"}) == (True, ["page one"])
+    assert cache.get(BUCKET, "a.pdf", "etag", "pdf", {"pages": "2"}) == (False, None)
+    assert cache.get(BUCKET, "a.pdf", "other-etag", "pdf", {"pages": "1"}) == (False, None)
+
+    cache.flush()
+    restarted = ParsedResultCache(disk_dir=str(tmp_path))
+    assert restarted.get(BUCKET, "a.pdf", "etag", "pdf", {"pages": "1"}) == (True, ["page one"])
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_streamed_pages_bypass_the_parsed_cache(s3, reader):
+    from src.s3_utils import s3_file_transfer
+
+    s3.put_object(Bucket=BUCKET, Key="rows.csv", Body=b"a,b\n1,2\n3,4\n")
+    s3.put_object(Bucket=BUCKET, Key="rows.jsonl", Body=b'{"a": 1}\n{"a": 2}\n')
+    assert reader.read_file_from_s3(BUCKET, "rows.csv", limit=1)["data"] == [{"a": "1", "b": "2"}]
+    assert reader.read_file_from_s3(BUCKET, "rows.jsonl", limit=1)["data"] == [{"a": 1}]
+
+    stats = s3_file_transfer.parsed_cache.stats()
+    assert stats["stores"] == 0 and stats["misses"] == 0
+
+
+def test_expensive_json_parse_is_served_from_the_parsed_cache(s3, reader, monkeypatch):
+    from src.s3_utils import s3_file_transfer
+
+    monkeypatch.setattr(s3_file_transfer.parsed_cache, "min_seconds", 0)
+    s3.put_object(Bucket=BUCKET, Key="big.json", Body=json.dumps({"k": list(range(5000))}).encode())
+    first = reader.read_file_from_s3(BUCKET, "big.json")
+    second = reader.read_file_from_s3(BUCKET, "big.json")
+    assert second["cache"] == "parsed_hit" and second["data"] == first["data"]
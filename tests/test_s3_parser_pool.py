@@ -0,0 +1,56 @@
+import pytest
+
+from src.s3_utils.s3_parser_pool import ParserPool, ParserTimeoutError, parse_json_content, parse_page_spec, MB
+
+
+def _never_returns(content):
+    while True:
+        pass
+
+
+def _allocate(content):
+    chunks = []
+    while True:
+        chunks.append(bytearray(64 * MB))
+
+
+@pytest.fixture
+def pool():
+    pool = ParserPool(processes=1, timeout=2, memory_limit=512 * MB, min_bytes=0)
+    yield pool
+    if pool._executor is not None:
+        pool._restart(pool._executor)
+
+
+def test_parse_page_spec():
+    assert parse_page_spec("1-3,7,10-", 12) == [1, 2, 3, 7, 10, 11, 12]
+    assert parse_page_spec("-2, 5", 4) == [1, 2]
+    assert parse_page_spec([3, 1, 3, 99], 5) == [1, 3]
+    assert parse_page_spec(2, 5) == [2]
+    with pytest.raises(ValueError):
+        parse_page_spec("5-2", 10)
+
+
+def test_small_payloads_are_parsed_inline():
+    pool = ParserPool(processes=1, min_bytes=MB)
+
+    assert pool.run(parse_json_content, b'{"a": 1}') == {"a": 1}
+    assert pool.stats()["inline"] == 1
+    assert pool.stats()["running"] is False
+
+
+def test_timeout_restarts_the_pool(pool):
+    with pytest.raises(ParserTimeoutError):
+        pool.run(_never_returns, b"x")
+
+    assert pool.run(len, b"ok") == 2
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["restarts"] == 1
+
+
+def test_memory_limit_fails_the_job_not_the_server(pool):
+    with pytest.raises(MemoryError):
+        pool.run(_allocate, b"x")
+
+    assert pool.run(len, b"ok") == 2
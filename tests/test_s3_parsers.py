@@ -0,0 +1,44 @@
+import json
+
+from src.s3_utils.s3_parsers import ParserRegistry, ParserSpec, parser_registry
+from tests.conftest import BUCKET
+
+
+def _name(spec):
+    return spec.name if spec else None
+
+
+def test_resolve_prefers_extension_then_content_type_then_bytes():
+    assert _name(parser_registry.resolve("a/b.CSV")) == "csv"
+    assert _name(parser_registry.resolve("blob", "application/json; charset=utf-8")) == "json"
+    assert _name(parser_registry.resolve("blob", None, b"%PDF-1.7\n")) == "pdf"
+    assert _name(parser_registry.resolve("blob", None, b"PAR1\x15\x04")) == "parquet"
+    assert _name(parser_registry.resolve("blob", None, b'{"a": 1}\n{"a": 2}\n{"a"')) == "jsonl"
+    assert _name(parser_registry.resolve("blob", None, b'{"a": [1, 2]}')) == "json"
+    assert _name(parser_registry.resolve("blob", None, b"\x00\x01binary")) is None
+
+
+def test_register_replaces_by_name():
+    registry = ParserRegistry()
+    registry.register(ParserSpec("logs", extensions=("log",)))
+    registry.register(ParserSpec("logs", extensions=("txt",)))
+
+    assert registry.by_extension("app.log") is None
+    assert _name(registry.by_extension("app.txt")) == "logs"
+    assert [spec.name for spec in registry.specs()] == ["logs"]
+
+
+def test_extensionless_object_routes_on_probed_bytes(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="exports/latest", Body="\n".join(json.dumps({"n": n}) for n in range(3)).encode())
+    result = reader.read_file_from_s3(BUCKET, "exports/latest", limit=2)
+
+    assert result["status"] == "success", result
+    assert result["data"] == [{"n": 0}, {"n": 1}]
+
+
+def test_unknown_binary_is_rejected(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="blob", Body=b"\x00\x01\x02", ContentType="application/octet-stream")
+    result = reader.read_file_from_s3(BUCKET, "blob")
+
+    assert result["status"] == "error"
+    assert "Unsupported file type" in result["message"]
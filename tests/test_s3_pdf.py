@@ -0,0 +1,64 @@
+import pytest
+
+from benchmarks.parser_isolation import make_pdf
+from src.s3_utils import s3_file_transfer
+from src.s3_utils.s3_parser_pool import ParserPool
+from tests.conftest import BUCKET
+
+
+@pytest.fixture
+def pool(s3, monkeypatch):
+    """A one-worker parser pool; forked workers inherit the moto mock, spawned ones would not."""
+    pool = ParserPool(processes=1, timeout=30, min_bytes=0, start_method="fork")
+    monkeypatch.setattr(s3_file_transfer, "parser_pool", pool)
+    yield pool
+    if pool._executor is not None:
+        pool._restart(pool._executor)
+
+
+def test_selected_pages_fetch_a_fraction_of_the_pdf(reader, s3, pool):
+    body = make_pdf(2000)
+    s3.put_object(Bucket=BUCKET, Key="report.pdf", Body=body)
+
+    result = reader.read_pdf_pages(BUCKET, "report.pdf", pages="2,1500-1501")
+    assert result["status"] == "success"
+    assert result["page_count"] == 2000
+    assert [page["page"] for page in result["data"]] == [2, 1500, 1501]
+    assert "Page 1499 line 0" in result["data"][1]["text"]
+    assert result["bytes_fetched"] < len(body) // 4
+    assert pool.stats()["submitted"] == 1
+
+
+def test_page_count_only_and_max_pages(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="report.pdf", Body=make_pdf(5))
+
+    assert reader.read_pdf_pages(BUCKET, "report.pdf", max_pages=0)["data"] == []
+    result = reader.read_pdf_pages(BUCKET, "report.pdf", pages="2-", max_pages=2)
+    assert [page["page"] for page in result["data"]] == [2, 3]
+    assert result["truncated"] is True
+
+
+def test_pages_beyond_the_budget_resume_from_the_cursor(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="report.pdf", Body=make_pdf(6))
+
+    seen = []
+    cursor = None
+    while True:
+        result = reader.read_pdf_pages(BUCKET, "report.pdf", pages="1-6", cursor=cursor, max_output_bytes=8000)
+        seen.extend(page["page"] for page in result["data"])
+        cursor = result.get("next_cursor")
+        if cursor is None:
+            break
+    assert seen == [1, 2, 3, 4, 5, 6]
+
+
+def test_extraction_timeout_is_an_error(reader, s3, pool):
+    s3.put_object(Bucket=BUCKET, Key="report.pdf", Body=make_pdf(2000))
+    pool.timeout = 0.05
+
+    result = reader.read_file_from_s3(BUCKET, "report.pdf", pages="1-")
+    assert result["status"] == "error" and "timed out" in result["message"]
+    assert pool.stats()["timeouts"] == 1
+
+    pool.timeout = 30
+    assert reader.read_file_from_s3(BUCKET, "report.pdf", pages="3")["data"][0]["page"] == 3
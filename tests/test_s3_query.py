@@ -0,0 +1,134 @@
+import io
+import json
+
+import pytest
+
+from src.s3_utils.s3_query import QueryPlan, run_rows, sort_rows
+from tests.conftest import BUCKET
+
+ORDERS = [
+    {"city": "Berlin", "amount": 10, "customer": "a"},
+    {"city": "Paris", "amount": 5, "customer": "b"},
+    {"city": "Berlin", "amount": 30, "customer": "a"},
+    {"city": "Rome", "amount": None, "customer": "c"},
+    {"city": "Paris", "amount": 15, "customer": "d"},
+]
+SUMMARY = dict(group_by=["city"], aggregates=[
+    {"op": "count"}, {"op": "sum", "column": "amount", "as": "total"}, {"op": "avg", "column": "amount"},
+    {"op": "max", "column": "amount"}, {"op": "count_distinct", "column": "customer", "as": "customers"}
+], order_by="total")
+EXPECTED = [
+    {"city": "Paris", "count": 2, "total": 20, "avg_amount": 10.0, "max_amount": 15, "customers": 2},
+    {"city": "Berlin", "count": 2, "total": 40, "avg_amount": 20.0, "max_amount": 30, "customers": 1},
+    {"city": "Rome", "count": 1, "total": None, "avg_amount": None, "max_amount": None, "customers": 1},
+]
+
+
+def test_plan_validation():
+    with pytest.raises(ValueError, match="Unsupported aggregate"):
+        QueryPlan(aggregates=[{"op": "median", "column": "amount"}])
+    with pytest.raises(ValueError, match="needs a column"):
+        QueryPlan(aggregates=[{"op": "sum"}])
+    with pytest.raises(ValueError, match="Duplicate"):
+        QueryPlan(aggregates=[{"op": "count"}, {"op": "sum", "column": "x", "as": "count"}])
+    with pytest.raises(ValueError, match="select may only name group_by"):
+        QueryPlan(select=["amount"], group_by=["city"])
+    with pytest.raises(ValueError, match="order_by"):
+        QueryPlan(group_by=["city"], order_by="amount")
+
+    plan = QueryPlan(filters={"city": "Paris"}, group_by=["city"], aggregates=[{"op": "sum", "column": "amount"}])
+    assert plan.input_columns() == ["city", "amount"]
+    assert plan.output_columns == ["city", "sum_amount"]
+
+
+def test_grouped_aggregates_merge_across_batches():
+    result = run_rows(iter(ORDERS), QueryPlan(**SUMMARY), [], batch_size=2)
+
+    assert result["rows"] == EXPECTED
+    assert result["groups"] == 3
+    assert result["rows_scanned"] == 5 and result["rows_matched"] == 5
+
+
+def test_ungrouped_aggregate_over_no_rows_returns_one_row():
+    plan = QueryPlan(filters={"city": "Oslo"}, aggregates=[{"op": "count"}, {"op": "sum", "column": "amount"}])
+    assert run_rows(iter(ORDERS), plan, [])["rows"] == [{"count": 0, "sum_amount": None}]
+
+
+def test_projection_with_order_and_limit_keeps_top_rows():
+    plan = QueryPlan(select=["customer", "amount"], filters=[{"column": "amount", "op": ">", "value": "6"}],
+                     order_by=["-amount"], limit=2)
+    result = run_rows(iter(ORDERS), plan, [], batch_size=1)
+    assert result["rows"] == [{"customer": "a", "amount": 30}, {"customer": "d", "amount": 15}]
+
+
+def test_sort_rows_orders_numbers_strings_then_nulls():
+    rows = [{"v": None}, {"v": "b"}, {"v": "10"}, {"v": 9}]
+    assert [row["v"] for row in sort_rows(rows, [("v", False)])] == [9, "10", "b", None]
+
+
+@pytest.fixture
+def orders(s3):
+    """ORDERS stored as CSV, JSONL and Parquet."""
+    lines = ["city,amount,customer"] + [f"{row['city']},{'' if row['amount'] is None else row['amount']},"
+                                        f"{row['customer']}" for row in ORDERS]
+    s3.put_object(Bucket=BUCKET, Key="orders.csv", Body="\n".join(lines).encode())
+    s3.put_object(Bucket=BUCKET, Key="orders.jsonl", Body="\n".join(json.dumps(row) for row in ORDERS).encode())
+
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(ORDERS), buffer, row_group_size=2)
+    s3.put_object(Bucket=BUCKET, Key="orders.parquet", Body=buffer.getvalue())
+
+
+@pytest.mark.parametrize("key", ["orders.csv", "orders.jsonl", "orders.parquet"])
+def test_query_table_gives_the_same_result_for_every_format(reader, orders, key):
+    result = reader.query_table(BUCKET, key, **SUMMARY)
+
+    assert result["status"] == "success", result
+    assert result["data"] == EXPECTED
+
+
+@pytest.mark.parametrize("key", ["many.csv", "many.jsonl"])
+def test_only_the_byte_budget_makes_a_result_incomplete(reader, s3, key):
+    numbers = range(50_000)
+    s3.put_object(Bucket=BUCKET, Key="many.csv", Body="n\n".encode() + b"".join(b"%d\n" % n for n in numbers))
+    s3.put_object(Bucket=BUCKET, Key="many.jsonl", Body=b"".join(b'{"n": %d}\n' % n for n in numbers))
+
+    # Stopping at the limit leaves most of the object unread but the result is complete
+    limited = reader.query_table(BUCKET, key, select=["/n" if key.endswith("jsonl") else "n"], limit=2)
+    assert len(limited["data"]) == 2 and limited["complete"] is True
+    assert limited["bytes_scanned"] < 200_000
+
+    budgeted = reader.query_table(BUCKET, key, aggregates=[{"op": "count"}], max_bytes=1000)
+    assert budgeted["complete"] is False
+
+
+def test_query_table_columnar_output(reader, orders):
+    result = reader.query_table(BUCKET, "orders.csv", select=["city", "amount"], filters={"city": "Paris"},
+                                output_format="columns")
+
+    assert result["data"] == {"columns": ["city", "amount"], "types": {"city": "str", "amount": "int"},
+                              "data": {"city": ["Paris", "Paris"], "amount": [5, 15]}}
+
+
+def test_query_table_filters_parquet_timestamps(reader, s3):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pa.table({"ts": pa.array([minute * 60_000 for minute in range(6)], pa.timestamp("ms")),
+                      "n": list(range(6))})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=2)
+    s3.put_object(Bucket=BUCKET, Key="ts.parquet", Body=buffer.getvalue())
+
+    result = reader.query_table(BUCKET, "ts.parquet", filters=[{"column": "ts", "op": ">=",
+                                                                "value": "1970-01-01T00:03:00"}],
+                                aggregates=[{"op": "count"}, {"op": "min", "column": "n"}])
+    assert result["data"] == [{"count": 3, "min_n": 3}]
+    assert result["row_groups"]["pruned"] == 1
+
+
+def test_query_table_rejects_other_formats(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="notes.txt", Body=b"hello")
+    result = reader.query_table(BUCKET, "notes.txt", aggregates=[{"op": "count"}])
+    assert result["status"] == "error"
@@ -0,0 +1,136 @@
+import io
+import os
+
+import pytest
+
+from src.s3_utils import s3_ranged_io
+from src.s3_utils.s3_parser_pool import parse_json_content
+from src.s3_utils.s3_ranged_io import (
+    MemoryReader, ParallelGetter, S3RangedFile, SpilledBuffer, allocate_buffer, read_body, read_into
+)
+from tests.conftest import BUCKET
+
+KB = 1024
+BODY = bytes(range(256)) * 4000
+
+
+@pytest.fixture
+def blob(s3):
+    s3.put_object(Bucket=BUCKET, Key="blob.bin", Body=BODY)
+    return "blob.bin"
+
+
+def test_ranged_file_reads_only_the_blocks_it_touches(s3, blob):
+    raw = S3RangedFile(s3, BUCKET, blob, block_size=64 * KB)
+    raw.seek(-10, io.SEEK_END)
+    assert raw.read(10) == BODY[-10:]
+    raw.seek(100_000)
+    assert raw.read(5) == BODY[100_000:100_005]
+
+    assert raw.requests == 2
+    assert raw.bytes_fetched < 3 * 64 * KB
+    raw.seek(100_010)
+    raw.read(5)
+    assert raw.requests == 2
+
+
+def test_from_suffix_seeds_the_tail_and_prefetch_coalesces(s3, blob):
+    raw = S3RangedFile.from_suffix(s3, BUCKET, blob, block_size=64 * KB)
+    assert raw.size == len(BODY)
+    raw.seek(-1000, io.SEEK_END)
+    assert raw.read() == BODY[-1000:]
+    assert raw.requests == 1
+
+    # Blocks 0-3 are adjacent and fetched together; block 8 is separate
+    assert raw.prefetch([(0, 4 * 64 * KB), (8 * 64 * KB, 8 * 64 * KB + 1)]) == 2
+    requests = raw.requests
+    raw.seek(0)
+    assert raw.read(4 * 64 * KB) == BODY[:4 * 64 * KB]
+    assert raw.requests == requests
+
+
+def test_ranged_file_fails_after_an_overwrite(s3, blob):
+    raw = S3RangedFile(s3, BUCKET, blob, block_size=64 * KB)
+    s3.put_object(Bucket=BUCKET, Key=blob, Body=b"replaced" * 100_000)
+    with pytest.raises(Exception, match="PreconditionFailed|412"):
+        raw.read(10)
+
+
+def test_parallel_getter_reassembles_parts(s3, blob):
+    getter = ParallelGetter(threshold=100 * KB, part_size=100 * KB, max_workers=4)
+    data, response = getter.read(s3, BUCKET, blob)
+
+    assert bytes(data) == BODY
+    assert response["ContentLength"] == len(BODY)
+    stats = getter.stats()
+    assert stats["parallel_reads"] == 1 and stats["parts"] == -(-len(BODY) // (100 * KB))
+
+    small, _ = ParallelGetter(threshold=10 * 1024 * KB).read(s3, BUCKET, blob)
+    assert bytes(small) == BODY
+
+
+def test_parallel_parts_fail_after_an_overwrite(s3, blob):
+    response = s3.get_object(Bucket=BUCKET, Key=blob)
+    s3.put_object(Bucket=BUCKET, Key=blob, Body=os.urandom(len(BODY)))
+    with pytest.raises(Exception, match="PreconditionFailed|412"):
+        ParallelGetter(threshold=100 * KB, part_size=100 * KB, max_workers=4).read(s3, BUCKET, blob, response)
+
+
+class _ChunkedBody:
+    """A body without ``readinto`` that returns at most ``chunk`` bytes per read."""
+
+    def __init__(self, data: bytes, chunk: int):
+        self._stream = io.BytesIO(data)
+        self.chunk = chunk
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(min(size, self.chunk) if size >= 0 else self.chunk)
+
+
+def test_read_body_fills_a_preallocated_buffer():
+    data = read_body(_ChunkedBody(BODY, 1000), len(BODY), spill=False)
+    assert isinstance(data, bytearray) and data == BODY
+
+    # A body shorter than announced is trimmed in place
+    assert read_body(io.BytesIO(b"abc"), 10, spill=False) == b"abc"
+    assert read_body(io.BytesIO(b"abc"), None) == b"abc"
+
+    view = memoryview(bytearray(4))
+    assert read_into(io.BytesIO(b"abcdef"), view) == 4 and view.tobytes() == b"abcd"
+
+
+def test_memory_reader_seeks_over_a_buffer():
+    reader = io.BufferedReader(MemoryReader(memoryview(bytearray(b"0123456789"))))
+    reader.seek(-3, io.SEEK_END)
+    assert reader.read() == b"789"
+    reader.seek(2)
+    assert reader.read(3) == b"234"
+    with pytest.raises(ValueError):
+        MemoryReader(b"").seek(-1)
+
+
+def test_large_bodies_spill_to_a_mapped_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(s3_ranged_io, "S3_SPILL_THRESHOLD", 100 * KB)
+    monkeypatch.setattr(s3_ranged_io, "S3_SPILL_DIR", str(tmp_path))
+    assert isinstance(allocate_buffer(10 * KB), bytearray)
+
+    data = read_body(io.BytesIO(BODY), len(BODY))
+    assert isinstance(data, SpilledBuffer)
+    assert data[:] == BODY and os.path.dirname(data.path) == str(tmp_path)
+    # Parsers take the mapped buffer as they take bytes
+    document = b'{"values": [1, 2, 3]}'
+    spilled = allocate_buffer(200 * KB)
+    spilled[:len(document)] = document
+    spilled[len(document):] = b" " * (len(spilled) - len(document))
+    assert parse_json_content(spilled) == {"values": [1, 2, 3]}
+
+    path = data.path
+    del data
+    assert not os.path.exists(path)
+
+
+def test_spilled_body_must_be_complete(monkeypatch, tmp_path):
+    monkeypatch.setattr(s3_ranged_io, "S3_SPILL_THRESHOLD", 1)
+    monkeypatch.setattr(s3_ranged_io, "S3_SPILL_DIR", str(tmp_path))
+    with pytest.raises(IOError, match="ended after 3 of 10 bytes"):
+        read_body(io.BytesIO(b"abc"), 10)
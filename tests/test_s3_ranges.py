@@ -0,0 +1,68 @@
+import gzip
+
+from tests.conftest import BUCKET
+
+TEXT = b"".join(b"row %05d\n" % number for number in range(1, 20001))
+
+
+def test_byte_range_and_suffix_range(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="rows.txt", Body=TEXT)
+
+    result = reader.read_byte_range(BUCKET, "rows.txt", 10, 19)
+    assert result["data"] == TEXT[10:20].decode()
+    assert result["range"]["object_size"] == len(TEXT) and result["range"]["truncated"] is True
+    assert "next_cursor" not in result
+
+    tail = reader.read_byte_range(BUCKET, "rows.txt", byte_end=10)
+    assert tail["data"] == "row 20000\n"
+
+
+def test_capped_range_resumes_from_the_cursor(reader, s3):
+    body = "héllo wörld ".encode() * 50
+    s3.put_object(Bucket=BUCKET, Key="utf8.txt", Body=body)
+
+    pieces = []
+    result = reader.read_byte_range(BUCKET, "utf8.txt", 0, max_bytes=7)
+    while True:
+        pieces.append(result["data"])
+        cursor = result.get("next_cursor")
+        if cursor is None:
+            break
+        result = reader.read_byte_range(BUCKET, "utf8.txt", cursor=cursor, max_bytes=7)
+    # Pages end on character boundaries, so nothing is replaced
+    assert "".join(pieces) == body.decode()
+
+
+def test_head_lines_stop_early(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="rows.txt", Body=TEXT)
+
+    result = reader.read_head_lines(BUCKET, "rows.txt", 3)
+    assert result["data"] == ["row 00001", "row 00002", "row 00003"]
+    assert result["range"]["bytes_read"] < len(TEXT) and result["range"]["truncated"] is True
+
+    assert reader.read_head_lines(BUCKET, "rows.txt", 100, max_bytes=25)["data"][:2] == ["row 00001", "row 00002"]
+
+
+def test_head_lines_of_a_compressed_object(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="rows.txt.gz", Body=gzip.compress(TEXT))
+
+    result = reader.read_head_lines(BUCKET, "rows.txt.gz", 2)
+    assert result["data"] == ["row 00001", "row 00002"] and result["codec"] == "gzip"
+
+
+def test_tail_lines_grow_the_window_backwards(reader, s3):
+    s3.put_object(Bucket=BUCKET, Key="rows.txt", Body=TEXT)
+
+    result = reader.read_tail_lines(BUCKET, "rows.txt", 2)
+    assert result["data"] == ["row 19999", "row 20000"]
+    assert result["range"]["truncated"] is True
+
+    # More lines than the first window holds
+    many = reader.read_tail_lines(BUCKET, "rows.txt", 15000)
+    assert len(many["data"]) == 15000 and many["data"][0] == "row 05001"
+
+    whole = reader.read_tail_lines(BUCKET, "rows.txt", 50000)
+    assert len(whole["data"]) == 20000 and whole["range"]["truncated"] is False
+
+    capped = reader.read_tail_lines(BUCKET, "rows.txt", 50000, max_bytes=100)
+    assert capped["range"]["bytes_read"] <= 100 and capped["data"][-1] == "row 20000"
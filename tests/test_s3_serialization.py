@@ -0,0 +1,34 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from src.s3_utils import s3_serialization
+from src.s3_utils.s3_serialization import register_serializer, resolve_serializer
+
+VALUE = {
+    "when": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "day": date(2024, 1, 2),
+    "raw": b"caf\xc3\xa9",
+    "text": "café",
+    "big": 2 ** 70,
+    1: [1.5, None, True]
+}
+EXPECTED = ('{"when":"2024-01-02T03:04:05+00:00","day":"2024-01-02","raw":"café","text":"café",'
+            '"big":1180591620717411303424,"1":[1.5,null,true]}')
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_serializers_agree_on_compact_output(name):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    assert resolve_serializer(name)[1](VALUE) == EXPECTED
+
+
+def test_resolve_serializer(monkeypatch):
+    assert resolve_serializer("auto")[0] in ("json", "orjson")
+    with pytest.raises(ValueError, match="Unknown JSON serializer"):
+        resolve_serializer("missing")
+
+    monkeypatch.setattr(s3_serialization, "_SERIALIZERS", dict(s3_serialization._SERIALIZERS))
+    register_serializer("upper", lambda value: str(value).upper())
+    assert resolve_serializer("upper")[1]("a") == "A"
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+from src.s3_utils.s3_paging import OutputBudget, json_size
+from src.s3_utils.s3_streaming import LineStream, stream_csv, stream_jsonl, build_predicate, select_rows
+
+CSV = b"id,city,amount\n1,Berlin,10\n2,Paris,25.5\n3,Berlin,7\n4,Rome,40\n"
+
+
+def test_line_stream_tracks_offsets_across_buffers():
+    lines = LineStream(io.BytesIO(b"ab\ncde\nf"), buffer_size=2)
+    assert list(lines) == [b"ab\n", b"cde\n", b"f"]
+    assert lines.offset == 8 and lines.exhausted
+
+
+def test_line_stream_drops_a_line_cut_by_max_bytes():
+    lines = LineStream(io.BytesIO(b"ab\ncde\n"), buffer_size=2, max_bytes=5)
+    assert list(lines) == [b"ab\n"]
+    assert not lines.exhausted and lines.truncated
+
+
+def test_line_stream_joins_a_line_spanning_many_buffers():
+    long_line = b"x" * 100_000 + b"\n"
+    lines = LineStream(io.BytesIO(b"a\n" + long_line + b"y" * 50), buffer_size=7)
+    assert list(lines) == [b"a\n", long_line, b"y" * 50]
+    assert lines.offset == 2 + len(long_line) + 50 and not lines.truncated
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"city": "Berlin"}, ["1", "3"]),
+    ([{"column": "amount", "op": ">", "value": 9}], ["1", "2", "4"]),
+    ([{"column": "city", "op": "in", "value": ["Rome", "Paris"]}], ["2", "4"]),
+    ([{"column": "city", "op": "startswith", "value": "Be"}, {"column": "amount", "op": "<", "value": 8}], ["3"]),
+])
+def test_filters(filters, expected):
+    result = stream_csv(io.BytesIO(CSV), filters=filters)
+    assert [row["id"] for row in result["rows"]] == expected
+    assert result["complete"]
+
+
+def test_unknown_operator_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        build_predicate([{"column": "a", "op": "~", "value": 1}])
+
+
+def test_select_rows_applies_offset_after_filtering():
+    rows = list(select_rows(range(10), lambda value: value % 2 == 0, offset=1, limit=2))
+    assert rows == [2, 4]
+
+
+def test_projection_and_limit_resume_from_the_next_row():
+    first = stream_csv(io.BytesIO(CSV), columns=["city"], limit=2)
+    assert first["rows"] == [{"city": "Berlin"}, {"city": "Paris"}]
+    assert not first["complete"]
+
+    resume = first["resume"]
+    rest = stream_csv(io.BytesIO(CSV[resume["offset"]:]), columns=["city"], header=resume["header"],
+                      start_offset=resume["offset"], start_row=resume["row"])
+    assert rest["rows"] == [{"city": "Berlin"}, {"city": "Rome"}]
+    assert rest["complete"]
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError, match="Unknown CSV columns"):
+        stream_csv(io.BytesIO(CSV), columns=["missing"])
+
+
+JSONL = b'{"id": 1, "user": {"name": "Ann"}}\n\n{"id": 2, "user": {"name": "Bj\xc3\xb6rn"}}\n{"id": 3, "user": {}}\n'
+
+
+def test_jsonl_pointer_projection_and_filters():
+    result = stream_jsonl(io.BytesIO(JSONL), fields=["id", "/user/name"],
+                          filters=[{"column": "/user/name", "op": "!=", "value": None}])
+    assert result["rows"] == [{"id": 1, "/user/name": "Ann"}, {"id": 2, "/user/name": "Björn"}]
+    assert result["rows_scanned"] == 3
+
+
+def test_jsonl_bytes_returned_counts_utf8_bytes():
+    result = stream_jsonl(io.BytesIO(JSONL), fields=["/user/name"], limit=2)
+    assert result["bytes_returned"] == sum(json_size(row) for row in result["rows"])
+    assert result["bytes_returned"] == len('{"/user/name":"Ann"}') + len('{"/user/name":"Björn"}'.encode("utf-8"))
+
+
+def test_jsonl_budget_resumes_at_the_first_unreturned_record():
+    budget = OutputBudget(json_size({"id": 1, "user": {"name": "Ann"}}) + 1)
+    first = stream_jsonl(io.BytesIO(JSONL), budget=budget)
+    assert [row["id"] for row in first["rows"]] == [1]
+
+    resume = first["resume"]
+    rest = stream_jsonl(io.BytesIO(JSONL[resume["offset"]:]), start_offset=resume["offset"], start_row=resume["row"])
+    assert [row["id"] for row in rest["rows"]] == [2, 3]
+
+
+def test_jsonl_reports_the_line_of_invalid_json():
+    with pytest.raises(ValueError, match="line 2"):
+        stream_jsonl(io.BytesIO(b'{"a": 1}\n{oops}\n'))